@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*
+"""
+Corporate-action adjustment engine.
+
+Cumulative split and dividend adjustment factors are computed
+for every symbol of a Panel in one batch with NumPy. Every event
+contributes a factor to all bars before its ex-date:
+
+* split with ratio r: prices / r, volume * r
+* dividend D with previous close C: prices * (1 - D / C)
+
+Applied events are remembered, new splits or dividends only
+update the factors of the bars they affect.
+
+The open/high/low/close and volume arrays of Yahoo chart responses
+are already split adjusted, adjust_results therefore only applies
+dividends unless split adjustment is requested explicitly.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .PanelTools import Panel, build_panels
+from .ParseTools import to_epoch_seconds
+
+price_fields = ("open", "high", "low", "close")
+
+
+def _cumulative(
+    shape: Tuple[int, int], rows: np.ndarray, cols: np.ndarray, factors: np.ndarray
+) -> np.ndarray:
+    """
+    Cumulative (time, symbol) factors of events given by the
+    row of their ex-date: bar t gets the product of all
+    events with ex-date row > t.
+    """
+    events = np.ones(shape)
+    np.multiply.at(events, (rows - 1, cols), factors)
+    return np.cumprod(events[::-1], axis=0)[::-1]
+
+
+def _previous_valid(values: np.ndarray) -> np.ndarray:
+    """
+    Forward fill NaN values along the time axis (vectorized).
+    """
+    rows = np.arange(values.shape[0])[:, None]
+    idx = np.where(np.isnan(values), 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return values[idx, np.arange(values.shape[1])[None, :]]
+
+
+class AdjustmentEngine:
+    """
+    Split and dividend adjustment of an aligned price panel.
+
+    Parameters:
+    -----------
+    panel: Panel
+        unadjusted prices, must contain a "close" field
+    adjust_splits: bool
+        apply split factors, disable when the prices
+        are already split adjusted
+    adjust_dividends: bool
+        apply dividend factors
+    """
+
+    def __init__(
+        self,
+        panel: Panel,
+        adjust_splits: bool = True,
+        adjust_dividends: bool = True,
+    ):
+        self.panel = panel
+        self.adjust_splits = adjust_splits
+        self.adjust_dividends = adjust_dividends
+
+        shape = panel.values.shape[1:]
+        self.price_factor = np.ones(shape)
+        self.volume_factor = np.ones(shape)
+        self._applied: Set[Tuple[str, str, str]] = set()
+
+    def _rows(self, dates: Iterable[str]) -> np.ndarray:
+        # FIRST BAR ON OR AFTER THE EX-DATE
+        stamps = to_epoch_seconds(list(dates))
+        return np.searchsorted(self.panel.timestamps, stamps, side="left")
+
+    def _collect(
+        self, frames: Iterable[Optional[pd.DataFrame]], kind: str, column: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gather new (row, symbol, value) events from action frames.
+        """
+        index = {symbol: j for j, symbol in enumerate(self.panel.symbols)}
+        dates: List[str] = []
+        cols: List[int] = []
+        values: List[float] = []
+        for frame in frames:
+            if frame is None or frame.empty:
+                continue
+            for date, symbol, value in zip(frame.index, frame["symbol"], frame[column]):
+                key = (symbol, date, kind)
+                if symbol not in index or key in self._applied:
+                    continue
+                self._applied.add(key)
+                dates.append(date)
+                cols.append(index[symbol])
+                values.append(value)
+
+        if not dates:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        return self._rows(dates), np.array(cols), np.array(values, dtype=np.float64)
+
+    def add_splits(self, frames: Iterable[Optional[pd.DataFrame]]) -> int:
+        """
+        Apply split frames from parse_actions_as_frame,
+        already applied splits are ignored.
+
+        return: int
+            number of new splits
+        """
+        rows, cols, ratios = self._collect(frames, "split", "splits")
+        keep = (rows > 0) & (ratios > 0)
+        if not self.adjust_splits or not keep.any():
+            return rows.size
+
+        cum = _cumulative(self.price_factor.shape, rows[keep], cols[keep], ratios[keep])
+        self.price_factor /= cum
+        self.volume_factor *= cum
+        return rows.size
+
+    def add_dividends(self, frames: Iterable[Optional[pd.DataFrame]]) -> int:
+        """
+        Apply dividend frames from parse_actions_as_frame,
+        already applied dividends are ignored.
+
+        return: int
+            number of new dividends
+        """
+        rows, cols, amounts = self._collect(frames, "dividend", "dividends")
+        keep = rows > 0
+        if not self.adjust_dividends or not keep.any():
+            return rows.size
+
+        rows, cols, amounts = rows[keep], cols[keep], amounts[keep]
+        close = self.panel.values[self.panel.fields.index("close")]
+        prev_close = _previous_valid(close)[rows - 1, cols]
+        factors = 1.0 - amounts / prev_close
+        valid = np.isfinite(factors) & (factors > 0)
+
+        self.price_factor *= _cumulative(
+            self.price_factor.shape, rows[valid], cols[valid], factors[valid]
+        )
+        return rows.size
+
+    def adjusted(self, fields: Sequence[str] = price_fields) -> Panel:
+        """
+        Adjusted copy of the panel. Price fields are multiplied by
+        the price factor, volume by the volume factor, all other
+        fields (e.g. adjclose) are left unchanged.
+
+        return: Panel
+        """
+        values = self.panel.values.copy()
+        for i, field in enumerate(self.panel.fields):
+            if field in fields:
+                values[i] *= self.price_factor
+            elif field == "volume":
+                values[i] *= self.volume_factor
+
+        return Panel(
+            values,
+            self.panel.timestamps,
+            self.panel.fields,
+            self.panel.symbols,
+            self.panel.intraday,
+        )
+
+    def update(self, panel: Panel) -> None:
+        """
+        Move the engine to a new (typically extended) panel.
+        Factors of known bars are kept, new bars take the
+        factor of the next known bar of the symbol, bars after
+        the last known bar start unadjusted. Apply new actions
+        afterwards.
+        """
+        shape = panel.values.shape[1:]
+        price_factor = np.full(shape, np.nan)
+        volume_factor = np.full(shape, np.nan)
+
+        rows = np.searchsorted(panel.timestamps, self.panel.timestamps)
+        found = rows < panel.timestamps.size
+        found[found] = panel.timestamps[rows[found]] == self.panel.timestamps[found]
+        new_index = {symbol: j for j, symbol in enumerate(panel.symbols)}
+        for j, symbol in enumerate(self.panel.symbols):
+            if symbol in new_index:
+                k = new_index[symbol]
+                price_factor[rows[found], k] = self.price_factor[found, j]
+                volume_factor[rows[found], k] = self.volume_factor[found, j]
+
+        # BACKWARD FILL FROM THE NEXT KNOWN BAR, THEN NO ADJUSTMENT
+        price_factor = _previous_valid(price_factor[::-1])[::-1]
+        volume_factor = _previous_valid(volume_factor[::-1])[::-1]
+        price_factor[np.isnan(price_factor)] = 1.0
+        volume_factor[np.isnan(volume_factor)] = 1.0
+
+        self.panel = panel
+        self.price_factor = np.ascontiguousarray(price_factor)
+        self.volume_factor = np.ascontiguousarray(volume_factor)
+
+
+def adjust_results(
+    results: List[tuple],
+    adjust_splits: bool = False,
+    adjust_dividends: bool = True,
+) -> Dict[str, Panel]:
+    """
+    Adjusted panels per interval from the output
+    of ``YahooManual.get``.
+
+    Parameters:
+    -----------
+    results: list
+        ((interval, prices, dividends, splits), summary) tuples
+    adjust_splits: bool
+        apply split factors, chart prices are already
+        split adjusted, only enable for unadjusted prices
+    adjust_dividends: bool
+        apply dividend factors
+
+    return: dict
+        interval -> adjusted Panel
+    """
+    adjusted = {}
+    for interval, panel in build_panels(results).items():
+        actions = [r[0] for r in results if r[0][0] == interval]
+        engine = AdjustmentEngine(panel, adjust_splits, adjust_dividends)
+        engine.add_splits(a[3] for a in actions)
+        engine.add_dividends(a[2] for a in actions)
+        adjusted[interval] = engine.adjusted()
+    return adjusted
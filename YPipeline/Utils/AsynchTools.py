@@ -1,17 +1,63 @@
+import asyncio
+import time
 from asyncio import Semaphore
-from typing import Tuple, Union
+from json import loads as json_loads
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import pandas as pd
-from termcolor import colored
-
-from aiohttp import ClientError, ClientSession
+from aiohttp import ClientConnectionError, ClientError, ClientSession
 from aiohttp.http import HttpProcessingError
 
 from .. import log
-from .ParseTools import parse_prices
+from .BreakerTools import (
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    default_breakers,
+    failure_statuses,
+    request_timeout,
+)
+from .PriorityTools import DeadlineExceededError
+from .ProfileTools import record_wait, stage
+from .SchemaTools import validate_chart
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+
+def decode_json(text: str):
+    """
+    json.loads attributed to the decode stage.
+    """
+    with stage("decode"):
+        return json_loads(text)
+
+
+def colored(text: str, color: str) -> str:
+    """
+    Lazy wrapper around termcolor.colored, only
+    loading termcolor when a message is formatted.
+    """
+    from termcolor import colored as _colored
 
+    return _colored(text, color)
 
-async def fetch(url: str, params: dict, session: ClientSession) -> dict:
+
+async def fetch(
+    url: str,
+    params: dict,
+    session: ClientSession,
+    breaker: Optional[CircuitBreaker] = None,
+) -> dict:
     """
     Asynchronous fetching of urls.
 
@@ -23,10 +69,23 @@ async def fetch(url: str, params: dict, session: ClientSession) -> dict:
         parameters for request
     session: ClientSession
         aiohttp client session
+    breaker: CircuitBreaker
+        optional breaker recording the response status
     return: dict
         json repsonse
     """
-    async with session.get(url, params=params) as response:
+    # SESSION TIMEOUT CAPPED BY THE BATCH DEADLINE
+    timeout = request_timeout(getattr(session, "timeout", None))
+    kwargs = {} if timeout is None else {"timeout": timeout}
+
+    start = time.perf_counter()
+    async with session.get(url, params=params, **kwargs) as response:
+        if breaker is not None:
+            if response.status in failure_statuses:
+                breaker.failure()
+            else:
+                breaker.success()
+
         if response.status == 200:
             color: str = "green"
             log.debug(
@@ -43,12 +102,19 @@ async def fetch(url: str, params: dict, session: ClientSession) -> dict:
                     color,
                 )
             )
-        json = await response.json()
+        json = await response.json(loads=decode_json)
+        record_wait("fetch", time.perf_counter() - start)
 
         return json
 
 
-async def bound_fetch(sem: Semaphore, url: str, params: dict, session: ClientSession):
+async def bound_fetch(
+    sem: Semaphore,
+    url: str,
+    params: dict,
+    session: ClientSession,
+    breakers: Optional[BreakerRegistry] = None,
+):
     """
     Method to restric the open files (request) in asynch fetch.
 
@@ -62,15 +128,97 @@ async def bound_fetch(sem: Semaphore, url: str, params: dict, session: ClientSes
         parameters for request
     session: ClientSession
         aiohttp client session
+    breakers: BreakerRegistry
+        circuit breakers, defaults to the shared registry
     return: dict
         json response
 
     """
-    async with sem:
-        return await fetch(url, params, session)
+    breaker = (breakers or default_breakers).get(url)
+
+    # FAIL FAST WITHOUT TAKING A SLOT
+    probe = breaker.check()
+    try:
+        async with sem:
+            if not probe:
+                # BREAKER MAY HAVE OPENED WHILE WAITING
+                probe = breaker.check()
+            return await fetch(url, params, session, breaker)
 
+    except (ClientConnectionError, asyncio.TimeoutError):
+        breaker.failure()
+        raise
+    except BaseException:
+        # CANCELLED, EXPIRED OR A CLIENT ERROR (E.G. INVALID URL)
+        # - NO VERDICT ON THE ENDPOINT, A PENDING PROBE MAY BE RESENT
+        if probe:
+            breaker.abort()
+        raise
 
-async def aparse_summary(sem: Semaphore, symbol: str, session: ClientSession) -> dict:
+
+async def run_pool(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    workers: int,
+    queue_size: Optional[int] = None,
+) -> List[Any]:
+    """
+    Run func over items with a fixed pool of worker coroutines
+    pulling lazily from a bounded queue, instead of creating a
+    task per item up front. Memory scales with the number of
+    workers, not with the number of items.
+
+    Parameters:
+    -----------
+    func: Callable
+        coroutine function called with a single item
+    items: iterable
+        work items, consumed lazily
+    workers: int
+        number of worker coroutines
+    queue_size: int
+        bound of the work queue, defaults to twice the workers
+    return: list
+        results in the order of items, the first exception
+        raised by func cancels the pool and is propagated
+    """
+    results: List[Any] = []
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or 2 * workers)
+
+    async def producer():
+        for i, item in enumerate(items):
+            results.append(None)
+            await queue.put((i, item))
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            i, item = job
+            results[i] = await func(item)
+
+    tasks = [asyncio.ensure_future(producer())]
+    tasks.extend(asyncio.ensure_future(worker()) for _ in range(workers))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # A FAILING JOB STOPS THE POOL - NO PRODUCER LEFT BLOCKED ON put
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return results
+
+
+async def aparse_summary(
+    sem: Semaphore,
+    symbol: str,
+    session: ClientSession,
+    breakers: Optional[BreakerRegistry] = None,
+) -> dict:
     """
     Simple method to read summary table from Yahoo main page
     for a symbol.
@@ -81,20 +229,30 @@ async def aparse_summary(sem: Semaphore, symbol: str, session: ClientSession) ->
     symbol: str
         Yahoo finance symbol
     session: ClientSession
+    breakers: BreakerRegistry
+        optional circuit breakers
     return: dict
         dict version of the summary table
     """
     url_summ = "https://finance.yahoo.com/quote/"
     url = url_summ + symbol
 
+    import pandas as pd
+
     try:
-        resp = await bound_fetch(sem, url, {}, session)
-        df = pd.concat(pd.read_html(resp.text()))
-        df.columns = ["key", "value"]
+        resp = await bound_fetch(sem, url, {}, session, breakers)
+        with stage("summary"):
+            df = pd.concat(pd.read_html(resp.text()))
+            df.columns = ["key", "value"]
+
+            return dict(zip(df.key.values, df["value"].values))
 
-        return dict(zip(df.key.values, df["value"].values))
+    except (DeadlineExceededError, CircuitOpenError) as e:
+        log.info(f"{url.split('/')[-1]} - {e}")
 
-    except (ClientError, HttpProcessingError) as e:
+        return {}
+
+    except (ClientError, HttpProcessingError, asyncio.TimeoutError) as e:
         log.error(
             "aiohttp exception for %s [%s]: %s",
             url,
@@ -115,12 +273,17 @@ async def aparse_summary(sem: Semaphore, symbol: str, session: ClientSession) ->
 
 
 async def aparse_prices(
-    sem: Semaphore, tup: Tuple[str, dict], session: ClientSession
+    sem: Semaphore,
+    tup: Tuple[str, dict],
+    session: ClientSession,
+    meta_hook: Optional[Callable[[str, dict], None]] = None,
+    breakers: Optional[BreakerRegistry] = None,
+    status_hook: Optional[Callable[[str, Optional[str]], None]] = None,
 ) -> Tuple[
     Union[str, None],
-    Union[pd.DataFrame, None],
-    Union[pd.DataFrame, None],
-    Union[pd.DataFrame, None],
+    Union["pd.DataFrame", None],
+    Union["pd.DataFrame", None],
+    Union["pd.DataFrame", None],
 ]:
     """
     Asynch getting and parsing of yahoo prices.
@@ -131,15 +294,38 @@ async def aparse_prices(
         (url, parameters for request dict)
     session: ClientSession
         aoihttp client session
+    meta_hook: Callable
+        optional callback receiving (url, chart meta data)
+    breakers: BreakerRegistry
+        optional circuit breakers
+    status_hook: Callable
+        optional callback receiving (url, reason code), the
+        reason is None for a valid response and "no_data" for
+        a valid response without bars
     return: Tuple
         (interval, price data, dividens, splits)
 
     """
+    # PARSING PULLS IN PANDAS/NUMPY - ONLY LOAD ON FIRST USE
+    from .ParseTools import parse_prices
+
     try:
         url, params = tup
-        resp = await bound_fetch(sem, url, params, session)
-        resp = resp["chart"]["result"][0]
-        interval, pricedata, div, split = parse_prices(resp)
+        resp = await bound_fetch(sem, url, params, session, breakers)
+
+        # CHEAP REJECTION OF MALFORMED PAYLOADS BEFORE PARSING
+        with stage("validate"):
+            resp, reason = validate_chart(resp)
+        if status_hook is not None:
+            status_hook(url, reason)
+        if reason is not None and reason != "no_data":
+            log.info(colored(f"{url.split('/')[-1]:8} - rejected - {reason}", "red"))
+
+            return None, None, None, None
+
+        if meta_hook is not None:
+            meta_hook(url, resp["meta"])
+        interval, pricedata, div, split = parse_prices(resp, validated=True)
 
         log.debug(
             colored(f"{url.split('/')[-1]:8} - interval {interval} - OK", "green")
@@ -147,7 +333,14 @@ async def aparse_prices(
 
         return interval, pricedata, div, split
 
-    except (ClientError, HttpProcessingError) as e:
+    except (DeadlineExceededError, CircuitOpenError) as e:
+        log.info(f"{tup[0].split('/')[-1]} - {e}")
+
+        return None, None, None, None
+
+    except (ClientError, HttpProcessingError, asyncio.TimeoutError) as e:
+        if status_hook is not None and getattr(e, "status", None) == 404:
+            status_hook(tup[0], "error:404")
         log.error(
             "aiohttp exception for %s [%s]: %s",
             tup[0],
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*
+"""
+Per-endpoint circuit breakers and request timeouts.
+
+A breaker counts consecutive failures (connection errors,
+timeouts, 429 and 5xx responses) of one endpoint. Past the
+threshold it opens and requests fail immediately with
+CircuitOpenError, without waiting for a semaphore slot. After
+the reset timeout a single probe request is let through: success
+closes the breaker, failure opens it again with a doubled reset
+timeout.
+
+Request timeouts are capped by the deadline of the batch set with
+``request_priority``, so no request outlives its batch.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from aiohttp import ClientTimeout
+
+from .PriorityTools import DeadlineExceededError, current_priority
+
+# HTTP STATUS CODES COUNTED AS ENDPOINT FAILURES
+failure_statuses = frozenset([429, 500, 502, 503, 504])
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return "CircuitOpenError, {0} ".format(self.message)
+        else:
+            return "CircuitOpenError: Endpoint is failing, request not sent."
+
+
+class CircuitBreaker:
+    """
+    Failure memory of one endpoint.
+
+    Parameters:
+    -----------
+    threshold: int
+        consecutive failures opening the breaker
+    reset_timeout: float
+        seconds before the first probe
+    max_reset_timeout: float
+        upper bound of the doubled reset timeout
+    clock: Callable
+        monotonic time source
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._timeout = reset_timeout
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self._timeout:
+            return "half_open"
+        return "open"
+
+    def check(self) -> bool:
+        """
+        Admit a request, raise CircuitOpenError if the endpoint is
+        failing.
+
+        return: bool
+            True if the request is the probe of a half open breaker
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        raise CircuitOpenError(f"open for {self._timeout:.0f}s")
+
+    def success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._timeout = self.reset_timeout
+        self._probing = False
+
+    def failure(self) -> None:
+        if self._probing:
+            # FAILED PROBE - WAIT LONGER BEFORE THE NEXT ONE
+            self._timeout = min(2 * self._timeout, self.max_reset_timeout)
+            self._opened_at = self._clock()
+            self._probing = False
+            return
+
+        self._failures += 1
+        if self._failures >= self.threshold and self._opened_at is None:
+            self._opened_at = self._clock()
+
+    def abort(self) -> None:
+        """
+        Request ended without verdict (e.g. cancelled), a
+        pending probe may be sent again.
+        """
+        self._probing = False
+
+
+class BreakerRegistry:
+    """
+    Circuit breakers keyed by endpoint (host and path without
+    the symbol), all created with the same settings.
+    """
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        return url.split("://", 1)[-1].rsplit("/", 1)[0]
+
+    def get(self, url: str) -> CircuitBreaker:
+        key = self.endpoint(url)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(**self.settings)
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        return {key: breaker.state for key, breaker in self._breakers.items()}
+
+
+# BREAKERS SHARED BY ALL REQUESTS WITHOUT AN EXPLICIT REGISTRY
+default_breakers = BreakerRegistry()
+
+
+def request_timeout(
+    timeout: Optional[ClientTimeout] = None,
+) -> Optional[ClientTimeout]:
+    """
+    Timeout of a single request, with the total capped by the
+    remaining time of the batch deadline.
+
+    Parameters:
+    -----------
+    timeout: ClientTimeout
+        configured request timeout (None: session default)
+
+    return: ClientTimeout
+        None if neither a timeout nor a deadline is set
+    """
+    _, deadline = current_priority()
+    if deadline is None:
+        return timeout
+
+    remaining = deadline - asyncio.get_event_loop().time()
+    if remaining <= 0:
+        raise DeadlineExceededError("deadline passed before sending")
+    if timeout is None:
+        return ClientTimeout(total=remaining)
+    total = remaining if timeout.total is None else min(timeout.total, remaining)
+    return ClientTimeout(
+        total=total,
+        connect=timeout.connect,
+        sock_read=timeout.sock_read,
+        sock_connect=timeout.sock_connect,
+    )
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*
+"""
+Exchange calendar tools.
+
+Keeps trading sessions per exchange timezone (as reported by
+``exchangeTimezoneName`` in the chart meta) and uses them to
+decide if new bars can exist since the last fetch of a
+(symbol, interval) pair.
+"""
+
+import json
+import time
+from datetime import date, datetime
+from datetime import time as dtime
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    from backports.zoneinfo import ZoneInfo
+
+from .UrlTools import generate_price_params, generate_price_urls
+
+
+def easter_sunday(year: int) -> date:
+    """
+    Gregorian Easter Sunday (anonymous Gregorian algorithm).
+
+    Parameters:
+    -----------
+    year: int
+        calendar year
+
+    return: datetime.date
+        date of Easter Sunday
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    n-th weekday of a month, n=-1 for the last one.
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    else:
+        last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        offset = (last.weekday() - weekday) % 7
+        return last - timedelta(days=offset)
+
+
+def _observed(day: date) -> date:
+    """
+    US rule: Saturday holidays are observed on Friday,
+    Sunday holidays on Monday.
+    """
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=64)
+def us_holidays(year: int) -> frozenset:
+    """
+    Full day closures of the US equity markets (NYSE/NASDAQ).
+
+    Parameters:
+    -----------
+    year: int
+        calendar year
+
+    return: frozenset
+        set of datetime.date
+    """
+    days = {
+        date(year, 1, 1),
+        _nth_weekday(year, 1, 0, 3),  # MARTIN LUTHER KING JR. DAY
+        _nth_weekday(year, 2, 0, 3),  # PRESIDENTS DAY
+        easter_sunday(year) - timedelta(days=2),  # GOOD FRIDAY
+        _nth_weekday(year, 5, 0, -1),  # MEMORIAL DAY
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # LABOR DAY
+        _nth_weekday(year, 11, 3, 4),  # THANKSGIVING
+        _observed(date(year, 12, 25)),
+    }
+    # NEW YEAR ON SATURDAY IS NOT OBSERVED ON THE PRECEDING FRIDAY
+    if date(year, 1, 1).weekday() == 6:
+        days.add(date(year, 1, 2))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # JUNETEENTH
+    return frozenset(days)
+
+
+@lru_cache(maxsize=64)
+def european_holidays(year: int) -> frozenset:
+    """
+    Full day closures common to the main European exchanges
+    (LSE, Xetra, Euronext).
+
+    Parameters:
+    -----------
+    year: int
+        calendar year
+
+    return: frozenset
+        set of datetime.date
+    """
+    easter = easter_sunday(year)
+    return frozenset(
+        {
+            date(year, 1, 1),
+            easter - timedelta(days=2),  # GOOD FRIDAY
+            easter + timedelta(days=1),  # EASTER MONDAY
+            date(year, 12, 25),
+            date(year, 12, 26),
+        }
+    )
+
+
+holiday_rules = {"us": us_holidays, "europe": european_holidays}
+
+
+class TradingSession:
+    """
+    Daily trading session of an exchange.
+
+    Parameters:
+    -----------
+    timezone: str
+        IANA timezone name (chart meta ``exchangeTimezoneName``)
+    open: datetime.time
+        local session start, including pre-market as
+        prices are requested with ``includePrePost``
+    close: datetime.time
+        local session end, including post-market
+    weekdays: iterable
+        trading weekdays (Monday=0)
+    holidays: str|iterable
+        name of a rule in ``holiday_rules`` or explicit dates
+    """
+
+    def __init__(
+        self,
+        timezone: str,
+        open: dtime = dtime(0, 0),
+        close: dtime = dtime(23, 59, 59),
+        weekdays: Iterable[int] = (0, 1, 2, 3, 4),
+        holidays: Union[str, Iterable[date], None] = None,
+    ):
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        self.open = open
+        self.close = close
+        self.weekdays = frozenset(weekdays)
+        self._holiday_rule = (
+            holiday_rules[holidays] if isinstance(holidays, str) else None
+        )
+        self._holidays: Set[date] = (
+            set() if isinstance(holidays, str) else set(holidays or ())
+        )
+
+    def add_holidays(self, days: Iterable[date]) -> None:
+        self._holidays.update(days)
+
+    def is_trading_day(self, day: date) -> bool:
+        if day.weekday() not in self.weekdays or day in self._holidays:
+            return False
+        if self._holiday_rule is not None and day in self._holiday_rule(day.year):
+            return False
+        return True
+
+    def is_open(self, timestamp: float) -> bool:
+        """
+        Check if the exchange is trading at a unix timestamp.
+        """
+        return self.has_trading_between(timestamp, timestamp + 1)
+
+    def has_trading_between(self, start: float, end: float) -> bool:
+        """
+        Check if any trading took place in the window (start, end].
+
+        Parameters:
+        -----------
+        start: float
+            unix timestamp of window start
+        end: float
+            unix timestamp of window end
+
+        return: bool
+        """
+        if end <= start:
+            return False
+
+        day = datetime.fromtimestamp(max(start, 0), self.tz).date()
+        last_day = datetime.fromtimestamp(end, self.tz).date()
+
+        while day <= last_day:
+            if self.is_trading_day(day):
+                session_start = datetime.combine(
+                    day, self.open, tzinfo=self.tz
+                ).timestamp()
+                session_end = datetime.combine(
+                    day, self.close, tzinfo=self.tz
+                ).timestamp()
+                if session_start < end and session_end > start:
+                    return True
+            day += timedelta(days=1)
+
+        return False
+
+
+# DEFAULT SESSIONS PER exchangeTimezoneName - EXTENDED HOURS INCLUDED
+default_sessions = {
+    "America/New_York": dict(open=dtime(4, 0), close=dtime(20, 0), holidays="us"),
+    "America/Chicago": dict(open=dtime(3, 0), close=dtime(19, 0), holidays="us"),
+    "America/Toronto": dict(open=dtime(9, 30), close=dtime(16, 0)),
+    "Europe/London": dict(open=dtime(7, 0), close=dtime(17, 0), holidays="europe"),
+    "Europe/Berlin": dict(open=dtime(8, 0), close=dtime(22, 0), holidays="europe"),
+    "Europe/Paris": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Europe/Amsterdam": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Europe/Brussels": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Europe/Zurich": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Europe/Madrid": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Europe/Rome": dict(open=dtime(9, 0), close=dtime(17, 40), holidays="europe"),
+    "Asia/Tokyo": dict(open=dtime(9, 0), close=dtime(15, 30)),
+    "Asia/Hong_Kong": dict(open=dtime(9, 30), close=dtime(16, 10)),
+    "Asia/Shanghai": dict(open=dtime(9, 30), close=dtime(15, 0)),
+    "Asia/Kolkata": dict(open=dtime(9, 15), close=dtime(15, 30)),
+    "Australia/Sydney": dict(open=dtime(10, 0), close=dtime(16, 15)),
+    # CRYPTO TRADES AROUND THE CLOCK
+    "UTC": dict(weekdays=range(7)),
+}
+
+# SYMBOL SUFFIXES TRADING (ALMOST) AROUND THE CLOCK
+# REGARDLESS OF THE EXCHANGE TIMEZONE: FX AND FUTURES
+suffix_sessions = {
+    "=X": dict(timezone="UTC", weekdays=(0, 1, 2, 3, 4, 6)),
+    "=F": dict(timezone="UTC", weekdays=(0, 1, 2, 3, 4, 6)),
+}
+
+
+class ExchangeCalendar:
+    """
+    Registry of trading sessions per exchange timezone
+    and of the timezone of every known symbol.
+    """
+
+    def __init__(self, sessions: Optional[Dict[str, dict]] = None):
+        self._session_settings = dict(default_sessions)
+        self._session_settings.update(sessions or {})
+        self._sessions: Dict[str, TradingSession] = {}
+        self._symbols: Dict[str, str] = {}
+        self._overrides: Dict[str, TradingSession] = {}
+
+    def session(self, timezone: str) -> Optional[TradingSession]:
+        """
+        Trading session for an exchange timezone, None if
+        the timezone has no known session.
+        """
+        if timezone not in self._sessions:
+            if timezone not in self._session_settings:
+                return None
+            self._sessions[timezone] = TradingSession(
+                timezone, **self._session_settings[timezone]
+            )
+        return self._sessions[timezone]
+
+    def register(self, symbol: str, timezone: str) -> None:
+        self._symbols[symbol] = timezone
+
+    def override(self, symbol: str, session: TradingSession) -> None:
+        """
+        Force a session for a single symbol.
+        """
+        self._overrides[symbol] = session
+
+    def update_meta(self, url: str, meta: dict) -> None:
+        """
+        Register the timezone reported in chart meta data,
+        signature matches the ``meta_hook`` of ``aparse_prices``.
+        """
+        timezone = (meta or {}).get("exchangeTimezoneName")
+        if timezone:
+            self.register(url.split("/")[-1], timezone)
+
+    def symbol_session(self, symbol: str) -> Optional[TradingSession]:
+        """
+        Resolve the session of a symbol: explicit override,
+        suffix rule, then registered exchange timezone.
+        """
+        if symbol in self._overrides:
+            return self._overrides[symbol]
+
+        for suffix, settings in suffix_sessions.items():
+            if symbol.endswith(suffix):
+                settings = dict(settings)
+                session = TradingSession(settings.pop("timezone"), **settings)
+                self._overrides[symbol] = session
+                return session
+
+        timezone = self._symbols.get(symbol)
+        if timezone is None:
+            return None
+        return self.session(timezone)
+
+    def to_dict(self) -> dict:
+        return {"symbols": dict(self._symbols)}
+
+    def from_dict(self, state: dict) -> None:
+        self._symbols.update(state.get("symbols", {}))
+
+
+class MarketScheduler:
+    """
+    Scheduling layer over ``generate_price_params`` that drops
+    requests for markets that have not traded since the last
+    successful fetch of the (symbol, interval) pair.
+
+    Symbols with an unknown exchange are always requested,
+    their timezone is learned from the chart meta data of the
+    response.
+
+    Parameters:
+    -----------
+    calendar: ExchangeCalendar
+        trading sessions and symbol timezones
+    grace: int
+        seconds before the last fetch that still count as new,
+        covers bars that are finalized after the fetch
+    """
+
+    def __init__(self, calendar: Optional[ExchangeCalendar] = None, grace: int = 900):
+        self.calendar = calendar or ExchangeCalendar()
+        self.grace = grace
+        self._last_fetch: Dict[Tuple[str, str], float] = {}
+
+    def last_fetch(self, symbol: str, interval: str) -> Optional[float]:
+        return self._last_fetch.get((symbol, interval))
+
+    def mark_fetched(
+        self, symbol: str, interval: str, when: Optional[float] = None
+    ) -> None:
+        self._last_fetch[(symbol, interval)] = time.time() if when is None else when
+
+    def update_meta(self, url: str, meta: dict) -> None:
+        self.calendar.update_meta(url, meta)
+
+    def needs_fetch(
+        self, symbol: str, interval: str, now: Optional[float] = None
+    ) -> bool:
+        """
+        Check if new bars can exist for symbol and interval
+        since the last fetch.
+
+        Parameters:
+        -----------
+        symbol: str
+            Yahoo finance symbol
+        interval: str
+            price time-series interval
+        now: float
+            unix timestamp, defaults to time.time()
+
+        return: bool
+        """
+        last = self.last_fetch(symbol, interval)
+        if last is None:
+            return True
+
+        session = self.calendar.symbol_session(symbol)
+        if session is None:
+            return True
+
+        now = time.time() if now is None else now
+        return session.has_trading_between(last - self.grace, now)
+
+    def filter(
+        self, combinations: Iterable[Tuple[str, dict]], now: Optional[float] = None
+    ) -> List[Tuple[str, dict]]:
+        """
+        Drop (url, params) combinations that cannot
+        return new data.
+
+        Parameters:
+        -----------
+        combinations: iterable
+            (url, params) tuples
+        now: float
+            unix timestamp, defaults to time.time()
+
+        return: list
+            (url, params) tuples worth requesting
+        """
+        now = time.time() if now is None else now
+        return [
+            (url, params)
+            for url, params in combinations
+            if self.needs_fetch(url.split("/")[-1], params["interval"], now)
+        ]
+
+    def generate(
+        self,
+        symbols: List[str],
+        period: str,
+        interval: str,
+        start=None,
+        end=None,
+        now: Optional[float] = None,
+    ) -> List[Tuple[str, dict]]:
+        """
+        Generate (url, params) combinations, skipping closed
+        markets. Requests with an explicit end date target
+        history and are never dropped.
+
+        return: list
+            (url, params) tuples
+        """
+        paramslist = generate_price_params(period, interval, start, end)
+        combinations = [
+            (url, params)
+            for url in generate_price_urls(symbols)
+            for params in paramslist
+        ]
+        if end is not None:
+            return combinations
+        return self.filter(combinations, now)
+
+    def save(self, path: str) -> None:
+        """
+        Persist fetch times and symbol timezones as json, so
+        consecutive refresh jobs share the schedule.
+        """
+        state = self.calendar.to_dict()
+        state["last_fetch"] = [[s, i, t] for (s, i), t in self._last_fetch.items()]
+        with open(path, "w") as f:
+            json.dump(state, f)
+
+    def load(self, path: str) -> None:
+        with open(path) as f:
+            state = json.load(f)
+        self.calendar.from_dict(state)
+        self._last_fetch.update({(s, i): t for s, i, t in state.get("last_fetch", [])})
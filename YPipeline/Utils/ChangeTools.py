@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*
+"""
+Change feed of price and action rows.
+
+Per (symbol, interval) a compact fingerprint of the emitted rows
+is kept: the time range, row count and hash sum of row blocks. Older
+history is covered by large blocks, the most recent rows (where
+revisions usually happen) by one hash per row. A new fetch is
+compared against the fingerprint with a single cumulative sum
+over its row hashes, only appended rows and rows of blocks whose
+hash or row count changed are emitted. A block straddling the
+start of the fetched window can not be compared, its fetched rows
+are emitted as well.
+
+Actions are fingerprinted per symbol with one hash per record.
+Removed rows are not reported.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import to_epoch_seconds
+
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(frame, index=True).to_numpy(dtype=np.uint64)
+
+
+def _cover(lo: np.ndarray, hi: np.ndarray, size: int) -> np.ndarray:
+    """
+    Number of [lo, hi) row ranges covering every row.
+    """
+    marks = np.zeros(size + 1, dtype=np.int64)
+    np.add.at(marks, lo, 1)
+    np.add.at(marks, hi, -1)
+    return np.cumsum(marks[:-1])
+
+
+class Fingerprint:
+    """
+    Block hashes of the rows emitted for one (symbol, interval).
+
+    Parameters:
+    -----------
+    starts: np.ndarray
+        int64 first timestamp of every block
+    ends: np.ndarray
+        int64 exclusive end timestamp of every block
+    counts: np.ndarray
+        number of rows per block
+    hashes: np.ndarray
+        uint64 sum of the row hashes per block
+    """
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        counts: np.ndarray,
+        hashes: np.ndarray,
+    ):
+        self.starts = starts
+        self.ends = ends
+        self.counts = counts
+        self.hashes = hashes
+
+    @property
+    def last(self) -> Optional[int]:
+        # LAST EMITTED TIMESTAMP
+        return int(self.ends[-1]) - 1 if self.ends.size else None
+
+    @classmethod
+    def build(
+        cls, stamps: np.ndarray, hashes: np.ndarray, block: int, tail: int
+    ) -> "Fingerprint":
+        """
+        Fingerprint sorted rows, the last ``tail`` rows get
+        one block each, older rows blocks of ``block`` rows.
+        """
+        size = stamps.size
+        split = max(size - tail, 0)
+        positions = np.concatenate(
+            [np.arange(0, split, block), np.arange(split, size)]
+        ).astype(np.int64)
+        starts = stamps[positions]
+        return cls(
+            starts,
+            np.append(starts[1:], stamps[-1:] + 1),
+            np.diff(np.append(positions, size)),
+            np.add.reduceat(hashes, positions) if size else hashes[:0],
+        )
+
+    def changed(self, stamps: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        """
+        Boolean mask of new or revised rows.
+
+        Parameters:
+        -----------
+        stamps: np.ndarray
+            sorted int64 timestamps of the fetched rows
+        hashes: np.ndarray
+            uint64 row hashes
+
+        return: np.ndarray
+        """
+        if not self.starts.size or not stamps.size:
+            return np.ones(stamps.size, dtype=bool)
+
+        # BLOCK SUMS OF THE FETCHED ROWS, UINT64 WRAPS LIKE THE STORED SUMS
+        cumulative = np.concatenate(
+            [np.zeros(1, np.uint64), np.cumsum(hashes, dtype=np.uint64)]
+        )
+        lo = np.searchsorted(stamps, self.starts, side="left")
+        hi = np.searchsorted(stamps, self.ends, side="left")
+        sums = cumulative[hi] - cumulative[lo]
+
+        # BLOCKS NOT FULLY INSIDE THE FETCHED WINDOW CAN NOT BE
+        # COMPARED, THEIR FETCHED ROWS COUNT AS REVISED
+        inside = (self.starts >= stamps[0]) & (self.ends <= stamps[-1] + 1)
+        revised = ~inside | (hi - lo != self.counts) | (sums != self.hashes)
+
+        # ROWS OUTSIDE ALL BLOCKS ARE NEW
+        return (_cover(lo, hi, stamps.size) == 0) | (
+            _cover(lo[revised], hi[revised], stamps.size) > 0
+        )
+
+    def merge(
+        self, other: "Fingerprint", stamps: np.ndarray, hashes: np.ndarray
+    ) -> "Fingerprint":
+        """
+        Fingerprint of a new fetch, keeping the blocks
+        of history outside its window.
+
+        Parameters:
+        -----------
+        other: Fingerprint
+            fingerprint of the fetched rows
+        stamps: np.ndarray
+            sorted int64 timestamps of the fetched rows
+        hashes: np.ndarray
+            uint64 row hashes
+
+        return: Fingerprint
+        """
+        if not other.starts.size:
+            return self
+        before = self.starts < other.starts[0]
+        after = self.starts >= other.ends[-1]
+        starts, ends, counts, sums = (
+            mine[before] for mine in (self.starts, self.ends, self.counts, self.hashes)
+        )
+
+        # A BLOCK STRADDLING THE WINDOW START IS CUT AT THE WINDOW, THE
+        # FETCHED ROWS ARE TAKEN OFF ITS ROW COUNT AND HASH SUM
+        if ends.size and ends[-1] > other.starts[0]:
+            n = np.searchsorted(stamps, ends[-1], side="left")
+            ends[-1] = other.starts[0]
+            counts[-1] -= n
+            sums[-1:] -= np.sum(hashes[:n], dtype=np.uint64)
+
+        return Fingerprint(
+            *(
+                np.concatenate([mine, theirs, rest[after]])
+                for mine, theirs, rest in (
+                    (starts, other.starts, self.starts),
+                    (ends, other.ends, self.ends),
+                    (counts, other.counts, self.counts),
+                    (sums, other.hashes, self.hashes),
+                )
+            )
+        )
+
+    def to_list(self) -> list:
+        return [
+            self.starts.tolist(),
+            self.ends.tolist(),
+            self.counts.tolist(),
+            [int(h) for h in self.hashes],
+        ]
+
+    @classmethod
+    def from_list(cls, state: list) -> "Fingerprint":
+        starts, ends, counts, hashes = state
+        return cls(
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64),
+            np.array(counts, dtype=np.int64),
+            np.array(hashes, dtype=np.uint64),
+        )
+
+
+class ChangeFeed:
+    """
+    Differential view on consecutive ``YahooManual.get`` results.
+
+    Parameters:
+    -----------
+    block: int
+        rows per block for older history
+    tail: int
+        number of most recent rows fingerprinted one by one
+    """
+
+    def __init__(self, block: int = 64, tail: int = 32):
+        self.block = block
+        self.tail = tail
+        self._prices: Dict[Tuple[str, str], Fingerprint] = {}
+        self._actions: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def diff_prices(self, interval: str, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        New or revised rows of a price frame.
+        """
+        if prices is None or prices.empty or "symbol" not in prices.columns:
+            return prices
+
+        key = (prices["symbol"].iat[0], interval)
+        stamps = to_epoch_seconds(prices.index)
+        hashes = _row_hashes(prices)
+
+        old = self._prices.get(key)
+        mask = (
+            np.ones(stamps.size, dtype=bool)
+            if old is None
+            else old.changed(stamps, hashes)
+        )
+
+        current = Fingerprint.build(stamps, hashes, self.block, self.tail)
+        self._prices[key] = (
+            current if old is None else old.merge(current, stamps, hashes)
+        )
+
+        self.rows_in += stamps.size
+        self.rows_out += int(mask.sum())
+        return prices[mask]
+
+    def diff_actions(self, kind: str, frame: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        New or revised dividend or split records,
+        None if there are none.
+        """
+        if frame is None or frame.empty:
+            return None
+
+        hashes = _row_hashes(frame)
+        mask = np.zeros(len(frame), dtype=bool)
+        for i, (date, symbol, value) in enumerate(
+            zip(frame.index, frame["symbol"], hashes.tolist())
+        ):
+            seen = self._actions.setdefault((symbol, kind), {})
+            if seen.get(date) != value:
+                seen[date] = value
+                mask[i] = True
+
+        if not mask.any():
+            return None
+        return frame[mask]
+
+    def diff(self, result: tuple) -> tuple:
+        """
+        Changes of one (interval, prices, dividends, splits) result,
+        in the same layout. Prices without changes are returned as
+        an empty frame, actions without changes as None.
+        """
+        interval, prices, dividends, splits = result
+        return (
+            interval,
+            self.diff_prices(interval, prices),
+            self.diff_actions("dividends", dividends),
+            self.diff_actions("splits", splits),
+        )
+
+    def changes(self, results: List[tuple]) -> List[tuple]:
+        """
+        Changes of the output of ``YahooManual.get``.
+
+        Parameters:
+        -----------
+        results: list
+            ((interval, prices, dividends, splits), summary) tuples
+
+        return: list
+            tuples of the same layout holding only changed rows
+        """
+        return [(self.diff(prices), summary) for prices, summary in results]
+
+    def save(self, path: str) -> None:
+        """
+        Persist the fingerprints as json, so consecutive
+        refresh jobs continue the feed.
+        """
+        state = {
+            "block": self.block,
+            "tail": self.tail,
+            "prices": [[s, i, fp.to_list()] for (s, i), fp in self._prices.items()],
+            "actions": [[s, k, seen] for (s, k), seen in self._actions.items()],
+        }
+        with open(path, "w") as f:
+            json.dump(state, f)
+
+    def load(self, path: str) -> None:
+        with open(path) as f:
+            state = json.load(f)
+        self.block = state.get("block", self.block)
+        self.tail = state.get("tail", self.tail)
+        self._prices.update(
+            {(s, i): Fingerprint.from_list(fp) for s, i, fp in state.get("prices", [])}
+        )
+        self._actions.update({(s, k): seen for s, k, seen in state.get("actions", [])})
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*
+"""
+Streaming Excel export.
+
+Results are written into an xlsxwriter workbook opened in
+constant-memory mode: every row is flushed to a temporary file as
+soon as the next row starts, so memory use does not grow with
+the number of sheets. Each (symbol, interval) gets its own price
+sheet, dividends and splits of all symbols are collected in one
+sheet each.
+
+Every constant-memory sheet keeps its temporary file open until the
+workbook is closed. To stay below the open file limit the export
+rolls over to a new workbook (out.xlsx, out-2.xlsx, ...) every
+max_sheets price sheets.
+"""
+
+import asyncio
+import os
+import re
+from typing import Iterable, List, Optional, Sequence
+
+from .PanelTools import default_fields
+
+# EXCEL LIMITS ON SHEET NAMES
+max_sheet_name = 31
+_invalid_sheet_chars = re.compile(r"[\[\]:*?/\\]")
+
+# PRICE SHEETS PER WORKBOOK, EACH HOLDS AN OPEN TEMPORARY FILE
+default_max_sheets = 500
+# FILES KEPT FREE FOR THE INTERPRETER, SOCKETS AND THE ZIP WRITER
+_reserved_files = 64
+
+
+def open_file_limit() -> Optional[int]:
+    """
+    Soft limit of open files of the process, None
+    where it is unknown or unlimited.
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - WINDOWS
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else soft
+
+
+class ExcelExporter:
+    """
+    Constant-memory workbook writer for parsed prices.
+
+    Parameters:
+    -----------
+    path: str
+        xlsx file to create
+    fields: list
+        price columns written to the symbol sheets
+    actions: bool
+        also write "dividends" and "splits" sheets, one pair
+        per workbook
+    max_sheets: int
+        price sheets per workbook before rolling over to the
+        next file, must leave room below the open file limit
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fields: Sequence[str] = default_fields,
+        actions: bool = True,
+        max_sheets: int = default_max_sheets,
+    ):
+        if max_sheets < 1:
+            raise ValueError("max_sheets must be positive")
+        limit = open_file_limit()
+        if limit is not None and max_sheets + 2 + _reserved_files > limit:
+            raise ValueError(
+                f"max_sheets={max_sheets} exceeds the open file limit {limit}, "
+                f"use at most {max(limit - 2 - _reserved_files, 0)} sheets "
+                "per workbook or raise the limit (ulimit -n)"
+            )
+
+        self.path = path
+        self.fields = list(fields)
+        self.max_sheets = max_sheets
+        self.paths: List[str] = []
+        self._with_actions = actions
+        self._workbook = None
+        self.sheets = 0
+        self.rows = 0
+        self._open()
+
+    def _open(self) -> None:
+        import xlsxwriter
+
+        if self._workbook is not None:
+            self._workbook.close()
+
+        path = self.path
+        if self.paths:
+            root, ext = os.path.splitext(self.path)
+            path = f"{root}-{len(self.paths) + 1}{ext}"
+        self.paths.append(path)
+
+        self._workbook = xlsxwriter.Workbook(
+            path, {"constant_memory": True, "nan_inf_to_errors": True}
+        )
+        self._names = set()
+        self._actions = {}
+        self._part_sheets = 0
+
+        if self._with_actions:
+            for name, columns in (
+                ("dividends", ["date", "symbol", "dividends"]),
+                ("splits", ["date", "symbol", "splits"]),
+            ):
+                sheet = self._add_sheet(name)
+                sheet.write_row(0, 0, columns)
+                self._actions[name] = [sheet, 1]
+
+    def _add_sheet(self, name: str):
+        self._names.add(name.lower())
+        return self._workbook.add_worksheet(name)
+
+    def sheet_name(self, symbol: str, interval: str) -> str:
+        """
+        Valid and unique sheet name for a symbol and interval.
+        """
+        suffix = f" {interval}"
+        base = _invalid_sheet_chars.sub("_", str(symbol)).strip("'")
+        name = base[: max_sheet_name - len(suffix)] + suffix
+
+        # SHEET NAMES ARE CASE INSENSITIVE
+        count = 1
+        while name.lower() in self._names:
+            tag = f"~{count}{suffix}"
+            name = base[: max_sheet_name - len(tag)] + tag
+            count += 1
+        return name
+
+    def write_prices(self, interval: str, prices) -> Optional[str]:
+        """
+        Write a price frame to a new sheet, row by row.
+
+        Parameters:
+        -----------
+        interval: str
+            interval of the prices
+        prices: pd.DataFrame
+            frame from parse_quotes_as_frame
+
+        return: str
+            name of the sheet in the current workbook, None if
+            there was nothing to write
+        """
+        if prices is None or prices.empty or "symbol" not in prices.columns:
+            return None
+
+        if self._part_sheets >= self.max_sheets:
+            self._open()
+        name = self.sheet_name(prices["symbol"].iat[0], interval)
+        sheet = self._add_sheet(name)
+        self._part_sheets += 1
+
+        fields = [f for f in self.fields if f in prices.columns]
+        sheet.write_row(0, 0, [prices.index.name or "date"] + fields)
+
+        # DIRECT TYPED WRITES - NO PER CELL TYPE DISPATCH
+        write_string = sheet.write_string
+        write_number = sheet.write_number
+        columns = [prices[f].to_numpy(dtype=float).tolist() for f in fields]
+        for row, (stamp, *values) in enumerate(zip(prices.index, *columns), 1):
+            write_string(row, 0, stamp)
+            for col, value in enumerate(values, 1):
+                write_number(row, col, value)
+
+        self.sheets += 1
+        self.rows += len(prices)
+        return name
+
+    def write_actions(self, kind: str, frame) -> int:
+        """
+        Append dividends or splits to their sheet.
+
+        return: int
+            number of rows written
+        """
+        if kind not in self._actions or frame is None or frame.empty:
+            return 0
+
+        sheet, row = self._actions[kind]
+        for date, symbol, value in zip(frame.index, frame["symbol"], frame[kind]):
+            sheet.write_string(row, 0, date)
+            sheet.write_string(row, 1, symbol)
+            sheet.write_number(row, 2, float(value))
+            row += 1
+
+        written = row - self._actions[kind][1]
+        self._actions[kind][1] = row
+        return written
+
+    def write(self, result: tuple) -> Optional[str]:
+        """
+        Write one (interval, prices, dividends, splits) result.
+        """
+        interval, prices, dividends, splits = result
+        name = self.write_prices(interval, prices)
+        self.write_actions("dividends", dividends)
+        self.write_actions("splits", splits)
+        return name
+
+    def write_results(self, results: Iterable[tuple]) -> List[Optional[str]]:
+        """
+        Write the output of ``YahooManual.get``.
+
+        Parameters:
+        -----------
+        results: list
+            ((interval, prices, dividends, splits), summary) tuples
+
+        return: list
+            sheet names
+        """
+        return [self.write(prices) for prices, _ in results]
+
+    def close(self) -> None:
+        self._workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def stream_excel(
+    symbols: List[str],
+    path: str,
+    period="max",
+    interval="1d",
+    start=None,
+    end=None,
+    batch_size: int = 100,
+    session=None,
+    timeout=None,
+    backend: str = "aiohttp",
+    **kwargs,
+) -> ExcelExporter:
+    """
+    Download symbols in batches and stream them into a workbook.
+    Writing a batch overlaps with the download of the next one,
+    at most two batches are held in memory.
+
+    Parameters:
+    -----------
+    symbols: list
+        yahoo symbols
+    path: str
+        xlsx file to create
+    period, interval, start, end:
+        as in ``YahooManual.get``
+    batch_size: int
+        number of symbols per download batch
+    session: ClientSession
+        optional shared aiohttp session
+    timeout: float
+        total seconds per request of the session created
+        when none is given
+    backend: str
+        HTTP client of the session created when none is
+        given ("aiohttp", "httpx")
+    kwargs:
+        passed to ExcelExporter
+
+    return: ExcelExporter
+        the closed exporter, with sheet and row counts
+    """
+    from ..YPipeline import Symbols, YahooManual
+    from .PriorityTools import PrioritySemaphore
+    from .TransportTools import create_session
+
+    loop = asyncio.get_event_loop()
+    sem = PrioritySemaphore(1000)
+
+    async def download(batch, session):
+        manual = YahooManual(Symbols(batch), session=session, semaphore=sem)
+        return await manual.get(batch, period, interval, start, end)
+
+    async def run(session):
+        with ExcelExporter(path, **kwargs) as exporter:
+            pending = None
+            for i in range(0, len(symbols), batch_size):
+                task = asyncio.ensure_future(
+                    download(list(symbols[i : i + batch_size]), session)
+                )
+                if pending is not None:
+                    # WORKBOOK WRITES RUN OFF THE EVENT LOOP
+                    await loop.run_in_executor(None, exporter.write_results, pending)
+                pending = await task
+            if pending is not None:
+                await loop.run_in_executor(None, exporter.write_results, pending)
+        return exporter
+
+    if session is not None:
+        return await run(session)
+    async with create_session(backend, timeout) as session:
+        return await run(session)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*
+"""
+Currency normalization of parsed prices.
+
+Every parsed frame carries the currency of its listing. Prices
+and dividends are converted to one base currency with the FX
+close of the pair (for example EURUSD=X for EUR to USD) as of
+each bar: a single binary search aligns all bars of a frame on
+the FX timestamps, the price columns are multiplied in one pass.
+FX series are fetched once per pair and interval and cached.
+
+Minor units:
+------------
+Listings quoted in pence or cents (GBp, ZAc, ILA) are scaled
+to the major currency before conversion.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import to_epoch_seconds
+from .QueryTools import PriceIndex
+
+# YAHOO MINOR UNIT CODE -> (MAJOR CURRENCY, FACTOR)
+minor_units = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ZAc": ("ZAR", 0.01),
+    "ILA": ("ILS", 0.01),
+}
+
+# COLUMNS IN UNITS OF THE LISTING CURRENCY
+price_columns = ("open", "high", "low", "close", "adjclose")
+dividend_columns = ("dividends",)
+
+
+def major_currency(currency: str) -> Tuple[str, float]:
+    """
+    return: tuple
+        (major currency, factor of one quoted unit)
+    """
+    return minor_units.get(currency, (currency, 1.0))
+
+
+def fx_symbol(currency: str, base: str) -> str:
+    """
+    Yahoo symbol of the pair quoting currency in base.
+    """
+    return f"{currency}{base}=X"
+
+
+def frame_currency(frame: Optional[pd.DataFrame]) -> Optional[str]:
+    if frame is None or frame.empty or "currency" not in frame.columns:
+        return None
+    currency = frame["currency"].iat[0]
+    return currency if isinstance(currency, str) else None
+
+
+class FxConverter:
+    """
+    Converts parse_prices results to a base currency.
+
+    Parameters:
+    -----------
+    base: str
+        ISO code of the target currency
+    """
+
+    def __init__(self, base: str = "USD"):
+        if base in minor_units:
+            raise ValueError(f"Base currency {base} is a minor unit")
+        self.base = base
+        # FX CLOSE PER (PAIR, INTERVAL)
+        self._rates = PriceIndex(fields=["close"])
+
+    def pair(self, currency: str) -> Optional[str]:
+        """
+        FX symbol needed for currency, None if no
+        rate has to be fetched.
+        """
+        major, _ = major_currency(currency)
+        if major == self.base:
+            return None
+        return fx_symbol(major, self.base)
+
+    def add(self, interval: str, prices: pd.DataFrame) -> None:
+        """
+        Add or merge a parsed FX series into the cache.
+        """
+        self._rates.add(interval, prices)
+
+    def covers(self, pair: str, interval: str, start: int, end: int) -> bool:
+        """
+        True if the cached series of pair spans [start, end].
+        """
+        if (pair, interval) not in self._rates:
+            return False
+        stamps = self._rates.series(pair, interval).timestamps
+        return bool(stamps.size) and stamps[0] <= start and stamps[-1] >= end
+
+    def rates(
+        self, currency: str, interval: str, stamps: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Base currency value of one quoted unit at each timestamp,
+        the last FX close at or before the timestamp (the first
+        one for earlier timestamps).
+
+        return: np.ndarray
+            float64 rates, None if no FX series is cached
+        """
+        major, factor = major_currency(currency)
+        pair = self.pair(currency)
+        if pair is None:
+            return np.full(stamps.size, factor)
+        if (pair, interval) not in self._rates:
+            return None
+
+        series = self._rates.series(pair, interval)
+        valid = ~np.isnan(series.values[0])
+        fx_stamps, fx_close = series.timestamps[valid], series.values[0][valid]
+        if not fx_stamps.size:
+            return None
+
+        idx = np.searchsorted(fx_stamps, stamps, side="right") - 1
+        np.clip(idx, 0, None, out=idx)
+        return fx_close[idx] * factor
+
+    def _convert_frame(
+        self, frame: pd.DataFrame, interval: str, columns: Tuple[str, ...]
+    ) -> Optional[pd.DataFrame]:
+        currency = frame_currency(frame)
+        if currency is None or currency == self.base:
+            return frame
+
+        rate = self.rates(currency, interval, to_epoch_seconds(frame.index))
+        if rate is None:
+            return None
+
+        columns = [c for c in columns if c in frame.columns]
+        values = frame[columns].to_numpy(dtype=np.float64) * rate[:, None]
+        # NEW FRAME - THE PARSED ONE IS NOT MODIFIED
+        return frame.assign(
+            currency=self.base,
+            **{c: values[:, i] for i, c in enumerate(columns)},
+        )
+
+    def convert(self, result: tuple) -> tuple:
+        """
+        Convert prices and dividends of a parse_prices result.
+        Results without a cached FX series are returned in
+        their listing currency.
+
+        Parameters:
+        -----------
+        result: tuple
+            (interval, prices, dividends, splits)
+        return: tuple
+            (interval, prices, dividends, splits)
+        """
+        interval, prices, dividends, splits = result
+        currency = frame_currency(prices)
+        if interval is None or currency is None or currency == self.base:
+            return result
+
+        converted = self._convert_frame(prices, interval, price_columns)
+        if converted is None:
+            return result
+        if dividends is not None:
+            dividends = self._convert_frame(dividends, interval, dividend_columns)
+            if dividends is None:
+                return result
+        return interval, converted, dividends, splits
+
+    async def aconvert(
+        self,
+        result: tuple,
+        fetch: Callable[[str, str], Awaitable[tuple]],
+        pending: Dict[Tuple[str, str], asyncio.Future],
+    ) -> tuple:
+        """
+        convert, fetching the FX series first if the cache
+        does not cover the bars of result.
+
+        Parameters:
+        -----------
+        result: tuple
+            (interval, prices, dividends, splits)
+        fetch: Callable
+            coroutine function (pair, interval) returning the
+            parse_prices result of the pair
+        pending: dict
+            FX downloads of the current batch, every pair is
+            requested at most once per batch
+        """
+        interval, prices = result[0], result[1]
+        currency = frame_currency(prices)
+        if interval is None or currency is None or currency == self.base:
+            return result
+
+        pair = self.pair(currency)
+        if pair is not None:
+            stamps = to_epoch_seconds(prices.index)
+            key = (pair, interval)
+            if key in pending or not self.covers(pair, interval, stamps[0], stamps[-1]):
+                if key not in pending:
+                    pending[key] = asyncio.ensure_future(self._fetch(fetch, key))
+                await pending[key]
+
+        return self.convert(result)
+
+    async def _fetch(self, fetch, key: Tuple[str, str]) -> None:
+        interval, prices, _, _ = await fetch(*key)
+        if interval is not None and prices is not None:
+            self.add(key[1], prices)
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*
+"""
+Gap detection and targeted backfill of missing bars.
+
+Parsed timestamps are compared with the expected bar grid of
+the interval within the trading sessions of the exchange. Missing
+windows are requested with small ``period1``/``period2`` requests
+and merged into the existing frame.
+"""
+
+import asyncio
+from asyncio import Semaphore
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import ClientSession
+
+from .AsynchTools import aparse_prices
+from .CalendarTools import TradingSession
+from .ParseTools import merge_frames, to_epoch_seconds
+from .UrlTools import split_window
+
+# BAR LENGTH IN SECONDS OF THE INTERVALS WITH A REGULAR GRID
+interval_seconds = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "90m": 5400,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+
+def _trading_days(session: TradingSession, start: int, end: int) -> list:
+    day = datetime.fromtimestamp(start, session.tz).date()
+    last_day = datetime.fromtimestamp(end, session.tz).date()
+    days = []
+    while day <= last_day:
+        if session.is_trading_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def expected_grid(
+    session: TradingSession, interval: str, start: int, end: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expected bar slots of an interval in the window [start, end).
+
+    Intraday slots start at the session open and step by the
+    bar length up to the session close. Daily slots span the
+    local calendar day of every trading day.
+
+    Parameters:
+    -----------
+    session: TradingSession
+        trading session of the exchange
+    interval: str
+        price time-series interval
+    start: int
+        unix timestamp of window start
+    end: int
+        unix timestamp of window end
+
+    return: Tuple
+        (slot starts, slot ends) as int64 unix timestamps
+    """
+    if interval not in interval_seconds:
+        raise ValueError(f"No regular bar grid for interval {interval}")
+
+    days = _trading_days(session, start, end)
+    if not days:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    if interval == "1d":
+        starts = np.array(
+            [
+                datetime.combine(d, datetime.min.time(), tzinfo=session.tz).timestamp()
+                for d in days
+            ],
+            dtype=np.int64,
+        )
+        ends = np.array(
+            [
+                datetime.combine(
+                    d + timedelta(days=1), datetime.min.time(), tzinfo=session.tz
+                ).timestamp()
+                for d in days
+            ],
+            dtype=np.int64,
+        )
+    else:
+        step = interval_seconds[interval]
+        opens = np.array(
+            [
+                datetime.combine(d, session.open, tzinfo=session.tz).timestamp()
+                for d in days
+            ],
+            dtype=np.int64,
+        )
+        closes = np.array(
+            [
+                datetime.combine(d, session.close, tzinfo=session.tz).timestamp()
+                for d in days
+            ],
+            dtype=np.int64,
+        )
+        nbars = int(np.max(closes - opens)) // step + 1
+        slots = opens[:, None] + step * np.arange(nbars, dtype=np.int64)[None, :]
+        mask = slots < closes[:, None]
+        starts = slots[mask]
+        ends = np.minimum(starts + step, np.repeat(closes, mask.sum(axis=1)))
+
+    keep = (ends > start) & (starts < end)
+    return starts[keep], ends[keep]
+
+
+def find_gaps(
+    timestamps: np.ndarray,
+    session: TradingSession,
+    interval: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    min_bars: int = 1,
+) -> List[Tuple[int, int]]:
+    """
+    Vectorized detection of missing bars.
+
+    Every observed timestamp fills the grid slot it falls in,
+    consecutive empty slots are merged into one window.
+
+    Parameters:
+    -----------
+    timestamps: np.ndarray
+        observed bar timestamps (unix seconds)
+    session: TradingSession
+        trading session of the exchange
+    interval: str
+        price time-series interval
+    start: int
+        window start, defaults to the first observed bar
+    end: int
+        window end, defaults to the end of the last observed bar
+    min_bars: int
+        minimal number of consecutive missing bars to report
+
+    return: list
+        missing (period1, period2) windows
+    """
+    if interval not in interval_seconds:
+        raise ValueError(f"No regular bar grid for interval {interval}")
+
+    timestamps = np.sort(np.asarray(timestamps, dtype=np.int64))
+    if start is None or end is None:
+        if timestamps.size == 0:
+            return []
+        start = int(timestamps[0]) if start is None else start
+        end = int(timestamps[-1]) + interval_seconds[interval] if end is None else end
+
+    starts, ends = expected_grid(session, interval, start, end)
+    if starts.size == 0:
+        return []
+
+    filled = np.zeros(starts.size, dtype=bool)
+    slot = np.searchsorted(starts, timestamps, side="right") - 1
+    inside = (slot >= 0) & (timestamps < ends[np.clip(slot, 0, None)])
+    filled[slot[inside]] = True
+
+    missing = np.flatnonzero(~filled)
+    if missing.size == 0:
+        return []
+
+    # SPLIT MISSING SLOTS INTO RUNS OF CONSECUTIVE GRID POSITIONS
+    breaks = np.flatnonzero(np.diff(missing) != 1) + 1
+    first = missing[np.r_[0, breaks]]
+    last = missing[np.r_[breaks - 1, missing.size - 1]]
+    runs = (last - first + 1) >= min_bars
+
+    return [
+        (int(max(starts[i], start)), int(min(ends[j], end)))
+        for i, j in zip(first[runs], last[runs])
+    ]
+
+
+def gap_params(gaps: List[Tuple[int, int]], interval: str) -> List[dict]:
+    """
+    Generate request parameters for missing windows, windows
+    larger than the server maximum for the interval are split.
+
+    Parameters:
+    -----------
+    gaps: list
+        (period1, period2) windows
+    interval: str
+        price time-series interval
+
+    return: list
+        list of dictionaries with parameter settings
+    """
+    paramslist = []
+    for gap in gaps:
+        for period1, period2 in split_window(gap[0], gap[1], interval):
+            params = {"period1": period1, "period2": period2}
+            params["includePrePost"] = 1
+            params["events"] = "div,splits"
+            params["interval"] = interval
+            paramslist.append(params)
+    return paramslist
+
+
+def merge_quotes(quotes: pd.DataFrame, frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merge backfilled frames into the existing frame, rows of
+    the backfill win on duplicated index values.
+    """
+    merged = merge_frames([quotes] + list(frames))
+    return quotes if merged is None else merged
+
+
+async def backfill(
+    sem: Semaphore,
+    url: str,
+    quotes: pd.DataFrame,
+    interval: str,
+    trading_session: TradingSession,
+    session: ClientSession,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    min_bars: int = 1,
+) -> Tuple[pd.DataFrame, List[Tuple[int, int]]]:
+    """
+    Detect missing bars in a parsed price frame and request
+    only the missing windows.
+
+    Parameters:
+    -----------
+    sem: Semaphore
+        internal counter for open files
+    url: str
+        chart url of the symbol
+    quotes: pd.DataFrame
+        frame from parse_quotes_as_frame
+    interval: str
+        price time-series interval
+    trading_session: TradingSession
+        trading session of the exchange
+    session: ClientSession
+        aiohttp client session
+    start: int
+        optional window start (unix seconds)
+    end: int
+        optional window end (unix seconds)
+    min_bars: int
+        minimal number of consecutive missing bars to request
+
+    return: Tuple
+        (merged frame, missing windows detected)
+    """
+    gaps = find_gaps(
+        to_epoch_seconds(quotes.index, trading_session.timezone),
+        trading_session,
+        interval,
+        start,
+        end,
+        min_bars,
+    )
+    if not gaps:
+        return quotes, gaps
+
+    tasks = [
+        aparse_prices(sem, (url, params), session)
+        for params in gap_params(gaps, interval)
+    ]
+    results = await asyncio.gather(*tasks)
+
+    return merge_quotes(quotes, [r[1] for r in results]), gaps
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*
+"""
+Negative cache of invalid or delisted symbols.
+
+Chart responses rejected with a "not found" error or without any
+result mark the symbol as failing. A failing symbol is skipped
+until its next re-check, the re-check interval doubles with every
+consecutive failed run. A run counts at most one failure per
+symbol, however many requests (intervals, chunks) it made for it.
+Any valid response clears the symbol, entries without a new
+failure expire after a fixed time.
+"""
+
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+# REASON CODES OF validate_chart (AND HTTP STATUS) POINTING AT THE SYMBOL
+dead_reasons = frozenset(["error:Not Found", "error:404", "empty"])
+# REASON CODES OF A VALID RESPONSE
+valid_reasons = frozenset([None, "no_data"])
+
+
+class SymbolHealth:
+    """
+    Persistent per-symbol failure registry.
+
+    Parameters:
+    -----------
+    base_interval: float
+        seconds until the first re-check
+    max_interval: float
+        upper bound of the re-check interval
+    expire: float
+        seconds after the last failure after which an
+        entry is forgotten
+    """
+
+    def __init__(
+        self,
+        base_interval: float = 3600.0,
+        max_interval: float = 30 * 86400.0,
+        expire: float = 90 * 86400.0,
+    ):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.expire = expire
+        # SYMBOL -> [FAILURES, LAST FAILURE, NEXT CHECK, LAST REASON]
+        self._entries: Dict[str, list] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+
+    def failure(self, symbol: str, reason: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        entry = self._entries.get(symbol)
+        failures = 1 if entry is None else entry[0] + 1
+        wait = min(self.base_interval * 2 ** (failures - 1), self.max_interval)
+        self._entries[symbol] = [failures, now, now + wait, reason]
+
+    def success(self, symbol: str) -> None:
+        self._entries.pop(symbol, None)
+
+    def update(self, url: str, reason: Optional[str]) -> None:
+        """
+        Status hook for aparse_prices: reason code of a rejected
+        response, None for a valid one. Each call is a run of its
+        own, use collect and record for runs of several requests.
+        """
+        self.record({url.split("/")[-1]: [reason]})
+
+    def collect(
+        self, statuses: Dict[str, list]
+    ) -> Callable[[str, Optional[str]], None]:
+        """
+        Status hook for aparse_prices appending the reason codes
+        of one run to statuses (symbol -> reasons), to be
+        applied once with record after the run.
+        """
+
+        def hook(url: str, reason: Optional[str]) -> None:
+            statuses.setdefault(url.split("/")[-1], []).append(reason)
+
+        return hook
+
+    def record(self, statuses: Dict[str, list], now: Optional[float] = None) -> None:
+        """
+        Apply the reason codes of one run. A symbol with any valid
+        response is cleared, otherwise a dead reason counts as a
+        single failure.
+        """
+        for symbol, reasons in statuses.items():
+            if valid_reasons.intersection(reasons):
+                self.success(symbol)
+                continue
+            dead = [reason for reason in reasons if reason in dead_reasons]
+            if dead:
+                self.failure(symbol, dead[-1], now)
+
+    def is_blocked(self, symbol: str, now: Optional[float] = None) -> bool:
+        """
+        True if the symbol failed and its re-check is not due.
+        """
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return False
+        now = time.time() if now is None else now
+        if now - entry[1] > self.expire:
+            del self._entries[symbol]
+            return False
+        return now < entry[2]
+
+    def filter(self, symbols: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """
+        Symbols that are not blocked.
+        """
+        now = time.time() if now is None else now
+        return [s for s in symbols if not self.is_blocked(s, now)]
+
+    def report(self) -> Dict[str, dict]:
+        """
+        Failing symbols with failure count, next re-check
+        and last reason code.
+        """
+        return {
+            symbol: {"failures": f, "last": last, "next_check": nxt, "reason": reason}
+            for symbol, (f, last, nxt, reason) in self._entries.items()
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Persist the registry as json, so consecutive runs
+        share it.
+        """
+        with open(path, "w") as f:
+            json.dump(self._entries, f)
+
+    def load(self, path: str) -> None:
+        with open(path) as f:
+            self._entries.update(json.load(f))
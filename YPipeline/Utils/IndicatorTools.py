@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*
+"""
+Incremental technical indicators.
+
+Every indicator keeps a constant size state per (symbol, interval).
+The first frame of a series bootstraps the state with vectorized
+numpy/pandas operations over the whole history, later frames only
+feed their bars newer than the last applied one, each in O(1).
+The state before the last bar is kept, so a revised last bar (a
+bar still forming on refresh) is re-applied instead of ignored.
+Bars with a missing input value yield NaN and leave the state
+unchanged.
+"""
+
+import copy
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import to_epoch_seconds
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sum over the last window values, NaN for the first window-1.
+    """
+    out = np.full(values.size, np.nan)
+    if values.size >= window:
+        c = np.concatenate([[0.0], np.cumsum(values)])
+        out[window - 1 :] = c[window:] - c[:-window]
+    return out
+
+
+def _divide(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b != 0, a / np.where(b != 0, b, 1), np.nan)
+
+
+class Indicator(ABC):
+    """
+    Base class of incremental indicators.
+
+    fields: tuple
+        price columns read by the indicator, "session" is the
+        trading date of a bar
+    """
+
+    fields: Tuple[str, ...] = ("close",)
+
+    @abstractmethod
+    def bootstrap(self, data: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Values over a history of bars, leaves the state
+        ready for the bar after the last one.
+        """
+
+    @abstractmethod
+    def update(self, bar: Dict[str, float]) -> float:
+        """
+        Value after one new bar.
+        """
+
+
+class SMA(Indicator):
+    """
+    Simple moving average over window bars.
+    """
+
+    def __init__(self, window: int = 20, field: str = "close"):
+        self.window = window
+        self.fields = (field,)
+        self._values: deque = deque(maxlen=window)
+        self._total = 0.0
+
+    def bootstrap(self, data):
+        x = data[self.fields[0]]
+        self._values.extend(x[-self.window :])
+        self._total = float(np.sum(self._values))
+        return _rolling_sum(x, self.window) / self.window
+
+    def update(self, bar):
+        value = bar[self.fields[0]]
+        if len(self._values) == self.window:
+            self._total -= self._values[0]
+        self._values.append(value)
+        self._total += value
+        if len(self._values) < self.window:
+            return np.nan
+        return self._total / self.window
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average, pandas ewm(span, adjust=False).
+    """
+
+    def __init__(self, span: int = 20, field: str = "close"):
+        self.alpha = 2.0 / (span + 1)
+        self.fields = (field,)
+        self._last = np.nan
+
+    def bootstrap(self, data):
+        x = data[self.fields[0]]
+        out = pd.Series(x).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        if out.size:
+            self._last = out[-1]
+        return out
+
+    def update(self, bar):
+        value = bar[self.fields[0]]
+        if np.isnan(self._last):
+            self._last = value
+        else:
+            self._last += self.alpha * (value - self._last)
+        return self._last
+
+
+class VWAP(Indicator):
+    """
+    Volume weighted typical price (high + low + close) / 3,
+    restarting every session, or over the last window bars.
+    """
+
+    fields = ("high", "low", "close", "volume", "session")
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window
+        self._session = None
+        self._pv: deque = deque(maxlen=window)
+        self._v: deque = deque(maxlen=window)
+        self._spv = 0.0
+        self._sv = 0.0
+
+    def bootstrap(self, data):
+        pv = (data["high"] + data["low"] + data["close"]) / 3 * data["volume"]
+        v = data["volume"].astype(np.float64)
+        if not v.size:
+            return np.full(0, np.nan)
+
+        if self.window is not None:
+            self._pv.extend(pv[-self.window :])
+            self._v.extend(v[-self.window :])
+            self._spv, self._sv = float(np.sum(self._pv)), float(np.sum(self._v))
+            return _divide(_rolling_sum(pv, self.window), _rolling_sum(v, self.window))
+
+        # CUMULATIVE SUMS RESTARTED AT EVERY SESSION CHANGE
+        session = data["session"]
+        start = np.concatenate([[True], session[1:] != session[:-1]])
+        first = np.maximum.accumulate(np.where(start, np.arange(v.size), 0))
+        cpv = np.concatenate([[0.0], np.cumsum(pv)])
+        cv = np.concatenate([[0.0], np.cumsum(v)])
+        spv = cpv[1:] - cpv[first]
+        sv = cv[1:] - cv[first]
+        self._session, self._spv, self._sv = session[-1], spv[-1], sv[-1]
+        return _divide(spv, sv)
+
+    def update(self, bar):
+        pv = (bar["high"] + bar["low"] + bar["close"]) / 3 * bar["volume"]
+        v = float(bar["volume"])
+        if self.window is not None:
+            if len(self._v) == self.window:
+                self._spv -= self._pv[0]
+                self._sv -= self._v[0]
+            self._pv.append(pv)
+            self._v.append(v)
+            if len(self._v) < self.window:
+                self._spv += pv
+                self._sv += v
+                return np.nan
+        elif bar["session"] != self._session:
+            self._session, self._spv, self._sv = bar["session"], 0.0, 0.0
+        self._spv += pv
+        self._sv += v
+        return self._spv / self._sv if self._sv else np.nan
+
+
+class ATR(Indicator):
+    """
+    Average true range with Wilder smoothing, seeded
+    with the mean true range of the first window bars.
+    """
+
+    fields = ("high", "low", "close")
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self._close = np.nan
+        self._count = 0
+        self._atr = 0.0
+
+    def _true_range(self, high, low, prev_close):
+        # FIRST BAR - NO PREVIOUS CLOSE
+        gap = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+        return np.fmax(high - low, gap)
+
+    def bootstrap(self, data):
+        high, low, close = data["high"], data["low"], data["close"]
+        out = np.full(close.size, np.nan)
+        if not close.size:
+            return out
+        prev = np.concatenate([[np.nan], close[:-1]])
+        tr = self._true_range(high, low, prev)
+
+        n = self.window
+        self._close = close[-1]
+        if tr.size < n:
+            self._count, self._atr = tr.size, float(np.sum(tr))
+            return out
+        seed = np.concatenate([[tr[:n].mean()], tr[n:]])
+        out[n - 1 :] = pd.Series(seed).ewm(alpha=1.0 / n, adjust=False).mean()
+        self._count, self._atr = n, out[-1]
+        return out
+
+    def update(self, bar):
+        tr = float(self._true_range(bar["high"], bar["low"], self._close))
+        self._close = bar["close"]
+        if self._count < self.window:
+            # SUM OF TRUE RANGES UNTIL THE SEED IS COMPLETE
+            self._count += 1
+            self._atr += tr
+            if self._count < self.window:
+                return np.nan
+            self._atr /= self.window
+            return self._atr
+        self._atr += (tr - self._atr) / self.window
+        return self._atr
+
+
+class Volatility(Indicator):
+    """
+    Sample standard deviation of log returns over window
+    returns, multiplied by sqrt(annualize) if given.
+    """
+
+    def __init__(
+        self, window: int = 20, field: str = "close", annualize: Optional[int] = None
+    ):
+        self.window = window
+        self.fields = (field,)
+        self.scale = 1.0 if annualize is None else np.sqrt(annualize)
+        self._close = np.nan
+        self._returns: deque = deque(maxlen=window)
+        self._s = 0.0
+        self._s2 = 0.0
+
+    def _std(self, s, s2):
+        n = self.window
+        var = np.maximum((s2 - s * s / n) / (n - 1), 0.0)
+        return np.sqrt(var) * self.scale
+
+    def bootstrap(self, data):
+        x = data[self.fields[0]]
+        out = np.full(x.size, np.nan)
+        if not x.size:
+            return out
+        self._close = x[-1]
+        r = np.log(x[1:] / x[:-1])
+        self._returns.extend(r[-self.window :])
+        self._s = float(np.sum(self._returns))
+        self._s2 = float(np.sum(np.square(self._returns)))
+        out[1:] = self._std(
+            _rolling_sum(r, self.window), _rolling_sum(r * r, self.window)
+        )
+        return out
+
+    def update(self, bar):
+        value = bar[self.fields[0]]
+        r = np.log(value / self._close)
+        self._close = value
+        if np.isnan(r):
+            return np.nan
+        if len(self._returns) == self.window:
+            old = self._returns[0]
+            self._s -= old
+            self._s2 -= old * old
+        self._returns.append(r)
+        self._s += r
+        self._s2 += r * r
+        if len(self._returns) < self.window:
+            return np.nan
+        return float(self._std(self._s, self._s2))
+
+
+default_indicators: Dict[str, Callable[[], Indicator]] = {
+    "sma_20": lambda: SMA(20),
+    "ema_20": lambda: EMA(20),
+    "vwap": lambda: VWAP(),
+    "atr_14": lambda: ATR(14),
+    "volatility_20": lambda: Volatility(20),
+}
+
+
+class _Track:
+    """
+    Indicator state and output of one (symbol, interval).
+    """
+
+    def __init__(self, indicators: Dict[str, Indicator], index_name):
+        self.indicators = indicators
+        # INDICATOR STATE BEFORE THE LAST BAR
+        self.prior: Optional[Dict[str, Indicator]] = None
+        self.index_name = index_name
+        self.last: Optional[int] = None
+        self.size = 0
+        self.labels = np.empty(0, dtype=object)
+        self.values = np.empty((0, len(indicators)))
+
+    def append(self, labels: np.ndarray, values: np.ndarray) -> None:
+        # CAPACITY DOUBLING - AMORTIZED O(1) PER BAR
+        end = self.size + labels.size
+        if end > self.labels.size:
+            capacity = max(end, 2 * self.labels.size, 64)
+            grown = np.empty(capacity, dtype=object)
+            grown[: self.size] = self.labels[: self.size]
+            self.labels = grown
+            grown = np.full((capacity, self.values.shape[1]), np.nan)
+            grown[: self.size] = self.values[: self.size]
+            self.values = grown
+        self.labels[self.size : end] = labels
+        self.values[self.size : end] = values
+        self.size = end
+
+
+def _sessions(labels: np.ndarray) -> np.ndarray:
+    # TRADING DATE OF "%Y-%m-%d" AND ISOFORMAT LABELS
+    return np.array([str(label)[:10] for label in labels])
+
+
+class IndicatorEngine:
+    """
+    Incremental indicators of fetched price frames.
+
+    Parameters:
+    -----------
+    indicators: dict
+        column name -> factory returning a new Indicator,
+        one instance is created per (symbol, interval)
+    """
+
+    def __init__(self, indicators: Optional[Dict[str, Callable[[], Indicator]]] = None):
+        self.factories = dict(default_indicators if indicators is None else indicators)
+        self.columns = list(self.factories)
+        self._tracks: Dict[Tuple[str, str], _Track] = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._tracks
+
+    def _inputs(
+        self, prices: pd.DataFrame, labels: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        data = {"session": _sessions(labels)}
+        for column in ("open", "high", "low", "close", "adjclose", "volume"):
+            if column in prices.columns:
+                data[column] = prices[column].to_numpy(dtype=np.float64)
+        return data
+
+    def _bootstrap(self, track: _Track, data: Dict[str, np.ndarray], n: int):
+        values = np.full((n, len(self.columns)), np.nan)
+        for j, indicator in enumerate(track.indicators.values()):
+            valid = np.ones(n, dtype=bool)
+            for field in indicator.fields:
+                if field not in data:
+                    valid[:] = False
+                elif field != "session":
+                    valid &= ~np.isnan(data[field])
+            if valid.any():
+                values[valid, j] = indicator.bootstrap(
+                    {f: data[f][valid] for f in indicator.fields}
+                )
+        return values
+
+    def _update(self, track: _Track, data: Dict[str, np.ndarray], n: int):
+        values = np.full((n, len(self.columns)), np.nan)
+        for i in range(n):
+            bar = {field: column[i] for field, column in data.items()}
+            for j, indicator in enumerate(track.indicators.values()):
+                inputs = [bar.get(field) for field in indicator.fields]
+                if any(
+                    v is None or (isinstance(v, float) and np.isnan(v)) for v in inputs
+                ):
+                    continue
+                values[i, j] = indicator.update(bar)
+        return values
+
+    def _apply(self, track: _Track, data: Dict[str, np.ndarray], n: int, bootstrap):
+        # ALL BUT THE LAST BAR, THEN A SNAPSHOT FOR ITS REVISIONS
+        head = {field: column[:-1] for field, column in data.items()}
+        tail = {field: column[-1:] for field, column in data.items()}
+        apply = self._bootstrap if bootstrap else self._update
+        values = np.empty((n, len(self.columns)))
+        values[:-1] = apply(track, head, n - 1)
+        track.prior = copy.deepcopy(track.indicators)
+        values[-1:] = self._update(track, tail, 1)
+        return values
+
+    def add(self, interval: str, prices: pd.DataFrame) -> Optional[Tuple[str, str]]:
+        """
+        Feed a frame from parse_quotes_as_frame. The first frame
+        of a series bootstraps the indicators, later frames only
+        apply bars newer than the last applied one. A bar with the
+        timestamp of the last applied bar replaces it.
+
+        return: tuple
+            (symbol, interval) key, None if the frame was skipped
+        """
+        if interval is None or prices is None or prices.empty:
+            return None
+        if "symbol" not in prices.columns:
+            return None
+
+        key = (prices["symbol"].iat[0], interval)
+        stamps = to_epoch_seconds(prices.index)
+        track = self._tracks.get(key)
+        if track is not None and track.last is not None:
+            new = stamps >= track.last
+            if not new.any():
+                return key
+            prices, stamps = prices[new], stamps[new]
+            if stamps[0] == track.last:
+                # BAR STILL FORMING - RE-APPLY FROM THE STATE BEFORE IT
+                track.indicators = track.prior
+                track.size -= 1
+
+        labels = prices.index.to_numpy()
+        data = self._inputs(prices, labels)
+        if track is None:
+            track = _Track(
+                {name: factory() for name, factory in self.factories.items()},
+                prices.index.name,
+            )
+            self._tracks[key] = track
+            values = self._apply(track, data, labels.size, bootstrap=True)
+        else:
+            values = self._apply(track, data, labels.size, bootstrap=False)
+
+        track.append(labels, values)
+        track.last = int(stamps[-1])
+        return key
+
+    def add_results(self, results: Iterable[tuple]) -> List[Tuple[str, str]]:
+        """
+        Feed the output of ``YahooManual.get``.
+
+        return: list
+            keys of the updated series
+        """
+        keys = [self.add(interval, prices) for (interval, prices, _, _), _ in results]
+        return [key for key in keys if key is not None]
+
+    def frame(self, symbol: str, interval: str) -> pd.DataFrame:
+        """
+        Indicator values indexed like the price frames.
+        """
+        track = self._tracks[(symbol, interval)]
+        index = pd.Index(track.labels[: track.size], name=track.index_name)
+        return pd.DataFrame(
+            track.values[: track.size], index=index, columns=self.columns
+        )
+
+    def latest(self, symbol: str, interval: str) -> Dict[str, float]:
+        """
+        Indicator values of the last applied bar.
+        """
+        track = self._tracks[(symbol, interval)]
+        if not track.size:
+            return {}
+        return dict(zip(self.columns, track.values[track.size - 1]))
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*
+"""
+Aligned multi-symbol panel output.
+
+The union time index of an interval is computed once over all
+symbols, after which the parsed columns are written directly
+into a preallocated field x time x symbol array.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import to_epoch_seconds
+
+default_fields = ("open", "high", "low", "close", "adjclose", "volume")
+
+
+class Panel:
+    """
+    Aligned price panel of one interval.
+
+    Parameters:
+    -----------
+    values: np.ndarray
+        float64 array of shape (field, time, symbol),
+        NaN where a symbol has no bar
+    timestamps: np.ndarray
+        sorted int64 unix timestamps of the time axis
+    fields: list
+        names of the field axis
+    symbols: list
+        names of the symbol axis
+    intraday: bool
+        True for minute/hour intervals, the time axis is
+        then UTC, otherwise it holds calendar dates
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        timestamps: np.ndarray,
+        fields: Sequence[str],
+        symbols: Sequence[str],
+        intraday: bool,
+    ):
+        self.values = values
+        self.timestamps = timestamps
+        self.fields = list(fields)
+        self.symbols = list(symbols)
+        self.intraday = intraday
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        index = pd.to_datetime(self.timestamps, unit="s", utc=self.intraday)
+        index.name = "datetime" if self.intraday else "date"
+        return index
+
+    def field(self, name: str) -> pd.DataFrame:
+        """
+        Time x symbol frame of one field, backed by the
+        panel array (no copy).
+        """
+        return pd.DataFrame(
+            self.values[self.fields.index(name)],
+            index=self.index,
+            columns=pd.Index(self.symbols, name="symbol"),
+            copy=False,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Wide frame with (field, symbol) MultiIndex columns.
+        """
+        nfield, ntime, nsymbol = self.values.shape
+        data = self.values.transpose(1, 0, 2).reshape(ntime, nfield * nsymbol)
+        columns = pd.MultiIndex.from_product(
+            [self.fields, self.symbols], names=["field", "symbol"]
+        )
+        return pd.DataFrame(data, index=self.index, columns=columns, copy=False)
+
+
+def _symbol_of(frame: pd.DataFrame) -> Optional[str]:
+    if "symbol" in frame.columns and len(frame):
+        return frame["symbol"].iat[0]
+    return None
+
+
+def build_panel(
+    frames: List[pd.DataFrame],
+    fields: Sequence[str] = default_fields,
+    intraday: bool = False,
+) -> Panel:
+    """
+    Align parsed price frames of one interval in a panel.
+
+    Parameters:
+    -----------
+    frames: list
+        frames from parse_quotes_as_frame of a single interval
+    fields: list
+        price columns to collect
+    intraday: bool
+        True for minute/hour intervals
+
+    return: Panel
+    """
+    symbols = []
+    seen = set()
+    stamps = []
+    used = []
+    for frame in frames:
+        symbol = _symbol_of(frame)
+        if symbol is None or symbol in seen:
+            continue
+        seen.add(symbol)
+        symbols.append(symbol)
+        stamps.append(to_epoch_seconds(frame.index))
+        used.append(frame)
+
+    # UNION TIME INDEX COMPUTED ONCE
+    if stamps:
+        timestamps = np.unique(np.concatenate(stamps))
+    else:
+        timestamps = np.empty(0, dtype=np.int64)
+
+    values = np.full((len(fields), timestamps.size, len(symbols)), np.nan)
+    for j, (frame, stamp) in enumerate(zip(used, stamps)):
+        rows = np.searchsorted(timestamps, stamp)
+        for i, field in enumerate(fields):
+            if field in frame.columns:
+                values[i, rows, j] = frame[field].to_numpy(dtype=np.float64)
+
+    return Panel(values, timestamps, fields, symbols, intraday)
+
+
+def build_panels(
+    results: List[tuple], fields: Sequence[str] = default_fields
+) -> Dict[str, Panel]:
+    """
+    Build one aligned panel per interval from
+    the output of ``YahooManual.get``.
+
+    Parameters:
+    -----------
+    results: list
+        ((interval, prices, dividends, splits), summary) tuples
+    fields: list
+        price columns to collect
+
+    return: dict
+        interval -> Panel
+    """
+    per_interval: Dict[str, List[pd.DataFrame]] = {}
+    for (interval, prices, _, _), _ in results:
+        if interval is None or prices is None:
+            continue
+        per_interval.setdefault(interval, []).append(prices)
+
+    return {
+        interval: build_panel(
+            frames, fields, intraday=interval[-1] == "m" or interval[-1] == "h"
+        )
+        for interval, frames in per_interval.items()
+    }
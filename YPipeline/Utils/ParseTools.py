@@ -1,103 +1,115 @@
-from typing import Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
 from .. import log
+from .ProfileTools import stage
 
+_meta_keys = ["symbol", "exchangeName", "currency", "dataGranularity", "priceHint"]
 
-def parse_quotes_as_frame(data: dict) -> pd.DataFrame:
+
+def parse_quotes_as_frame(data: dict, validated: bool = False) -> pd.DataFrame:
     """
     Private method to parse raw yahoo price data
     into a dataframe.
 
     :param data: raw yahoo json data
     :type data: dict
+    :param validated: data passed validate_chart_result, skip
+        the defensive lookups and exception handling
+    :type validated: bool
     :return: dataframe version of the data
     :rtype: pd.DataFrame
     """
+    if validated:
+        meta = data["meta"]
+        return _quotes_frame(data, *(meta.get(i) for i in _meta_keys))
+
     # GET INFO FROM THE METADATA
     try:
         symbol, exchange, currency, interval, priceHint = tuple(
-            data.get("meta", {}).get(i)
-            for i in [
-                "symbol",
-                "exchangeName",
-                "currency",
-                "dataGranularity",
-                "priceHint",
-            ]
+            data.get("meta", {}).get(i) for i in _meta_keys
         )
+        return _quotes_frame(data, symbol, exchange, currency, interval, priceHint)
 
-        date_list = data["timestamp"]
-        ohlc_list = data["indicators"]["quote"][0]
-
-        volume_list = ohlc_list["volume"]
-        open_list = ohlc_list["open"]
-        close_list = ohlc_list["close"]
-        low_list = ohlc_list["low"]
-        high_list = ohlc_list["high"]
-
-        quotes = pd.DataFrame(
-            {
-                "open": open_list,
-                "high": high_list,
-                "low": low_list,
-                "close": close_list,
-                "volume": volume_list,
-            }
-        )
-        if "adjclose" in data["indicators"]:
-            adjclose_list = data["indicators"]["adjclose"][0]["adjclose"]
-        else:
-            adjclose_list = close_list
+    except (TypeError, AttributeError, KeyError, ValueError, IndexError) as e:
+        # IF THERE ARE NO TIMESTAMPS RETURN EMPTY FRAME
+        # SAME FOR IF THERE IS NO METADATA
+        log.info(f"Invalid data {e}")
 
-        quotes["adjclose"] = adjclose_list
-        quotes["symbol"] = symbol
-        quotes["currency"] = currency
-        quotes["exchange"] = exchange
+        return _empty_quotes()
 
-        quotes.index = pd.to_datetime(date_list, unit="s")
-        quotes.sort_index(inplace=True)
 
-        # ROUND ALL THE VALUES IN THE FRAME TO
-        # FIXED NUMBER OF DECIMALS - EXTRACTED FROM
-        # METADATA
-        quotes = np.round(quotes, priceHint)
+def _empty_quotes() -> pd.DataFrame:
+    return pd.DataFrame(columns=["open", "high", "low", "close", "adjclose", "volume"])
 
-        # REFORMAT VOLUME AS INTEGERS - DATA REDUCTION
-        quotes["volume"] = quotes["volume"].fillna(0).astype(np.int64)
 
-        quotes.dropna(inplace=True)
+def _quotes_frame(
+    data: dict, symbol, exchange, currency, interval, priceHint
+) -> pd.DataFrame:
+    """
+    Build the price frame, errors are raised to the caller.
+    """
+    date_list = data["timestamp"]
+    ohlc_list = data["indicators"]["quote"][0]
+
+    volume_list = ohlc_list["volume"]
+    open_list = ohlc_list["open"]
+    close_list = ohlc_list["close"]
+    low_list = ohlc_list["low"]
+    high_list = ohlc_list["high"]
+
+    quotes = pd.DataFrame(
+        {
+            "open": open_list,
+            "high": high_list,
+            "low": low_list,
+            "close": close_list,
+            "volume": volume_list,
+        }
+    )
+    if "adjclose" in data["indicators"]:
+        adjclose_list = data["indicators"]["adjclose"][0]["adjclose"]
+    else:
+        adjclose_list = close_list
 
-        # SET QUOTES INDEX TO DATETIME USING LOCALIZATION !!!!
-        quotes.index = quotes.index.tz_localize("UTC").tz_convert(
-            data["meta"]["exchangeTimezoneName"]
-        )
+    quotes["adjclose"] = adjclose_list
+    quotes["symbol"] = symbol
+    quotes["currency"] = currency
+    quotes["exchange"] = exchange
 
-        if (interval[-1] == "m") or (interval[-1] == "h"):
-            quotes.index = [ts.isoformat() for ts in quotes.index]
-            quotes.index.name = "datetime"
-        else:
-            quotes.index = pd.to_datetime(quotes.index.date)
-            quotes.index = [ts.strftime("%Y-%m-%d") for ts in quotes.index]
-            quotes.index.name = "date"
+    quotes.index = pd.to_datetime(date_list, unit="s")
+    quotes.sort_index(inplace=True)
 
-        return quotes
+    # ROUND ALL THE VALUES IN THE FRAME TO
+    # FIXED NUMBER OF DECIMALS - EXTRACTED FROM
+    # METADATA
+    quotes = np.round(quotes, priceHint)
 
-    except (TypeError, AttributeError, KeyError, ValueError, IndexError) as e:
-        # IF THERE ARE NO TIMESTAMPS RETURN EMPTY FRAME
-        # SAME FOR IF THERE IS NO METADATA
-        log.info(f"Invalid data {e}")
+    # REFORMAT VOLUME AS INTEGERS - DATA REDUCTION
+    quotes["volume"] = quotes["volume"].fillna(0).astype(np.int64)
 
-        quotes = pd.DataFrame(
-            columns=["open", "high", "low", "close", "adjclose", "volume"]
-        )
-        return quotes
+    quotes.dropna(inplace=True)
+
+    # SET QUOTES INDEX TO DATETIME USING LOCALIZATION !!!!
+    quotes.index = quotes.index.tz_localize("UTC").tz_convert(
+        data["meta"]["exchangeTimezoneName"]
+    )
+
+    if (interval[-1] == "m") or (interval[-1] == "h"):
+        quotes.index = [ts.isoformat() for ts in quotes.index]
+        quotes.index.name = "datetime"
+    else:
+        quotes.index = pd.to_datetime(quotes.index.date)
+        quotes.index = [ts.strftime("%Y-%m-%d") for ts in quotes.index]
+        quotes.index.name = "date"
+
+    return quotes
 
 
 def parse_actions_as_frame(
-    data: dict,
+    data: dict, validated: bool = False
 ) -> Union[Tuple[pd.DataFrame, pd.DataFrame], Tuple[None, None]]:
     """
     Private method to parse
@@ -106,9 +118,29 @@ def parse_actions_as_frame(
 
     :param data: raw yahoo action data
     :type data: JSON|dict
+    :param validated: data passed validate_chart_result, skip
+        the defensive lookups and exception handling
+    :type validated: bool
     :return: (dividend, splits)
     :rtype: tuple
     """
+    if validated:
+        events = data.get("events")
+        if not events:
+            return None, None
+        meta = data["meta"]
+        divdc = events.get("dividends")
+        spldc = events.get("splits")
+        dividend = None
+        split = None
+        if divdc:
+            dividend = _dividend_frame(
+                divdc, meta["symbol"], meta.get("currency"), meta["priceHint"]
+            )
+        if spldc:
+            split = _split_frame(spldc, meta["symbol"])
+        return dividend, split
+
     try:
 
         symbol, currency, priceHint = tuple(
@@ -133,37 +165,47 @@ def parse_actions_as_frame(
 
     if divdc:
         try:
-            dividend = pd.DataFrame(data=list(divdc.values()))
-            dividend.set_index("date", inplace=True)
-            dividend.index = pd.to_datetime(dividend.index, unit="s")
-            dividend.sort_index(inplace=True)
-            dividend.columns = ["dividends"]
-            dividend.index = [ts.strftime("%Y-%m-%d") for ts in dividend.index]
-            dividend.index.name = "date"
-            dividend = np.round(dividend, priceHint)
-            dividend["symbol"] = symbol
-            dividend["currency"] = currency
+            dividend = _dividend_frame(divdc, symbol, currency, priceHint)
         except (KeyError, TypeError, ValueError, AttributeError):
             dividend = None
 
     if spldc:
         try:
-            split = pd.DataFrame(data=list(spldc.values()))
-            split.set_index("date", inplace=True)
-            split.index = pd.to_datetime(split.index, unit="s")
-            split.sort_index(inplace=True)
-            split["splits"] = split["numerator"] / split["denominator"]
-            split.index = [ts.strftime("%Y-%m-%d") for ts in split.index]
-            split.index.name = "date"
-            split["symbol"] = symbol
+            split = _split_frame(spldc, symbol)
         except (KeyError, TypeError, ValueError, AttributeError):
             split = None
 
     return dividend, split
 
 
+def _dividend_frame(divdc: dict, symbol, currency, priceHint) -> pd.DataFrame:
+    dividend = pd.DataFrame(data=list(divdc.values()))
+    dividend.set_index("date", inplace=True)
+    dividend.index = pd.to_datetime(dividend.index, unit="s")
+    dividend.sort_index(inplace=True)
+    dividend.columns = ["dividends"]
+    dividend.index = [ts.strftime("%Y-%m-%d") for ts in dividend.index]
+    dividend.index.name = "date"
+    dividend = np.round(dividend, priceHint)
+    dividend["symbol"] = symbol
+    dividend["currency"] = currency
+    return dividend
+
+
+def _split_frame(spldc: dict, symbol) -> pd.DataFrame:
+    split = pd.DataFrame(data=list(spldc.values()))
+    split.set_index("date", inplace=True)
+    split.index = pd.to_datetime(split.index, unit="s")
+    split.sort_index(inplace=True)
+    split["splits"] = split["numerator"] / split["denominator"]
+    split.index = [ts.strftime("%Y-%m-%d") for ts in split.index]
+    split.index.name = "date"
+    split["symbol"] = symbol
+    return split
+
+
 def parse_prices(
-    data: Union[dict, None]
+    data: Union[dict, None], validated: bool = False
 ) -> Tuple[
     Union[str, None],
     Union[pd.DataFrame, None],
@@ -175,9 +217,22 @@ def parse_prices(
 
     data:  dict
         raw json data
+    validated: bool
+        data passed validate_chart_result, parse without
+        defensive lookups
     return: Tuple
         price time-series interval, prices, dividends and splits
     """
+    if validated:
+        if not data.get("timestamp"):
+            # VALID RESULT WITHOUT BARS
+            return data["meta"]["dataGranularity"], _empty_quotes(), None, None
+        with stage("parse_quotes"):
+            quotes = parse_quotes_as_frame(data, validated=True)
+        with stage("parse_actions"):
+            dividends, splits = parse_actions_as_frame(data, validated=True)
+        return data["meta"]["dataGranularity"], quotes, dividends, splits
+
     if data is not None:
         meta = data.get("meta")
         if meta is not None:
@@ -185,8 +240,90 @@ def parse_prices(
         else:
             interval = None
 
-        quotes = parse_quotes_as_frame(data)
-        dividends, splits = parse_actions_as_frame(data)
+        with stage("parse_quotes"):
+            quotes = parse_quotes_as_frame(data)
+        with stage("parse_actions"):
+            dividends, splits = parse_actions_as_frame(data)
         return interval, quotes, dividends, splits
     else:
         return None, None, None, None
+
+
+def merge_frames(frames: List[Optional[pd.DataFrame]]) -> Optional[pd.DataFrame]:
+    """
+    Concatenate frames sharing the same index format into
+    one de-duplicated, sorted frame. Later frames win on
+    duplicated index values.
+
+    frames: list
+        parsed frames, None entries are ignored
+    return: pd.DataFrame
+        merged frame, None if no frame was given
+    """
+    present = [f for f in frames if f is not None]
+    nonempty = [f for f in present if not f.empty]
+    if not nonempty:
+        return present[0] if present else None
+    if len(nonempty) == 1:
+        return nonempty[0]
+
+    index_name = nonempty[0].index.name
+    merged = pd.concat(nonempty)
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    merged.index.name = index_name
+    return merged
+
+
+def stitch_prices(
+    results: List[tuple],
+) -> Tuple[
+    Union[str, None],
+    Union[pd.DataFrame, None],
+    Union[pd.DataFrame, None],
+    Union[pd.DataFrame, None],
+]:
+    """
+    Stitch parsed results of consecutive time-window chunks
+    of the same symbol and interval into one series.
+
+    results: list
+        (interval, prices, dividends, splits) tuples
+    return: Tuple
+        price time-series interval, prices, dividends and splits
+    """
+    interval = next((r[0] for r in results if r[0] is not None), None)
+    if interval is None:
+        return None, None, None, None
+
+    return (
+        interval,
+        merge_frames([r[1] for r in results]),
+        merge_frames([r[2] for r in results]),
+        merge_frames([r[3] for r in results]),
+    )
+
+
+def to_epoch_seconds(index, tz: str = "UTC") -> np.ndarray:
+    """
+    Convert a parsed price index (isoformat or "%Y-%m-%d"
+    strings, or datetimes) to int64 unix seconds.
+
+    Parameters:
+    -----------
+    index: pd.Index|iterable
+        index of a frame from parse_quotes_as_frame
+    tz: str
+        timezone of timezone naive values (daily dates
+        are local dates of the exchange)
+
+    return: np.ndarray
+        int64 unix timestamps
+    """
+    if len(index) == 0:
+        return np.empty(0, dtype=np.int64)
+    if pd.Timestamp(index[0]).tzinfo is None:
+        idx = pd.DatetimeIndex(pd.to_datetime(index)).tz_localize(tz).tz_convert("UTC")
+    else:
+        idx = pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+    delta = idx.tz_localize(None) - pd.Timestamp(0)
+    return np.asarray(delta // pd.Timedelta(seconds=1), dtype=np.int64)
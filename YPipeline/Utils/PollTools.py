@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*
+"""
+Long-running intraday polling.
+
+The poller keeps per symbol the last received bar and a
+preallocated ring buffer. Every cycle only the bars since the
+last one (plus a small overlap for revisions of the bar still
+forming) are requested, on one persistent session with request
+urls and parameter dicts built once. Chart payloads are read
+directly into NumPy arrays, the live series are exposed as
+views on the buffers.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import ClientError, ClientSession
+from aiohttp.http import HttpProcessingError
+
+from .. import log
+from .AsynchTools import bound_fetch, colored
+from .BreakerTools import CircuitOpenError
+from .GapTools import interval_seconds
+from .PriorityTools import DeadlineExceededError, PrioritySemaphore
+from .SchemaTools import validate_chart
+from .TransportTools import create_session
+from .UrlTools import InvalidIntervalError, generate_price_urls, max_window_seconds
+
+poll_fields = ("open", "high", "low", "close", "volume")
+
+
+class RingBuffer:
+    """
+    Fixed capacity time series buffer.
+
+    Every row is written twice, at position i and i + capacity,
+    so the latest rows always form one contiguous slice and can
+    be returned as views without copying.
+
+    Parameters:
+    -----------
+    capacity: int
+        number of bars kept
+    fields: list
+        names of the value rows
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str] = poll_fields):
+        self.capacity = capacity
+        self.fields = list(fields)
+        self._stamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((len(self.fields), 2 * capacity), np.nan)
+        self._next = 0
+        self.size = 0
+
+    @property
+    def last(self) -> Optional[int]:
+        if not self.size:
+            return None
+        return int(self._stamps[self._next - 1 + self.capacity])
+
+    def _write(self, positions: np.ndarray, stamps: np.ndarray, values: np.ndarray):
+        for offset in (0, self.capacity):
+            self._stamps[positions + offset] = stamps
+            self._values[:, positions + offset] = values
+
+    def append(self, stamps: np.ndarray, values: np.ndarray) -> int:
+        """
+        Append sorted bars. A bar with the timestamp of the last
+        bar replaces it, older bars are ignored.
+
+        Parameters:
+        -----------
+        stamps: np.ndarray
+            int64 timestamps
+        values: np.ndarray
+            array of shape (field, time)
+
+        return: int
+            number of new bars
+        """
+        last = self.last
+        if last is not None:
+            # BAR STILL FORMING IS OVERWRITTEN
+            same = np.flatnonzero(stamps == last)
+            if same.size:
+                position = np.array([(self._next - 1) % self.capacity])
+                self._write(position, stamps[same[-1:]], values[:, same[-1:]])
+            keep = stamps > last
+            stamps, values = stamps[keep], values[:, keep]
+
+        stamps, values = stamps[-self.capacity :], values[:, -self.capacity :]
+        count = stamps.size
+        if count:
+            positions = (self._next + np.arange(count)) % self.capacity
+            self._write(positions, stamps, values)
+            self._next = (self._next + count) % self.capacity
+            self.size = min(self.size + count, self.capacity)
+        return count
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read-only (timestamps, values) views of the buffered
+        bars in time order.
+        """
+        start = (self._next - self.size) % self.capacity
+        stamps = self._stamps[start : start + self.size]
+        values = self._values[:, start : start + self.size]
+        stamps.flags.writeable = False
+        values.flags.writeable = False
+        return stamps, values
+
+
+class IntradayPoller:
+    """
+    Incremental poller of intraday bars.
+
+    Parameters:
+    -----------
+    symbols: list
+        yahoo symbols
+    interval: str
+        intraday interval, e.g. "1m"
+    capacity: int
+        bars kept per symbol
+    lookback: int
+        seconds requested on the first poll of a symbol,
+        defaults to the buffer capacity
+    overlap: int
+        bars re-requested every cycle to pick up revisions
+    session: ClientSession
+        optional shared aiohttp session, it is not closed
+    semaphore: PrioritySemaphore
+        optional shared concurrency limit
+    timeout: float
+        total seconds per request of the session created
+        when none is given
+    backend: str
+        HTTP client of the session created when none is
+        given ("aiohttp", "httpx")
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        interval: str = "1m",
+        capacity: int = 2000,
+        lookback: Optional[int] = None,
+        overlap: int = 2,
+        fields: Sequence[str] = poll_fields,
+        session: Optional[ClientSession] = None,
+        semaphore=None,
+        timeout: Optional[float] = None,
+        backend: str = "aiohttp",
+    ):
+        if interval not in max_window_seconds or interval not in interval_seconds:
+            raise InvalidIntervalError(f"{interval} can not be polled")
+
+        self.interval = interval
+        self.step = interval_seconds[interval]
+        self.fields = list(fields)
+        self.overlap = overlap
+        self.lookback = min(
+            lookback or capacity * self.step, max_window_seconds[interval]
+        )
+        self._session = session
+        self._own_session = False
+        self._timeout = timeout
+        self._backend = backend
+        self._semaphore = semaphore
+
+        # REQUESTS BUILT ONCE, ONLY THE WINDOW CHANGES PER CYCLE
+        self._requests = {
+            symbol: (
+                url,
+                {
+                    "period1": 0,
+                    "period2": 0,
+                    "interval": interval,
+                    "includePrePost": 1,
+                },
+            )
+            for symbol, url in zip(symbols, generate_price_urls(symbols))
+        }
+        self.buffers = {symbol: RingBuffer(capacity, self.fields) for symbol in symbols}
+        self.cycles = 0
+
+    def ingest(self, symbol: str, result: dict) -> int:
+        """
+        Append a validated chart result to the buffer of a symbol.
+
+        return: int
+            number of new bars
+        """
+        stamps = np.asarray(result["timestamp"], dtype=np.int64)
+        quote = result["indicators"]["quote"][0]
+        values = np.array([quote[f] for f in self.fields], dtype=np.float64)
+
+        # BARS WITHOUT TRADES COME BACK AS NULL
+        valid = ~np.isnan(values).all(axis=0)
+        return self.buffers[symbol].append(stamps[valid], values[:, valid])
+
+    async def _poll_symbol(self, symbol: str, now: int) -> int:
+        url, params = self._requests[symbol]
+        last = self.buffers[symbol].last
+        if last is None:
+            params["period1"] = now - self.lookback
+        else:
+            params["period1"] = last - self.overlap * self.step
+        params["period2"] = now
+
+        try:
+            resp = await bound_fetch(self._semaphore, url, params, self._session)
+        except (DeadlineExceededError, CircuitOpenError) as e:
+            log.info(f"{symbol} - {e}")
+            return 0
+        except (ClientError, HttpProcessingError, asyncio.TimeoutError) as e:
+            log.error(
+                "aiohttp exception for %s [%s]: %s",
+                url,
+                getattr(e, "status", None),
+                getattr(e, "message", None),
+            )
+            return 0
+
+        result, reason = validate_chart(resp)
+        if reason == "no_data":
+            # MARKET CLOSED - NO BARS IN THE WINDOW
+            return 0
+        if reason is not None:
+            log.info(colored(f"{symbol:8} - rejected - {reason}", "red"))
+            return 0
+        return self.ingest(symbol, result)
+
+    async def poll(self) -> Dict[str, int]:
+        """
+        Run one polling cycle over all symbols.
+
+        return: dict
+            symbol -> number of new bars
+        """
+        if self._session is None:
+            self._session = create_session(self._backend, self._timeout)
+            self._own_session = True
+        if self._semaphore is None:
+            self._semaphore = PrioritySemaphore(1000)
+
+        now = int(time.time())
+        counts = await asyncio.gather(
+            *(self._poll_symbol(symbol, now) for symbol in self._requests)
+        )
+        self.cycles += 1
+        return dict(zip(self._requests, counts))
+
+    async def run(
+        self,
+        cycles: Optional[int] = None,
+        callback: Optional[Callable[["IntradayPoller", Dict[str, int]], None]] = None,
+        delay: float = 2.0,
+    ) -> None:
+        """
+        Poll once per bar, ``delay`` seconds after every bar
+        boundary, until ``cycles`` polls are done (forever if None).
+
+        Parameters:
+        -----------
+        cycles: int
+            number of polls
+        callback: Callable
+            called with (poller, new bar counts) after every poll
+        delay: float
+            seconds to wait after the bar boundary
+        """
+        done = 0
+        while cycles is None or done < cycles:
+            counts = await self.poll()
+            done += 1
+            if callback is not None:
+                callback(self, counts)
+            if cycles is not None and done >= cycles:
+                break
+            now = time.time()
+            await asyncio.sleep(self.step - now % self.step + delay)
+
+    def series(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read-only (timestamps, values[field, time]) views
+        of the live series of a symbol.
+        """
+        return self.buffers[symbol].view()
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Live series of a symbol as frame on the buffer (no copy).
+        """
+        stamps, values = self.series(symbol)
+        index = pd.to_datetime(stamps, unit="s", utc=True)
+        index.name = "datetime"
+        return pd.DataFrame(values.T, index=index, columns=self.fields, copy=False)
+
+    async def close(self) -> None:
+        """
+        Close the session if the poller created it.
+        """
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._own_session = False
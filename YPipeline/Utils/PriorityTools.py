@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*
+"""
+Priority- and deadline-aware request scheduling.
+
+PrioritySemaphore is a drop-in replacement for the asyncio
+Semaphore passed to bound_fetch. Free slots are handed to waiting
+requests in priority order, optionally throttled to a request rate.
+The priority and deadline of a request are taken from the context
+of the task issuing it, set with ``request_priority``, so all
+existing fetch code paths are scheduled without changes.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+# PRIORITY CLASSES - LOWER VALUES ARE SERVED FIRST
+priority_classes = {"interactive": 0, "normal": 5, "batch": 10}
+
+# PRIORITY OF DEMOTED REQUESTS WHOSE DEADLINE PASSED
+expired_priority = 100
+
+_request_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "request_priority", default=(priority_classes["normal"], None)
+)
+
+
+class DeadlineExceededError(Exception):
+    def __init__(self, *args):
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self):
+        if self.message:
+            return "DeadlineExceededError, {0} ".format(self.message)
+        else:
+            return "DeadlineExceededError: Request deadline passed before it was sent."
+
+
+def _priority_value(priority: Union[int, str, None]) -> int:
+    if priority is None:
+        return priority_classes["normal"]
+    if isinstance(priority, str):
+        return priority_classes[priority]
+    return int(priority)
+
+
+@contextmanager
+def request_priority(
+    priority: Union[int, str, None] = None, deadline: Optional[float] = None
+):
+    """
+    Set priority and deadline of all requests issued from
+    the current context, including tasks created inside it.
+
+    Parameters:
+    -----------
+    priority: int|str
+        priority class name or value, lower is more urgent
+    deadline: float
+        seconds from now after which the request is expired
+    """
+    if deadline is not None:
+        deadline = asyncio.get_event_loop().time() + deadline
+    token = _request_priority.set((_priority_value(priority), deadline))
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def current_priority() -> Tuple[int, Optional[float]]:
+    """
+    (priority, absolute loop deadline) of the current context.
+    """
+    return _request_priority.get()
+
+
+class PrioritySemaphore:
+    """
+    Concurrency limit granting slots in priority order.
+
+    Parameters:
+    -----------
+    value: int
+        maximal number of concurrent requests
+    rate: float
+        optional maximal number of requests started per second
+    expired: str
+        "cancel" fails waiting requests at their deadline with
+        DeadlineExceededError, "demote" moves them behind all
+        other work
+    """
+
+    def __init__(
+        self, value: int = 1000, rate: Optional[float] = None, expired: str = "cancel"
+    ):
+        if expired not in ("cancel", "demote"):
+            raise ValueError(f"Invalid expired policy {expired}")
+        self._value = value
+        self._rate = rate
+        self._expired = expired
+        self._next_start = 0.0
+        self._waiters: list = []
+        self._counter = itertools.count()
+
+    def locked(self) -> bool:
+        return self._value == 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(not entry[-1].done() for entry in self._waiters)
+
+    async def acquire(self) -> bool:
+        priority, deadline = current_priority()
+        loop = asyncio.get_event_loop()
+
+        if deadline is not None and loop.time() > deadline:
+            if self._expired == "cancel":
+                raise DeadlineExceededError("deadline passed before scheduling")
+            priority, deadline = expired_priority, None
+
+        if self._value > 0:
+            # DROP EXPIRED OR CANCELLED WAITERS LEFT IN THE QUEUE
+            self._wake()
+
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+        else:
+            future = loop.create_future()
+            heapq.heappush(
+                self._waiters, (priority, next(self._counter), deadline, future)
+            )
+            if deadline is not None and self._expired == "cancel":
+                handle = loop.call_at(deadline, self._expire, future)
+                # DROP THE TIMER ONCE THE SLOT IS GRANTED OR THE WAIT ENDS
+                future.add_done_callback(lambda _: handle.cancel())
+            try:
+                await future
+            except asyncio.CancelledError:
+                # SLOT WAS GRANTED BUT THE WAITING TASK IS CANCELLED
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+
+        try:
+            await self._throttle(loop)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        return True
+
+    async def _throttle(self, loop) -> None:
+        if not self._rate:
+            return
+        now = loop.time()
+        start = max(now, self._next_start)
+        self._next_start = start + 1.0 / self._rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _expire(self, future) -> None:
+        if not future.done():
+            future.set_exception(DeadlineExceededError("deadline passed while queued"))
+
+    def release(self) -> None:
+        self._value += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        loop = asyncio.get_event_loop()
+        while self._value > 0 and self._waiters:
+            priority, count, deadline, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            if deadline is not None and loop.time() > deadline:
+                if self._expired == "cancel":
+                    self._expire(future)
+                else:
+                    heapq.heappush(
+                        self._waiters, (expired_priority, count, None, future)
+                    )
+                continue
+            self._value -= 1
+            future.set_result(True)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return None
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
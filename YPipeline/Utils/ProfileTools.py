@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*
+"""
+Per-stage profiling of a download.
+
+Synchronous pipeline stages are wrapped in ``stage(name)``. While a
+Profiler is active in the current context every stage records its
+calls, wall time, CPU time and, with memory tracing, the bytes it
+kept allocated and its transient peak above the start (tracemalloc).
+Stages never contain an await, so no other task runs inside them
+and their CPU time is their own. The fetch stage holds the summed
+request latency, its CPU time is the part of the run not spent in
+any other stage (event loop, HTTP client). Without an active
+Profiler stage is a no-op.
+
+Stages:
+-------
+params, fetch, decode, validate, parse_quotes, parse_actions,
+summary, assembly
+"""
+
+import contextvars
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict
+
+stage_names = (
+    "params",
+    "fetch",
+    "decode",
+    "validate",
+    "parse_quotes",
+    "parse_actions",
+    "summary",
+    "assembly",
+)
+
+# ENVIRONMENT VARIABLE NAMING A DIRECTORY FOR PROFILE REPORTS
+env_key = "YPIPELINE_PROFILE"
+
+_profiler: contextvars.ContextVar = contextvars.ContextVar(
+    "ypipeline_profiler", default=None
+)
+
+# tracemalloc.reset_peak IS PYTHON 3.9+
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+# ACTIVE MEMORY PROFILES - TRACING STARTED HERE IS STOPPED
+# WHEN THE LAST OVERLAPPING PROFILE ENDS
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _start_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class Profiler:
+    """
+    Stage statistics of one run. The run peak is the
+    highest traced memory, the stage peaks need
+    Python 3.9+ (tracemalloc.reset_peak).
+
+    Parameters:
+    -----------
+    memory: bool
+        trace allocations with tracemalloc, which slows
+        down the run
+    """
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        # NAME -> [CALLS, WALL, CPU, ALLOC BYTES, PEAK BYTES]
+        self.stages: Dict[str, list] = {
+            name: [0, 0.0, 0.0, 0, 0] for name in stage_names
+        }
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+
+    def record(
+        self, name: str, wall: float, cpu: float = 0.0, alloc: int = 0, peak: int = 0
+    ) -> None:
+        entry = self.stages.setdefault(name, [0, 0.0, 0.0, 0, 0])
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += cpu
+        entry[3] += alloc
+        entry[4] = max(entry[4], peak)
+
+    @contextmanager
+    def activate(self):
+        """
+        Profile everything run in this context, including
+        tasks created from it.
+        """
+        if self.memory:
+            _start_tracing()
+        token = _profiler.set(self)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield self
+        finally:
+            self.wall += time.perf_counter() - wall
+            self.cpu += time.process_time() - cpu
+            _profiler.reset(token)
+            if self.memory:
+                if tracemalloc.is_tracing():
+                    self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+                _stop_tracing()
+
+    def report(self) -> dict:
+        """
+        Compact, json serializable report.
+        """
+        from ..__about__ import __version__
+
+        stages = {
+            name: {
+                "calls": calls,
+                "wall": round(wall, 6),
+                "cpu": round(cpu, 6),
+                "alloc_bytes": alloc,
+                "peak_bytes": peak,
+            }
+            for name, (calls, wall, cpu, alloc, peak) in self.stages.items()
+        }
+        # UNATTRIBUTED CPU IS EVENT LOOP AND HTTP CLIENT WORK
+        other = sum(s["cpu"] for name, s in stages.items() if name != "fetch")
+        stages["fetch"]["cpu"] = round(max(self.cpu - other, 0.0), 6)
+        return {
+            "version": __version__,
+            "python": platform.python_version(),
+            "time": round(time.time()),
+            "memory": self.memory,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "peak_bytes": self.peak,
+            "stages": stages,
+        }
+
+    def write(self, path: str) -> str:
+        """
+        Write the report as json. A directory receives a
+        file named by the time of the run.
+
+        return: str
+            path of the written file
+        """
+        if os.path.isdir(path):
+            name = time.strftime("ypipeline-profile-%Y%m%d-%H%M%S.json")
+            path = os.path.join(path, name)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=1)
+        return path
+
+    def format(self) -> str:
+        """
+        Report as text table.
+        """
+        report = self.report()
+        lines = [
+            f"{'stage':14} {'calls':>8} {'wall s':>10} {'cpu s':>10} "
+            f"{'alloc KiB':>11} {'peak KiB':>10}"
+        ]
+        for name, s in report["stages"].items():
+            lines.append(
+                f"{name:14} {s['calls']:8d} {s['wall']:10.3f} {s['cpu']:10.3f} "
+                f"{s['alloc_bytes'] / 1024:11.1f} {s['peak_bytes'] / 1024:10.1f}"
+            )
+        lines.append(
+            f"{'total':14} {'':8} {report['wall']:10.3f} {report['cpu']:10.3f} "
+            f"{'':11} {report['peak_bytes'] / 1024:10.1f}"
+        )
+        return "\n".join(lines)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Attribute the enclosed synchronous code to a stage
+    of the active profiler.
+    """
+    profiler = _profiler.get()
+    if profiler is None:
+        yield
+        return
+
+    memory = profiler.memory and tracemalloc.is_tracing()
+    if memory:
+        before, peak_bytes = tracemalloc.get_traced_memory()
+        if _reset_peak is not None:
+            # KEEP THE ABSOLUTE PEAK OF THE RUN BEFORE RESETTING
+            profiler.peak = max(profiler.peak, peak_bytes)
+            _reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        alloc = peak = 0
+        if memory:
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            alloc = current_bytes - before
+            if _reset_peak is not None:
+                peak = max(peak_bytes - before, 0)
+                profiler.peak = max(profiler.peak, peak_bytes)
+        profiler.record(name, wall, cpu, alloc, peak)
+
+
+def record_wait(name: str, wall: float) -> None:
+    """
+    Add the latency of an awaited operation to a stage.
+    """
+    profiler = _profiler.get()
+    if profiler is not None:
+        profiler.record(name, wall)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*
+"""
+Time-range queries over locally held prices.
+
+Every (symbol, interval) is kept as a sorted int64 unix time
+index plus a float64 field x time array. Range lookups are two
+binary searches, the returned arrays and frames are views on the
+stored arrays. A catalog of the available ranges of all series
+answers universe-level questions without touching the data.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .PanelTools import default_fields
+from .ParseTools import to_epoch_seconds
+
+TimeLike = Union[None, int, str, date, datetime, pd.Timestamp]
+
+
+def _to_stamp(value: TimeLike) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(to_epoch_seconds([value])[0])
+
+
+def _is_intraday(interval: str) -> bool:
+    return interval[-1] == "m" or interval[-1] == "h"
+
+
+class Series:
+    """
+    Sorted price history of one (symbol, interval).
+
+    Parameters:
+    -----------
+    timestamps: np.ndarray
+        sorted unique int64 unix timestamps
+    values: np.ndarray
+        float64 array of shape (field, time)
+    fields: list
+        names of the field axis
+    intraday: bool
+        True for minute/hour intervals
+    """
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        fields: Sequence[str],
+        intraday: bool,
+    ):
+        self.timestamps = timestamps
+        self.values = values
+        self.fields = list(fields)
+        self.intraday = intraday
+
+    @classmethod
+    def from_frame(
+        cls, prices: pd.DataFrame, fields: Sequence[str], intraday: bool
+    ) -> "Series":
+        stamps = to_epoch_seconds(prices.index)
+        values = np.full((len(fields), stamps.size), np.nan)
+        for i, field in enumerate(fields):
+            if field in prices.columns:
+                values[i] = prices[field].to_numpy(dtype=np.float64)
+
+        # PARSED FRAMES ARE SORTED, MERGED ONES MAY NOT BE
+        if stamps.size > 1 and (np.diff(stamps) <= 0).any():
+            order = np.argsort(stamps, kind="stable")
+            stamps, values = stamps[order], values[:, order]
+            last = np.append(stamps[1:] != stamps[:-1], True)
+            stamps, values = stamps[last], values[:, last]
+        return cls(stamps, values, fields, intraday)
+
+    def merge(self, other: "Series") -> "Series":
+        """
+        Union of two histories, rows of other win on equal timestamps.
+        """
+        if not self.timestamps.size:
+            return other
+        if not other.timestamps.size:
+            return self
+
+        # APPEND ONLY - NO SORT NEEDED
+        if other.timestamps[0] > self.timestamps[-1]:
+            return Series(
+                np.concatenate([self.timestamps, other.timestamps]),
+                np.concatenate([self.values, other.values], axis=1),
+                self.fields,
+                self.intraday,
+            )
+
+        stamps = np.concatenate([self.timestamps, other.timestamps])
+        values = np.concatenate([self.values, other.values], axis=1)
+        order = np.argsort(stamps, kind="stable")
+        stamps, values = stamps[order], values[:, order]
+        last = np.append(stamps[1:] != stamps[:-1], True)
+        return Series(
+            stamps[last],
+            np.ascontiguousarray(values[:, last]),
+            self.fields,
+            self.intraday,
+        )
+
+    def bounds(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """
+        Row range [lo, hi) of start <= t <= end by binary search.
+        """
+        lo, hi = 0, self.timestamps.size
+        if start is not None:
+            lo = int(np.searchsorted(self.timestamps, start, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(self.timestamps, end, side="right"))
+        return lo, max(lo, hi)
+
+    def slice(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (timestamps, values) views of a time range.
+        """
+        lo, hi = self.bounds(start, end)
+        return self.timestamps[lo:hi], self.values[:, lo:hi]
+
+    def frame(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Time range as frame, the columns are views on the
+        stored values.
+        """
+        stamps, values = self.slice(start, end)
+        index = pd.DatetimeIndex(stamps.view("M8[s]"), copy=False)
+        if self.intraday:
+            index = index.tz_localize("UTC")
+        index.name = "datetime" if self.intraday else "date"
+        return pd.DataFrame(values.T, index=index, columns=self.fields, copy=False)
+
+
+class PriceIndex:
+    """
+    Query layer over fetched price frames.
+
+    Parameters:
+    -----------
+    fields: list
+        price columns kept per series
+    """
+
+    def __init__(self, fields: Sequence[str] = default_fields):
+        self.fields = list(fields)
+        self._series: Dict[Tuple[str, str], Series] = {}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._series
+
+    def series(self, symbol: str, interval: str) -> Series:
+        return self._series[(symbol, interval)]
+
+    def add(self, interval: str, prices: pd.DataFrame) -> Optional[Tuple[str, str]]:
+        """
+        Add or merge a frame from parse_quotes_as_frame.
+
+        return: tuple
+            (symbol, interval) key, None if nothing was added
+        """
+        if interval is None or prices is None or prices.empty:
+            return None
+        if "symbol" not in prices.columns:
+            return None
+
+        key = (prices["symbol"].iat[0], interval)
+        series = Series.from_frame(prices, self.fields, _is_intraday(interval))
+        old = self._series.get(key)
+        self._series[key] = series if old is None else old.merge(series)
+        return key
+
+    def add_results(self, results: Iterable[tuple]) -> List[Tuple[str, str]]:
+        """
+        Add the output of ``YahooManual.get``.
+
+        Parameters:
+        -----------
+        results: list
+            ((interval, prices, dividends, splits), summary) tuples
+
+        return: list
+            keys of the added series
+        """
+        keys = [self.add(interval, prices) for (interval, prices, _, _), _ in results]
+        return [key for key in keys if key is not None]
+
+    def query(
+        self,
+        symbols: Iterable[str],
+        interval: str,
+        start: TimeLike = None,
+        end: TimeLike = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Prices of symbols between start and end (inclusive).
+
+        Parameters:
+        -----------
+        symbols: list
+            yahoo symbols, unknown symbols are skipped
+        interval: str
+            price interval
+        start, end: int|str|datetime
+            unix seconds or anything to_epoch_seconds accepts,
+            timezone naive values are taken as UTC
+
+        return: dict
+            symbol -> frame backed by the stored arrays
+        """
+        start, end = _to_stamp(start), _to_stamp(end)
+        return {
+            symbol: self._series[(symbol, interval)].frame(start, end)
+            for symbol in symbols
+            if (symbol, interval) in self._series
+        }
+
+    def catalog(self) -> pd.DataFrame:
+        """
+        Available range per (symbol, interval).
+
+        return: pd.DataFrame
+            columns symbol, interval, start, end (unix seconds), bars
+        """
+        rows = [
+            (
+                symbol,
+                interval,
+                int(s.timestamps[0]) if s.timestamps.size else None,
+                int(s.timestamps[-1]) if s.timestamps.size else None,
+                s.timestamps.size,
+            )
+            for (symbol, interval), s in self._series.items()
+        ]
+        return pd.DataFrame(
+            rows, columns=["symbol", "interval", "start", "end", "bars"]
+        )
+
+    def covering(
+        self, interval: str, start: TimeLike = None, end: TimeLike = None
+    ) -> List[str]:
+        """
+        Symbols whose stored range covers [start, end].
+        """
+        start, end = _to_stamp(start), _to_stamp(end)
+        return [
+            symbol
+            for (symbol, i), s in self._series.items()
+            if i == interval
+            and s.timestamps.size
+            and (start is None or s.timestamps[0] <= start)
+            and (end is None or s.timestamps[-1] >= end)
+        ]
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*
+"""
+Compiled validation of chart responses.
+
+The chart payload is checked with a fastjsonschema validator
+before any DataFrame is built. Invalid payloads are rejected
+with a short reason code, valid payloads can be parsed without
+defensive lookups.
+
+Reason codes:
+-------------
+    error:<code>            server reported an error (e.g. error:Not Found)
+    empty                   no result in the response
+    no_data                 valid meta without bars (e.g. 1m over a weekend),
+                            the result is returned along with the code
+    <rule>:<path>           schema violation, e.g. required:timestamp
+    length:<field>          array length differs from the timestamps
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import fastjsonschema
+
+_number_array = {"type": "array", "items": {"type": ["number", "null"]}}
+
+chart_meta_schema = {
+    "type": "object",
+    "required": [
+        "symbol",
+        "dataGranularity",
+        "priceHint",
+        "exchangeTimezoneName",
+    ],
+    "properties": {
+        "symbol": {"type": "string"},
+        "exchangeName": {"type": ["string", "null"]},
+        "currency": {"type": ["string", "null"]},
+        "dataGranularity": {"type": "string"},
+        "priceHint": {"type": "integer"},
+        "exchangeTimezoneName": {"type": "string"},
+    },
+}
+
+# RESULT WITHOUT BARS - ONLY THE META DATA IS SENT
+chart_empty_schema = {
+    "type": "object",
+    "required": ["meta"],
+    "properties": {"meta": chart_meta_schema},
+}
+
+chart_result_schema = {
+    "type": "object",
+    "required": ["meta", "timestamp", "indicators"],
+    "properties": {
+        "meta": chart_meta_schema,
+        "timestamp": {"type": "array", "minItems": 1, "items": {"type": "integer"}},
+        "indicators": {
+            "type": "object",
+            "required": ["quote"],
+            "properties": {
+                "quote": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "required": ["open", "high", "low", "close", "volume"],
+                        "properties": {
+                            "open": _number_array,
+                            "high": _number_array,
+                            "low": _number_array,
+                            "close": _number_array,
+                            "volume": _number_array,
+                        },
+                    },
+                },
+                "adjclose": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "required": ["adjclose"],
+                        "properties": {"adjclose": _number_array},
+                    },
+                },
+            },
+        },
+        "events": {
+            "type": "object",
+            "properties": {
+                "dividends": {
+                    "type": "object",
+                    "additionalProperties": {
+                        "type": "object",
+                        "required": ["amount", "date"],
+                        "properties": {
+                            "amount": {"type": "number"},
+                            "date": {"type": "integer"},
+                        },
+                    },
+                },
+                "splits": {
+                    "type": "object",
+                    "additionalProperties": {
+                        "type": "object",
+                        "required": ["numerator", "denominator", "date"],
+                        "properties": {
+                            "numerator": {"type": "number"},
+                            "denominator": {"type": "number", "exclusiveMinimum": 0},
+                            "date": {"type": "integer"},
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _chart_result_validator():
+    # COMPILED ONCE ON FIRST USE
+    return fastjsonschema.compile(chart_result_schema)
+
+
+@lru_cache(maxsize=None)
+def _chart_empty_validator():
+    return fastjsonschema.compile(chart_empty_schema)
+
+
+def _reason(exc: "fastjsonschema.JsonSchemaValueException") -> str:
+    path = exc.path[1:] if exc.path else []
+    rule = exc.rule or "invalid"
+    if rule == "required" and isinstance(exc.rule_definition, list):
+        # REPORT THE FIRST MISSING KEY
+        value = exc.value if isinstance(exc.value, dict) else {}
+        missing = [k for k in exc.rule_definition if k not in value]
+        path = list(path) + missing[:1]
+    return f"{rule}:{'.'.join(str(p) for p in path)}"
+
+
+def validate_chart_result(result: dict) -> Optional[str]:
+    """
+    Validate a single chart result.
+
+    Parameters:
+    -----------
+    result: dict
+        element of chart.result of the response
+
+    return: str
+        reason code, None if the result is valid, "no_data"
+        if it is valid but has no bars
+    """
+    if isinstance(result, dict) and not result.get("timestamp"):
+        try:
+            _chart_empty_validator()(result)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return _reason(e)
+        return "no_data"
+
+    try:
+        _chart_result_validator()(result)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return _reason(e)
+
+    # LENGTHS CAN NOT BE EXPRESSED IN THE SCHEMA
+    size = len(result["timestamp"])
+    quote = result["indicators"]["quote"][0]
+    for field in ("open", "high", "low", "close", "volume"):
+        if len(quote[field]) != size:
+            return f"length:{field}"
+    adjclose = result["indicators"].get("adjclose")
+    if adjclose is not None and len(adjclose[0]["adjclose"]) != size:
+        return "length:adjclose"
+
+    return None
+
+
+def validate_chart(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Validate a chart response and extract its result.
+
+    Parameters:
+    -----------
+    payload: dict
+        json response of the chart url
+
+    return: Tuple
+        (result, None) if valid, (result, "no_data") if valid
+        without bars, (None, reason code) otherwise
+    """
+    chart = payload.get("chart") if isinstance(payload, dict) else None
+    if not isinstance(chart, dict):
+        return None, "required:chart"
+
+    error = chart.get("error")
+    if error:
+        code = error.get("code") if isinstance(error, dict) else error
+        return None, f"error:{code}"
+
+    results = chart.get("result")
+    if not results or not isinstance(results, list):
+        return None, "empty"
+
+    reason = validate_chart_result(results[0])
+    if reason == "no_data":
+        return results[0], reason
+    if reason is not None:
+        return None, reason
+
+    return results[0], None
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*
+"""
+Shared-memory transport of parsed prices between processes.
+
+A worker process writes the columns of a parse_prices result
+(index, OHLC, adjclose, volume, dividends, splits) into one
+multiprocessing.shared_memory block and returns a small picklable
+descriptor. The parent rebuilds the frames on top of the block
+without copying the numeric columns.
+
+Lifetime:
+---------
+The block name is unlinked as soon as the parent attaches to it
+(or calls discard), the memory itself stays mapped until the last
+frame using it is garbage collected. Mappings of collected frames
+are closed by collect_blocks, which import_prices calls on every
+use. Ownership of a block passes to the process receiving the
+descriptor, which must call import_prices or discard on it.
+POSIX shared memory only.
+"""
+
+import itertools
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import parse_prices
+
+if TYPE_CHECKING:  # pragma: no cover
+    from multiprocessing import shared_memory
+
+# COLUMNS HOLDING ONE VALUE PER FRAME, SENT IN THE DESCRIPTOR
+constant_columns = ("symbol", "currency", "exchange")
+
+# ATTACHED BLOCKS STILL BACKING FRAMES AND BLOCKS READY TO CLOSE
+_blocks: Dict[int, "shared_memory.SharedMemory"] = {}
+_retired: List["shared_memory.SharedMemory"] = []
+_counter = itertools.count()
+
+
+def _shared_memory():
+    # PYTHON 3.8+ ONLY, IMPORTED ON FIRST USE
+    from multiprocessing import shared_memory
+
+    return shared_memory
+
+
+def _resource_tracker():
+    from multiprocessing import resource_tracker
+
+    return resource_tracker
+
+
+def _encode(values: pd.Series) -> np.ndarray:
+    if values.dtype.kind in "biuf":
+        return np.ascontiguousarray(values.to_numpy())
+    # TEXT COLUMNS AS FIXED WIDTH UTF-8
+    return np.array([str(v).encode("utf-8") for v in values], dtype="S")
+
+
+def _layout(frame: Optional[pd.DataFrame], offset: int) -> Tuple[Optional[dict], int]:
+    """
+    Byte layout of the index and the columns of a frame,
+    every array starts 8-byte aligned.
+    """
+    if frame is None:
+        return None, offset
+
+    constants = {}
+    arrays = {"index": _encode(frame.index.to_series())}
+    for column in frame.columns:
+        if column in constant_columns:
+            constants[column] = frame[column].iat[0] if len(frame) else None
+        else:
+            arrays[column] = _encode(frame[column])
+
+    layout = {}
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, offset, array.shape[0])
+        offset += (array.nbytes + 7) // 8 * 8
+
+    part = {
+        "layout": layout,
+        "columns": list(frame.columns),
+        "constants": constants,
+        "index_name": frame.index.name,
+    }
+    return dict(part, arrays=arrays), offset
+
+
+def export_prices(result: tuple) -> dict:
+    """
+    Write a parse_prices result into a shared memory block.
+
+    Parameters:
+    -----------
+    result: tuple
+        (interval, prices, dividends, splits)
+
+    return: dict
+        picklable descriptor for import_prices
+    """
+    interval, prices, dividends, splits = result
+
+    parts = {}
+    offset = 0
+    for key, frame in (
+        ("prices", prices),
+        ("dividends", dividends),
+        ("splits", splits),
+    ):
+        parts[key], offset = _layout(frame, offset)
+
+    shm = _shared_memory().SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for part in parts.values():
+            if part is None:
+                continue
+            for name, (dtype, start, length) in part["layout"].items():
+                target = np.ndarray(
+                    (length,), dtype=dtype, buffer=shm.buf, offset=start
+                )
+                target[:] = part["arrays"][name]
+                del target
+    finally:
+        shm.close()
+
+    # THE RECEIVER OWNS THE BLOCK, A WORKER EXITING FIRST MUST NOT REMOVE IT
+    _resource_tracker().unregister(shm._name, "shared_memory")
+
+    return {
+        "name": shm.name,
+        "interval": interval,
+        "parts": {
+            key: (
+                None
+                if part is None
+                else {k: v for k, v in part.items() if k != "arrays"}
+            )
+            for key, part in parts.items()
+        },
+    }
+
+
+def parse_prices_shared(data: Optional[dict], validated: bool = False) -> dict:
+    """
+    parse_prices for worker processes, the result is
+    returned as shared memory descriptor.
+    """
+    return export_prices(parse_prices(data, validated))
+
+
+def _retire(key: int) -> None:
+    _retired.append(_blocks.pop(key))
+
+
+def collect_blocks() -> int:
+    """
+    Close the mappings of blocks whose frames have
+    been garbage collected.
+
+    return: int
+        number of closed blocks
+    """
+    closed = 0
+    for shm in list(_retired):
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _retired.remove(shm)
+        closed += 1
+    return closed
+
+
+def _frame(base: np.ndarray, part: Optional[dict]) -> Optional[pd.DataFrame]:
+    if part is None:
+        return None
+
+    arrays = {}
+    for name, (dtype, start, length) in part["layout"].items():
+        nbytes = np.dtype(dtype).itemsize * length
+        view = base[start : start + nbytes].view(dtype)
+        if view.dtype.kind == "S":
+            # TEXT IS DECODED, NUMERIC COLUMNS STAY VIEWS ON THE BLOCK
+            view = np.array([v.decode("utf-8") for v in view], dtype=object)
+        arrays[name] = view
+
+    index = pd.Index(arrays.pop("index"), name=part["index_name"])
+    frame = pd.DataFrame(arrays, index=index, copy=False)
+    for column, value in part["constants"].items():
+        frame[column] = value
+    return frame[part["columns"]]
+
+
+def import_prices(descriptor: dict) -> Tuple:
+    """
+    Rebuild a parse_prices result from a shared memory
+    descriptor, the numeric columns are views on the block.
+
+    Parameters:
+    -----------
+    descriptor: dict
+        descriptor returned by export_prices
+
+    return: tuple
+        (interval, prices, dividends, splits)
+    """
+    collect_blocks()
+
+    shm = _shared_memory().SharedMemory(name=descriptor["name"])
+    # THE NAME IS NOT NEEDED ANYMORE, THE MAPPING STAYS VALID
+    shm.unlink()
+
+    base = np.ndarray((shm.size,), dtype=np.uint8, buffer=shm.buf)
+    key = next(_counter)
+    _blocks[key] = shm
+    weakref.finalize(base, _retire, key)
+
+    parts = descriptor["parts"]
+    return (
+        descriptor["interval"],
+        _frame(base, parts["prices"]),
+        _frame(base, parts["dividends"]),
+        _frame(base, parts["splits"]),
+    )
+
+
+def discard(descriptor: dict) -> None:
+    """
+    Free a block without reading it.
+    """
+    shm = _shared_memory().SharedMemory(name=descriptor["name"])
+    shm.close()
+    shm.unlink()
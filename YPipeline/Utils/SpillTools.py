@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*
+"""
+Memory-budgeted collection of parsed results.
+
+Parsed price results are kept in memory while their total size
+stays within a byte budget. Results arriving over the budget are
+written to a spill directory, one .npy file per column (the same
+column encoding as the shared memory transport), and replaced by a
+SpilledPrices handle. Handles are loaded on access only, numeric
+columns are memory mapped copy-on-write, so a reloaded frame is
+paged in as it is read and can be modified without touching the
+file. Reloaded results are not kept by the store.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .ParseTools import stitch_prices
+from .SharedTools import _encode, constant_columns
+
+parts = ("prices", "dividends", "splits")
+
+
+def frame_nbytes(frame: Optional[pd.DataFrame]) -> int:
+    if frame is None:
+        return 0
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def result_nbytes(result: tuple) -> int:
+    """
+    In-memory size of a parse_prices result in bytes.
+    """
+    return sum(frame_nbytes(frame) for frame in result[1:])
+
+
+class SpillStats:
+    """
+    Spill and reload accounting, shared by a store
+    and its handles.
+    """
+
+    def __init__(self):
+        self.resident_bytes = 0
+        self.spilled = 0
+        self.spilled_bytes = 0
+        self.reloaded = 0
+        self.reloaded_bytes = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def _write_frame(path: str, key: str, frame: Optional[pd.DataFrame]) -> Optional[dict]:
+    if frame is None:
+        return None
+
+    constants = {}
+    files = {}
+    arrays = [("index", frame.index.to_series())]
+    for column in frame.columns:
+        if column in constant_columns:
+            constants[column] = frame[column].iat[0] if len(frame) else None
+        else:
+            arrays.append((column, frame[column]))
+
+    # FILES ARE NUMBERED, COLUMN NAMES NEED NOT BE VALID FILE NAMES
+    for i, (name, values) in enumerate(arrays):
+        filename = f"{key}.{i}.npy"
+        np.save(os.path.join(path, filename), _encode(values), allow_pickle=False)
+        files[name] = filename
+
+    return {
+        "files": files,
+        "columns": list(frame.columns),
+        "constants": constants,
+        "index_name": frame.index.name,
+    }
+
+
+def _read_frame(path: str, part: Optional[dict]) -> Optional[pd.DataFrame]:
+    if part is None:
+        return None
+
+    arrays = {}
+    for name, filename in part["files"].items():
+        # PLAIN NDARRAY VIEW OF THE MAPPING, NOT A np.memmap SUBCLASS
+        values = np.load(os.path.join(path, filename), mmap_mode="c")
+        values = values.view(np.ndarray)
+        if values.dtype.kind == "S":
+            values = np.array([v.decode("utf-8") for v in values], dtype=object)
+        arrays[name] = values
+
+    index = pd.Index(arrays.pop("index"), name=part["index_name"])
+    frame = pd.DataFrame(arrays, index=index, copy=False)
+    for column, value in part["constants"].items():
+        frame[column] = value
+    return frame[part["columns"]]
+
+
+class SpilledPrices:
+    """
+    Lazy handle of a parse_prices result written to disk.
+
+    Parameters:
+    -----------
+    path: str
+        directory holding the column files
+    interval: str
+        price interval of the result
+    nbytes: int
+        in-memory size of the result when spilled
+    stats: SpillStats
+        accounting updated on load
+    """
+
+    def __init__(self, path: str, interval: str, nbytes: int, stats: SpillStats):
+        self.path = path
+        self.interval = interval
+        self.nbytes = nbytes
+        self._stats = stats
+
+    def __repr__(self) -> str:
+        return f"SpilledPrices({self.path!r}, {self.interval!r}, {self.nbytes})"
+
+    def load(self) -> tuple:
+        """
+        Read the result back.
+
+        return: tuple
+            (interval, prices, dividends, splits)
+        """
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        self._stats.reloaded += 1
+        self._stats.reloaded_bytes += self.nbytes
+        return (meta["interval"],) + tuple(
+            _read_frame(self.path, meta[key]) for key in parts
+        )
+
+
+class ResultStore(Sequence):
+    """
+    Sequence of ((interval, prices, dividends, splits), summary)
+    tuples, as returned by ``YahooManual.get``, holding at most
+    budget bytes of price frames in memory. Indexing and
+    iteration load spilled entries.
+
+    Parameters:
+    -----------
+    budget: int
+        bytes of parsed frames kept in memory
+    directory: str
+        parent of the spill directory, defaults to the
+        system temporary directory. The spill directory is
+        removed on close or garbage collection.
+    """
+
+    def __init__(self, budget: int, directory: Optional[str] = None):
+        self.budget = budget
+        self.stats = SpillStats()
+        self.path = tempfile.mkdtemp(prefix="YPipeline-spill-", dir=directory)
+        self._count = 0
+        self._entries: List[tuple] = []
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        prices, summary = self._entries[i]
+        return self.resolve(prices), summary
+
+    def __iter__(self):
+        for prices, summary in self._entries:
+            yield self.resolve(prices), summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove all spilled files, handles become invalid.
+        """
+        self._finalizer()
+
+    def spill(self, result: tuple, nbytes: Optional[int] = None) -> SpilledPrices:
+        """
+        Write a parse_prices result to the spill directory.
+        """
+        nbytes = result_nbytes(result) if nbytes is None else nbytes
+        path = os.path.join(self.path, str(self._count))
+        self._count += 1
+        os.mkdir(path)
+
+        meta = {"interval": result[0]}
+        for key, frame in zip(parts, result[1:]):
+            meta[key] = _write_frame(path, key, frame)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        self.stats.spilled += 1
+        self.stats.spilled_bytes += nbytes
+        return SpilledPrices(path, result[0], nbytes, self.stats)
+
+    def put(self, result: tuple) -> Union[tuple, SpilledPrices]:
+        """
+        Keep a parse_prices result in memory if it fits the
+        budget, spill it otherwise.
+
+        return: tuple|SpilledPrices
+            the result itself or its handle
+        """
+        # FAILED REQUESTS HOLD NO DATA
+        if result[0] is None:
+            return result
+
+        nbytes = result_nbytes(result)
+        if self.stats.resident_bytes + nbytes > self.budget:
+            return self.spill(result, nbytes)
+        self.stats.resident_bytes += nbytes
+        return result
+
+    def resolve(self, value: Union[tuple, SpilledPrices]) -> tuple:
+        """
+        parse_prices result of a value returned by put.
+        """
+        if isinstance(value, SpilledPrices):
+            return value.load()
+        return value
+
+    def discard(self, value: Union[tuple, SpilledPrices]) -> None:
+        """
+        Release a value returned by put that is not appended.
+        """
+        if isinstance(value, SpilledPrices):
+            shutil.rmtree(value.path, ignore_errors=True)
+        elif value[0] is not None:
+            self.stats.resident_bytes -= result_nbytes(value)
+
+    def stitch(
+        self, chunks: List[Union[tuple, SpilledPrices]]
+    ) -> Union[tuple, SpilledPrices]:
+        """
+        Stitch values returned by put for the chunks of one
+        symbol and interval, the chunks are released.
+        """
+        # A SINGLE CHUNK IS RETURNED AS IS - KEEP ITS HANDLE
+        if len(chunks) == 1:
+            return chunks[0]
+        result = stitch_prices([self.resolve(c) for c in chunks])
+        for chunk in chunks:
+            self.discard(chunk)
+        return self.put(result)
+
+    def append(self, entry: Tuple[Union[tuple, SpilledPrices], dict]) -> None:
+        """
+        Add a (value returned by put, summary) entry.
+        """
+        self._entries.append(entry)
+
+    def extend(self, entries: Iterable[tuple]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def handles(self) -> List[Tuple[Union[tuple, SpilledPrices], dict]]:
+        """
+        Entries without loading, spilled prices are
+        SpilledPrices handles.
+        """
+        return list(self._entries)
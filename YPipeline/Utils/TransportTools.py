@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*
+"""
+Pluggable event loop and HTTP client.
+
+Loop policies:
+--------------
+"asyncio" is the standard library loop, "uvloop" requires the
+uvloop package, "auto" picks uvloop when it is installed.
+
+HTTP backends:
+--------------
+"aiohttp" is a plain aiohttp.ClientSession, "httpx" requires the
+httpx package. Sessions of every backend provide the part of the
+aiohttp.ClientSession interface used by fetch: ``get(url, params,
+timeout)`` as async context manager yielding a response with
+``status`` and ``json()``, a ``timeout`` attribute and ``close()``.
+Transport errors are raised as the matching aiohttp exceptions, so
+circuit breakers and error handling do not depend on the backend.
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional
+
+loop_policies = ("asyncio", "uvloop", "auto")
+
+# AIOHTTP DEFAULT, ALSO APPLIED TO THE OTHER BACKENDS
+default_total_timeout = 300.0
+
+
+def new_event_loop(policy: str = "asyncio") -> asyncio.AbstractEventLoop:
+    """
+    New event loop of a loop policy.
+
+    Parameters:
+    -----------
+    policy: str
+        "asyncio", "uvloop" or "auto"
+    return: asyncio.AbstractEventLoop
+    """
+    if policy not in loop_policies:
+        raise ValueError(f"Invalid loop policy {policy}")
+
+    if policy != "asyncio":
+        try:
+            import uvloop
+        except ImportError:
+            if policy == "uvloop":
+                raise
+        else:
+            return uvloop.new_event_loop()
+
+    return asyncio.new_event_loop()
+
+
+def run(coro, policy: str = "asyncio") -> Any:
+    """
+    asyncio.run on a loop of the given policy.
+    """
+    loop = new_event_loop(policy)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def _aiohttp_session(timeout: Optional[float] = None, limit: Optional[int] = None):
+    from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+    # NO TIMEOUT ARGUMENT KEEPS THE AIOHTTP DEFAULT
+    kwargs = {}
+    if timeout is not None:
+        kwargs["timeout"] = ClientTimeout(total=timeout)
+    if limit is not None:
+        kwargs["connector"] = TCPConnector(limit=limit)
+    return ClientSession(**kwargs)
+
+
+class HttpxResponse:
+    """
+    aiohttp style view of a httpx.Response.
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self.status = response.status_code
+        self.headers = response.headers
+
+    async def text(self) -> str:
+        return self._response.text
+
+    async def json(self, loads: Callable[[str], Any] = json.loads) -> Any:
+        from aiohttp import ContentTypeError
+
+        # SAME CONTENT TYPE CHECK AS AIOHTTP
+        content_type = self.headers.get("content-type", "")
+        if "json" not in content_type:
+            raise ContentTypeError(
+                None,
+                (),
+                status=self.status,
+                message=f"Attempt to decode JSON with unexpected mimetype: {content_type}",
+            )
+        return loads(self._response.text)
+
+
+class _HttpxRequest:
+    def __init__(self, session: "HttpxSession", url: str, params, timeout):
+        self._session = session
+        self._url = url
+        self._params = params
+        self._timeout = timeout
+
+    async def __aenter__(self) -> HttpxResponse:
+        import httpx
+        from aiohttp import ClientConnectionError, ClientError
+
+        timeout = self._timeout or self._session.timeout
+        try:
+            response = await self._session.client.get(
+                self._url, params=self._params, timeout=timeout.total
+            )
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.TransportError as e:
+            raise ClientConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise ClientError(str(e)) from e
+        return HttpxResponse(response)
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class HttpxSession:
+    """
+    httpx.AsyncClient behind the aiohttp session interface.
+
+    Parameters:
+    -----------
+    timeout: float
+        total seconds per request
+    limit: int
+        maximal number of connections
+    """
+
+    def __init__(self, timeout: Optional[float] = None, limit: Optional[int] = None):
+        import httpx
+        from aiohttp import ClientTimeout
+
+        self.timeout = ClientTimeout(
+            total=default_total_timeout if timeout is None else timeout
+        )
+        limits = (
+            httpx.Limits() if limit is None else httpx.Limits(max_connections=limit)
+        )
+        self.client = httpx.AsyncClient(limits=limits)
+
+    @property
+    def closed(self) -> bool:
+        return self.client.is_closed
+
+    def get(self, url: str, params: Optional[dict] = None, timeout=None, **kwargs):
+        return _HttpxRequest(self, url, params, timeout)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "HttpxSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+http_backends: Dict[str, Callable[..., Any]] = {
+    "aiohttp": _aiohttp_session,
+    "httpx": HttpxSession,
+}
+
+
+def create_session(
+    backend: str = "aiohttp",
+    timeout: Optional[float] = None,
+    limit: Optional[int] = None,
+):
+    """
+    HTTP session of a backend, must be called on the
+    loop that uses it.
+
+    Parameters:
+    -----------
+    backend: str
+        key of http_backends
+    timeout: float
+        total seconds per request, None keeps the
+        aiohttp default
+    limit: int
+        maximal number of connections, None keeps the
+        backend default
+    return: session
+        usable as async context manager, closed on exit
+    """
+    if backend not in http_backends:
+        raise ValueError(f"Invalid HTTP backend {backend}")
+    return http_backends[backend](timeout=timeout, limit=limit)
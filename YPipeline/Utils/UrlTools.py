@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*
+import time
 from datetime import datetime as dt
 from typing import List, Optional, Union
 
@@ -24,6 +25,29 @@ valid_intevals = [
     "all",
 ]
 
+# LARGEST period1/period2 WINDOW (SECONDS) THE SERVER
+# ACCEPTS IN A SINGLE REQUEST FOR INTRADAY INTERVALS
+max_window_seconds = {
+    "1m": 7 * 86400,
+    "2m": 60 * 86400,
+    "5m": 60 * 86400,
+    "15m": 60 * 86400,
+    "30m": 60 * 86400,
+    "90m": 60 * 86400,
+    "1h": 730 * 86400,
+}
+
+# HOW FAR BACK (SECONDS) INTRADAY DATA IS AVAILABLE ON THE SERVER
+max_history_seconds = {
+    "1m": 30 * 86400,
+    "2m": 60 * 86400,
+    "5m": 60 * 86400,
+    "15m": 60 * 86400,
+    "30m": 60 * 86400,
+    "90m": 60 * 86400,
+    "1h": 730 * 86400,
+}
+
 
 class InvalidPeriodError(Exception):
     def __init__(self, *args):
@@ -150,3 +174,84 @@ def generate_price_params(
             paramslist.append(params.copy())
 
     return paramslist
+
+
+def split_window(period1: int, period2: int, interval: str) -> List[tuple]:
+    """
+    Split a period1/period2 window into the largest
+    chunks the server allows for the interval.
+
+    Parameters:
+    -----------
+    period1: int
+        window start (unix seconds)
+    period2: int
+        window end (unix seconds)
+    interval: str
+        time series interval value
+
+    return: list
+        list of (period1, period2) tuples
+    """
+    max_window = max_window_seconds.get(interval)
+    if max_window is None:
+        return [(period1, period2)] if period1 < period2 else []
+
+    chunks = []
+    while period1 < period2:
+        stop = min(period2, period1 + max_window)
+        chunks.append((period1, stop))
+        period1 = stop
+    return chunks
+
+
+def generate_chunked_price_params(
+    _period: str,
+    _interval: str,
+    _start: Optional[Union[dt, str, int]],
+    _end: Optional[Union[dt, str, int]],
+) -> List[dict]:
+    """
+    Version of generate_price_params where explicit start/end
+    windows longer than the server maximum for the interval
+    are split into consecutive chunks instead of being
+    truncated. Windows reaching further back than the server
+    keeps intraday data are cut at the available history.
+    Chunks of the same interval are adjacent in the returned
+    list.
+
+    Parameters:
+    -----------
+    _period: str
+        historical time period
+    _interval: str
+        time series interval value
+    _start: str|int|datetime.datetime
+        optional start date
+    _end: str|int|datetime.datetime
+        optional end date
+
+    return:
+        list of dictionaries with parameter settings
+
+    """
+    paramslist = []
+    for params in generate_price_params(_period, _interval, _start, _end):
+        if "period1" not in params:
+            paramslist.append(params)
+            continue
+
+        period1 = params["period1"]
+        if params["interval"] in max_history_seconds:
+            earliest = int(time.time()) - max_history_seconds[params["interval"]]
+            period1 = max(period1, earliest)
+
+        for period1, period2 in split_window(
+            period1, params["period2"], params["interval"]
+        ):
+            chunk = params.copy()
+            chunk["period1"] = period1
+            chunk["period2"] = period2
+            paramslist.append(chunk)
+
+    return paramslist
@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import functools
 import itertools
-from asyncio import Semaphore
+import os
+import threading
+import time
+from concurrent.futures import Future
 from typing import List
 
-from aiohttp import ClientSession
-
-from .Utils.AsynchTools import aparse_prices, aparse_summary
 from .Utils.DateTimeTools import validate_date
+from .Utils.ProfileTools import Profiler, env_key, stage
 from .Utils.UrlTools import (
     InvalidIntervalError,
     InvalidPeriodError,
-    generate_price_params,
+    generate_chunked_price_params,
     generate_price_urls,
     valid_intevals,
     valid_periods,
@@ -40,8 +42,96 @@ class Symbols:
 
 
 class YahooManual:
-    def __init__(self, symbols: Symbols):
+    def __init__(
+        self,
+        symbols: Symbols,
+        scheduler=None,
+        session=None,
+        semaphore=None,
+        workers: int = 1000,
+        change_feed=None,
+        timeout=None,
+        breakers=None,
+        health=None,
+        memory_budget=None,
+        spill_dir=None,
+        backend: str = "aiohttp",
+        currency=None,
+        indicators=None,
+        profile=None,
+    ):
+        """
+        Parameters:
+        -----------
+        symbols: Symbols
+            symbols to download
+        scheduler: MarketScheduler
+            optional exchange calendar aware scheduler, requests
+            for markets that did not trade since the last fetch
+            are dropped
+        session: ClientSession
+            optional shared aiohttp session, it is not closed
+            after the download
+        semaphore: PrioritySemaphore
+            optional shared concurrency limit
+        workers: int
+            number of worker coroutines pulling requests, also
+            the connection limit of the session created by get
+        change_feed: ChangeFeed
+            fingerprints of previously emitted rows, required
+            for output="changes"
+        timeout: float
+            total seconds per request of the session created by
+            get, requests never outlive the deadline of get
+        breakers: BreakerRegistry
+            circuit breakers, defaults to the shared registry
+        health: SymbolHealth
+            optional registry of invalid or delisted symbols,
+            failing symbols are not requested until re-checked
+        memory_budget: int
+            optional bytes of parsed frames kept in memory, results
+            over the budget are spilled to disk and the cache
+            becomes a ResultStore loading them on access
+        spill_dir: str
+            parent directory of spilled results, defaults to
+            the system temporary directory
+        backend: str
+            HTTP client of the session created by get
+            ("aiohttp", "httpx")
+        currency: str|FxConverter
+            optional base currency, prices and dividends are
+            converted with FX series fetched and cached by
+            the converter
+        indicators: IndicatorEngine
+            optional engine updated with the new bars of
+            every download
+        profile: str|Profiler
+            profile the stages of every get, a path receives a
+            json report per run (a directory one file per run),
+            a Profiler accumulates the runs. Defaults to the
+            directory in the YPIPELINE_PROFILE environment variable.
+        """
         self._symbols = symbols
+        self._scheduler = scheduler
+        self._session = session
+        self._semaphore = semaphore
+        self._workers = workers
+        self._change_feed = change_feed
+        self._timeout = timeout
+        self._breakers = breakers
+        self._health = health
+        self._memory_budget = memory_budget
+        self._spill_dir = spill_dir
+        self._backend = backend
+        self._fx = currency
+        if isinstance(currency, str):
+            from .Utils.FxTools import FxConverter
+
+            self._fx = FxConverter(currency)
+        self._indicators = indicators
+        self._profile = profile
+        # PROFILER OF THE LAST PROFILED RUN
+        self.profiler = None
         self._cache = None
 
     def _input_validation(self, period, interval, start, end) -> None:
@@ -69,28 +159,454 @@ class YahooManual:
     def available_periods(self):
         return valid_periods
 
-    async def get(self, symbols, period="max", interval="1d", start=None, end=None):
+    async def get(
+        self,
+        symbols,
+        period="max",
+        interval="1d",
+        start=None,
+        end=None,
+        output="tuples",
+        priority=None,
+        deadline=None,
+    ):
+        """
+        Download and parse prices and summaries.
+
+        Parameters:
+        -----------
+        priority: int|str
+            priority class ("interactive", "normal", "batch")
+            or value of all requests, lower is served first
+        deadline: float
+            seconds after which waiting requests expire
+        output: str
+            "tuples" returns the list of
+            ((interval, prices, dividends, splits), summary) tuples,
+            "panel" returns a dict interval -> Panel with the
+            prices of all symbols aligned on one time index,
+            "adjusted" returns the panels dividend adjusted from
+            the downloaded actions (chart prices are already
+            split adjusted),
+            "changes" returns the tuples holding only rows that
+            are new or revised since the last call on the change feed
+        """
+        if output not in ("tuples", "panel", "adjusted", "changes"):
+            raise ValueError(f"Invalid output mode {output}")
+        if output == "changes" and self._change_feed is None:
+            raise ValueError("output changes requires a change_feed")
+
+        args = (symbols, period, interval, start, end, output, priority, deadline)
+        profile = self._profile
+        if profile is None:
+            profile = os.environ.get(env_key) or None
+        if profile is None:
+            return await self._get(*args)
+
+        profiler = profile if isinstance(profile, Profiler) else Profiler()
+        with profiler.activate():
+            result = await self._get(*args)
+        self.profiler = profiler
+        if not isinstance(profile, Profiler):
+            profiler.write(profile)
+        return result
+
+    async def _get(
+        self, symbols, period, interval, start, end, output, priority, deadline
+    ):
+        # HEAVY DEPENDENCIES (AIOHTTP, PANDAS) ARE ONLY
+        # LOADED WHEN DATA IS ACTUALLY REQUESTED
+        from .Utils.AsynchTools import aparse_summary, run_pool
+        from .Utils.PriorityTools import PrioritySemaphore, request_priority
+        from .Utils.SpillTools import ResultStore
+        from .Utils.TransportTools import create_session
+
         if self._cache is None:
-            urllist = generate_price_urls(self._symbols.get())
-            paramslist = generate_price_params(period, interval, start, end)
+            symbols, paramslist, combinations, fetch_time = self._plan(
+                period, interval, start, end
+            )
+
+            sem = self._semaphore
+            if sem is None:
+                sem = PrioritySemaphore(1000)
+
+            store = None
+            if self._memory_budget is not None:
+                store = ResultStore(self._memory_budget, self._spill_dir)
+
+            # APPLIED ONCE AFTER THE RUN - ONE FAILURE PER SYMBOL
+            statuses = {}
+            prices_job = functools.partial(
+                self._prices_job,
+                sem=sem,
+                store=store,
+                paramslist=paramslist,
+                statuses=statuses,
+                # FX DOWNLOADS OF THIS CALL, ONE PER PAIR AND INTERVAL
+                fx_pending={},
+            )
+
+            async def download(session):
+                # ONE BOUNDED WORKER POOL OVER PRICES AND SUMMARIES
+                def job(item):
+                    kind, value = item
+                    if kind == "prices":
+                        return prices_job(value, session)
+                    return aparse_summary(sem, value, session, self._breakers)
+
+                items = itertools.chain(
+                    (("prices", tup) for tup in combinations),
+                    (("summary", symbol) for symbol in symbols),
+                )
+                results = await run_pool(job, items, self._workers)
+
+                return results[: len(combinations)], results[len(combinations) :]
+
+            # TASKS INHERIT PRIORITY AND DEADLINE FROM THIS CONTEXT
+            with request_priority(priority, deadline):
+                if self._session is not None:
+                    tmp1, tmp2 = await download(self._session)
+                else:
+                    # GATHER BEFORE LEAVING THE CONTEXT - THE
+                    # SESSION IS CLOSED ON EXIT
+                    session = create_session(
+                        self._backend, self._timeout, limit=self._workers
+                    )
+                    async with session:
+                        tmp1, tmp2 = await download(session)
+
+            if self._health is not None:
+                self._health.record(statuses)
+
+            if self._scheduler is not None:
+                self._mark_fetched(combinations, tmp1, fetch_time)
+
+            with stage("assembly"):
+                self._cache = self._assemble(combinations, symbols, tmp1, tmp2, store)
+
+                if self._indicators is not None:
+                    self._indicators.add_results(self._cache)
+
+        with stage("assembly"):
+            return self._output(output)
+
+    def _plan(self, period, interval, start, end):
+        """
+        Symbols and (url, params) combinations to request.
+
+        return: tuple
+            (symbols, params list, combinations, fetch time)
+        """
+        symbols = self._symbols.get()
+        if self._health is not None:
+            # KNOWN DEAD SYMBOLS ARE NOT SCHEDULED UNTIL RE-CHECKED
+            symbols = self._health.filter(symbols)
+
+        with stage("params"):
+            urllist = generate_price_urls(symbols)
+            # LONG start/end WINDOWS ARE SPLIT IN CHUNKS THE SERVER ACCEPTS
+            paramslist = generate_chunked_price_params(period, interval, start, end)
             combinations = list(itertools.product(urllist, paramslist))
 
-            sem = Semaphore(1000)
-            tasks = []
-            summary_tasks = []
+        fetch_time = time.time()
+        # EXPLICIT END DATES TARGET HISTORY - NEVER DROPPED
+        if self._scheduler is not None and end is None:
+            combinations = self._scheduler.filter(combinations, fetch_time)
+            # SUMMARIES ONLY FOR SYMBOLS WITH PRICE REQUESTS LEFT
+            scheduled = {url.split("/")[-1] for url, _ in combinations}
+            symbols = [symbol for symbol in symbols if symbol in scheduled]
+
+        return symbols, paramslist, combinations, fetch_time
+
+    async def _prices_job(
+        self, tup, session, sem, store, paramslist, statuses, fx_pending
+    ):
+        from .Utils.AsynchTools import aparse_prices
+
+        meta_hook = None
+        if self._scheduler is not None:
+            meta_hook = self._scheduler.update_meta
+        status_hook = None
+        if self._health is not None:
+            status_hook = self._health.collect(statuses)
+
+        result = await aparse_prices(
+            sem, tup, session, meta_hook, self._breakers, status_hook
+        )
+        if self._fx is not None:
+            fetch = functools.partial(self._fetch_fx, sem, session, paramslist)
+            result = await self._fx.aconvert(result, fetch, fx_pending)
+        # SPILL AS RESULTS ARRIVE, NOT AFTER ALL ARE IN MEMORY
+        return result if store is None else store.put(result)
+
+    async def _fetch_fx(self, sem, session, paramslist, pair, interval):
+        """
+        Download and stitch the FX series of a currency pair.
+        """
+        from .Utils.AsynchTools import aparse_prices
+        from .Utils.ParseTools import stitch_prices
+
+        url = generate_price_urls([pair])[0]
+        chunks = await asyncio.gather(
+            *(
+                aparse_prices(sem, (url, params), session, None, self._breakers)
+                for params in paramslist
+                if params["interval"] == interval
+            )
+        )
+        return stitch_prices(list(chunks))
 
-            async with ClientSession() as session:
-                for tup in combinations:
-                    task = asyncio.ensure_future(aparse_prices(sem, tup, session))
-                    tasks.append(task)
+    def _mark_fetched(self, combinations, results, fetch_time) -> None:
+        from .Utils.SpillTools import SpilledPrices
 
-                for symbol in self._symbols.get():
-                    task = asyncio.ensure_future(aparse_summary(sem, symbol, session))
-                    summary_tasks.append(task)
+        for (url, params), result in zip(combinations, results):
+            # SPILLED RESULTS ALWAYS HOLD DATA
+            if isinstance(result, SpilledPrices) or result[0] is not None:
+                self._scheduler.mark_fetched(
+                    url.split("/")[-1], params["interval"], fetch_time
+                )
 
-            tmp1 = await asyncio.gather(*tasks)
-            tmp2 = await asyncio.gather(*summary_tasks)
+    def _assemble(self, combinations, symbols, prices, summaries, store):
+        """
+        Stitch the chunks of every symbol and interval and pair
+        them with the summaries.
+
+        return: list|ResultStore
+            ((interval, prices, dividends, splits), summary) entries
+        """
+        from .Utils.ParseTools import stitch_prices
+
+        stitch = stitch_prices if store is None else store.stitch
+        # STITCH CHUNKS OF THE SAME SYMBOL AND INTERVAL
+        groups = itertools.groupby(
+            zip(combinations, prices),
+            key=lambda c: (c[0][0], c[0][1]["interval"]),
+        )
+        # JOIN SUMMARIES ON THE SYMBOL, NOT THE POSITION
+        summaries = dict(zip(symbols, summaries))
+        pairs = [
+            (stitch([result for _, result in group]), summaries[url.split("/")[-1]])
+            for (url, _), group in groups
+        ]
+
+        if store is None:
+            return pairs
+        store.extend(pairs)
+        return store
+
+    def _output(self, output):
+        if output == "panel":
+            from .Utils.PanelTools import build_panels
+
+            return build_panels(self._cache)
+
+        if output == "adjusted":
+            from .Utils.AdjustTools import adjust_results
+
+            return adjust_results(self._cache)
 
-            self._cache = list(zip(tmp1, tmp2))
+        if output == "changes":
+            return self._change_feed.changes(self._cache)
 
         return self._cache
+
+
+class YahooSyncClient:
+    """
+    Synchronous facade over YahooManual.
+
+    One background thread runs a persistent event loop with a
+    pooled aiohttp session and a shared concurrency limit. Any
+    number of threads can submit downloads, either blocking
+    (get) or returning concurrent.futures.Future (get_async).
+
+    Parameters:
+    -----------
+    concurrency: int
+        maximal number of simultaneous requests over all callers,
+        also the connection limit of the pooled session
+    scheduler: MarketScheduler
+        optional exchange calendar aware scheduler
+    rate: float
+        optional maximal number of requests started per second
+    change_feed: ChangeFeed
+        optional change feed shared by all calls, required
+        for output="changes"
+    timeout: float
+        total seconds per request
+    breakers: BreakerRegistry
+        circuit breakers, defaults to the shared registry
+    health: SymbolHealth
+        optional registry of invalid or delisted symbols
+    memory_budget: int
+        optional bytes of parsed frames kept in memory per call,
+        see YahooManual
+    spill_dir: str
+        parent directory of spilled results
+    loop: str
+        event loop policy of the background thread
+        ("asyncio", "uvloop", "auto")
+    backend: str
+        HTTP client of the pooled session ("aiohttp", "httpx")
+    currency: str|FxConverter
+        optional base currency of prices and dividends, the
+        FX cache is shared by all calls
+    indicators: IndicatorEngine
+        optional indicator engine shared by all calls
+    profile: str|Profiler
+        profile every call, see YahooManual
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1000,
+        scheduler=None,
+        rate=None,
+        change_feed=None,
+        timeout=None,
+        breakers=None,
+        health=None,
+        memory_budget=None,
+        spill_dir=None,
+        loop: str = "asyncio",
+        backend: str = "aiohttp",
+        currency=None,
+        indicators=None,
+        profile=None,
+    ):
+        from .Utils.TransportTools import new_event_loop
+
+        if isinstance(currency, str):
+            from .Utils.FxTools import FxConverter
+
+            currency = FxConverter(currency)
+        self._fx = currency
+        self._indicators = indicators
+        self._profile = profile
+        self._scheduler = scheduler
+        self._health = health
+        self._memory_budget = memory_budget
+        self._spill_dir = spill_dir
+        self._change_feed = change_feed
+        self._breakers = breakers
+        self._loop = new_event_loop(loop)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="YPipeline-loop", daemon=True
+        )
+        self._thread.start()
+        self._session, self._semaphore = self.submit(
+            self._setup(concurrency, rate, timeout, backend)
+        ).result()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _setup(self, concurrency: int, rate, timeout, backend: str):
+        # SESSION AND SEMAPHORE MUST BE CREATED ON THE LOOP THREAD
+        from .Utils.PriorityTools import PrioritySemaphore
+        from .Utils.TransportTools import create_session
+
+        return (
+            create_session(backend, timeout, limit=concurrency),
+            PrioritySemaphore(concurrency, rate),
+        )
+
+    async def _shutdown(self) -> None:
+        # LET ACCEPTED SUBMISSIONS FINISH BEFORE CLOSING THE SESSION
+        current = asyncio.current_task()
+        await asyncio.gather(
+            *(task for task in asyncio.all_tasks() if task is not current),
+            return_exceptions=True,
+        )
+        await self._session.close()
+
+    def submit(self, coro) -> Future:
+        """
+        Thread-safe scheduling of a coroutine on the background loop.
+        """
+        # CHECKED UNDER THE LOCK - close MAY RUN IN ANOTHER THREAD
+        with self._lock:
+            if self._closed:
+                coro.close()
+                raise RuntimeError("YahooSyncClient is closed")
+            return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def get_async(
+        self,
+        symbols: List[str],
+        period="max",
+        interval="1d",
+        start=None,
+        end=None,
+        output="tuples",
+        priority=None,
+        deadline=None,
+    ) -> Future:
+        """
+        Submit a download, see YahooManual.get for the parameters.
+
+        return: concurrent.futures.Future
+        """
+        manual = YahooManual(
+            Symbols(list(symbols)),
+            scheduler=self._scheduler,
+            session=self._session,
+            semaphore=self._semaphore,
+            change_feed=self._change_feed,
+            breakers=self._breakers,
+            health=self._health,
+            memory_budget=self._memory_budget,
+            spill_dir=self._spill_dir,
+            currency=self._fx,
+            indicators=self._indicators,
+            profile=self._profile,
+        )
+        return self.submit(
+            manual.get(None, period, interval, start, end, output, priority, deadline)
+        )
+
+    def get(
+        self,
+        symbols: List[str],
+        period="max",
+        interval="1d",
+        start=None,
+        end=None,
+        output="tuples",
+        priority=None,
+        deadline=None,
+        timeout=None,
+    ):
+        """
+        Blocking download, see YahooManual.get for the parameters.
+        """
+        future = self.get_async(
+            symbols, period, interval, start, end, output, priority, deadline
+        )
+        return future.result(timeout)
+
+    def close(self) -> None:
+        """
+        Wait for submitted downloads, close the session and
+        stop the background loop. Later submissions raise
+        RuntimeError.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            closing = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        closing.result()
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1 +1,88 @@
 # -*- coding: utf-8 -*-
+"""
+Light-weight package entry point.
+
+Parameter and url generation are imported eagerly as they
+only depend on the standard library. Everything that pulls in
+aiohttp, pandas or numpy is resolved lazily on first attribute
+access, keeping ``import YPipeline`` cheap for CLI calls and
+freshly spawned workers.
+"""
+
+import importlib
+
+from .Utils.DateTimeTools import clean_start_end_period, validate_date
+from .Utils.UrlTools import (
+    InvalidIntervalError,
+    InvalidPeriodError,
+    generate_price_params,
+    generate_price_urls,
+    valid_intevals,
+    valid_periods,
+)
+
+# ATTRIBUTE NAME -> MODULE PROVIDING IT
+_lazy_attributes = {
+    "Symbols": ".YPipeline",
+    "YahooManual": ".YPipeline",
+    "YahooSyncClient": ".YPipeline",
+    "ExchangeCalendar": ".Utils.CalendarTools",
+    "MarketScheduler": ".Utils.CalendarTools",
+    "backfill": ".Utils.GapTools",
+    "find_gaps": ".Utils.GapTools",
+    "Panel": ".Utils.PanelTools",
+    "build_panels": ".Utils.PanelTools",
+    "AdjustmentEngine": ".Utils.AdjustTools",
+    "adjust_results": ".Utils.AdjustTools",
+    "PrioritySemaphore": ".Utils.PriorityTools",
+    "request_priority": ".Utils.PriorityTools",
+    "export_prices": ".Utils.SharedTools",
+    "import_prices": ".Utils.SharedTools",
+    "ExcelExporter": ".Utils.ExcelTools",
+    "stream_excel": ".Utils.ExcelTools",
+    "ChangeFeed": ".Utils.ChangeTools",
+    "IntradayPoller": ".Utils.PollTools",
+    "BreakerRegistry": ".Utils.BreakerTools",
+    "CircuitOpenError": ".Utils.BreakerTools",
+    "PriceIndex": ".Utils.QueryTools",
+    "SymbolHealth": ".Utils.HealthTools",
+    "ResultStore": ".Utils.SpillTools",
+    "create_session": ".Utils.TransportTools",
+    "FxConverter": ".Utils.FxTools",
+    "IndicatorEngine": ".Utils.IndicatorTools",
+    "Profiler": ".Utils.ProfileTools",
+    "new_event_loop": ".Utils.TransportTools",
+    "parse_prices": ".Utils.ParseTools",
+    "aparse_prices": ".Utils.AsynchTools",
+    "aparse_summary": ".Utils.AsynchTools",
+}
+
+__all__ = [
+    "InvalidIntervalError",
+    "InvalidPeriodError",
+    "clean_start_end_period",
+    "generate_price_params",
+    "generate_price_urls",
+    "valid_intevals",
+    "valid_periods",
+    "validate_date",
+]
+__all__ += list(_lazy_attributes)
+
+
+def __getattr__(name):
+    """
+    Module level getattr (PEP 562) resolving
+    heavy attributes on first access.
+    """
+    if name in _lazy_attributes:
+        module = importlib.import_module(_lazy_attributes[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_attributes))
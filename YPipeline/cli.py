@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point.
+
+Downloads prices of the given symbols, prints one line per
+series and optionally writes them as csv files.
+
+Usage:
+------
+    YPipeline AAPL MSFT --period 1y --interval 1d --out prices
+    YPipeline AAPL --profile reports/
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from . import log
+from .Utils.UrlTools import valid_intevals, valid_periods
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="YPipeline", description="Download Yahoo finance prices."
+    )
+    parser.add_argument("symbols", nargs="+", help="yahoo symbols")
+    parser.add_argument("--period", default="max", choices=valid_periods)
+    parser.add_argument("--interval", default="1d", choices=valid_intevals)
+    parser.add_argument("--start", default=None, help="start date YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="end date YYYY-MM-DD")
+    parser.add_argument("--out", default=None, help="directory for csv files")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=".",
+        default=None,
+        metavar="PATH",
+        help="write a per-stage profile report to PATH "
+        "(file or directory, default the current directory)",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="profile without allocation tracing",
+    )
+    parser.add_argument("--log-config", default=None, help="logging ini file")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    log.setup(args.log_config)
+
+    import asyncio
+
+    from .Utils.ProfileTools import Profiler
+    from .YPipeline import Symbols, YahooManual
+
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(memory=not args.no_memory)
+
+    manual = YahooManual(Symbols(args.symbols), profile=profiler)
+    results = asyncio.run(
+        manual.get(None, args.period, args.interval, args.start, args.end)
+    )
+
+    if args.out is not None:
+        os.makedirs(args.out, exist_ok=True)
+    for (interval, prices, _, _), _ in results:
+        if prices is None or prices.empty:
+            continue
+        symbol = prices["symbol"].iat[0]
+        print(f"{symbol:10} {interval:4} {len(prices):8d} rows")
+        if args.out is not None:
+            prices.to_csv(os.path.join(args.out, f"{symbol}_{interval}.csv"))
+
+    if profiler is not None:
+        path = profiler.write(args.profile)
+        print(profiler.format(), file=sys.stderr)
+        print(f"profile written to {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
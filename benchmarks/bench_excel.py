@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Excel export benchmark.
+
+Writes synthetic daily prices of many symbols, one sheet per
+symbol, with the streaming ExcelExporter and with pandas
+``to_excel``. Wall time and the peak of python allocations
+(tracemalloc) are reported. Run above the open file limit
+(e.g. 1500 symbols under ``ulimit -n 1024``) the exporter rolls
+over to several workbooks.
+
+Usage:
+------
+    python benchmarks/bench_excel.py [symbols] [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from YPipeline.Utils.ExcelTools import ExcelExporter, open_file_limit
+
+
+def make_results(symbols: int, rows: int):
+    """
+    Synthetic output of ``YahooManual.get``.
+
+    Parameters:
+    -----------
+    symbols: int
+        number of symbols
+    rows: int
+        daily bars per symbol
+    return: generator
+        ((interval, prices, None, None), {}) tuples
+    """
+    dates = pd.date_range("2000-01-03", periods=rows, freq="B").strftime("%Y-%m-%d")
+    rng = np.random.default_rng(0)
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+        prices = pd.DataFrame(
+            {
+                "open": close,
+                "high": close * 1.01,
+                "low": close * 0.99,
+                "close": close,
+                "volume": rng.integers(0, 10**6, rows),
+                "adjclose": close,
+            },
+            index=pd.Index(dates, name="date"),
+        )
+        prices["symbol"] = f"SYM{i}"
+        yield ("1d", prices, None, None), {}
+
+
+def streaming(path: str, symbols: int, rows: int) -> int:
+    with ExcelExporter(path, actions=False) as exporter:
+        for result in make_results(symbols, rows):
+            exporter.write(result[0])
+    return len(exporter.paths)
+
+
+def pandas_to_excel(path: str, symbols: int, rows: int) -> int:
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for (interval, prices, _, _), _ in make_results(symbols, rows):
+            prices.to_excel(writer, sheet_name=f"{prices['symbol'].iat[0]} {interval}")
+    return 1
+
+
+def measure(func, symbols: int, rows: int):
+    """
+    return: tuple
+        (seconds, peak MiB, file size MiB, number of files)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        files = func(path, symbols, rows)
+        dt = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+    return dt, peak / 2**20, size / 2**20, files
+
+
+def main(symbols: int = 1000, rows: int = 250) -> None:
+    print(f"{symbols} symbols x {rows} rows, open file limit {open_file_limit()}")
+    print(
+        f"{'method':20} {'seconds':>10} {'peak MiB':>10} {'file MiB':>10} {'files':>6}"
+    )
+    for name, func in (("ExcelExporter", streaming), ("to_excel", pandas_to_excel)):
+        try:
+            dt, peak, size, files = measure(func, symbols, rows)
+        except Exception as e:
+            tracemalloc.stop()
+            print(f"{name:20} failed: {e}")
+            continue
+        print(f"{name:20} {dt:10.2f} {peak:10.1f} {size:10.1f} {files:6d}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
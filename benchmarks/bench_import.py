@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time benchmark.
+
+Every statement is timed in a fresh interpreter so module
+caching does not hide the start-up cost paid by CLI calls
+and newly spawned workers.
+
+Usage:
+------
+    python benchmarks/bench_import.py [repeats]
+"""
+
+import statistics
+import subprocess
+import sys
+
+statements = [
+    "import YPipeline",
+    "from YPipeline import generate_price_params, generate_price_urls",
+    "from YPipeline import YahooManual",
+    "from YPipeline.Utils.AsynchTools import aparse_prices",
+    "from YPipeline.Utils.ParseTools import parse_prices",
+]
+
+heavy_modules = ["aiohttp", "pandas", "numpy", "termcolor"]
+
+probe = """
+import sys, time
+t0 = time.perf_counter()
+{statement}
+dt = time.perf_counter() - t0
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(dt, ",".join(loaded))
+"""
+
+
+def time_statement(statement: str, repeats: int):
+    """
+    Time a single import statement in fresh interpreters.
+
+    Parameters:
+    -----------
+    statement: str
+        python import statement
+    repeats: int
+        number of fresh interpreters to start
+    return: tuple
+        (median seconds, heavy modules loaded)
+    """
+    timings = []
+    loaded = ""
+    for _ in range(repeats):
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                probe.format(statement=statement, heavy=heavy_modules),
+            ],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout.split()
+        timings.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    return statistics.median(timings), loaded
+
+
+def main(repeats: int = 5) -> None:
+    print(f"{'statement':70} {'median ms':>10}  heavy modules loaded")
+    for statement in statements:
+        median, loaded = time_statement(statement, repeats)
+        print(f"{statement:70} {median * 1e3:10.1f}  {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
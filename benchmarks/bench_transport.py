@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Transport benchmark matrix.
+
+A local stand-in for the chart endpoint runs in a separate
+process and answers every request with the same pre-serialized
+year of daily bars. For every installed combination of loop
+policy and HTTP backend the client fetches and decodes the
+responses through bound_fetch. Requests per second and client
+CPU time per request (process time of the benchmark process, the
+server is not included) are reported. Per request log records
+are disabled, they would dominate the client CPU time.
+
+Usage:
+------
+    python benchmarks/bench_transport.py [requests] [concurrency]
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import multiprocessing
+import socket
+import sys
+import time
+
+from YPipeline import log
+from YPipeline.Utils.AsynchTools import bound_fetch
+from YPipeline.Utils.BreakerTools import BreakerRegistry
+from YPipeline.Utils.TransportTools import create_session, new_event_loop
+
+loops = {"asyncio": None, "uvloop": "uvloop"}
+backends = {"aiohttp": "aiohttp", "httpx": "httpx"}
+
+
+def chart_body(rows: int = 250) -> bytes:
+    timestamps = list(range(1577836800, 1577836800 + rows * 86400, 86400))
+    values = [100.0 + 0.01 * i for i in range(rows)]
+    chart = {
+        "meta": {
+            "symbol": "SYM",
+            "currency": "USD",
+            "exchangeName": "NMS",
+            "dataGranularity": "1d",
+        },
+        "timestamp": timestamps,
+        "indicators": {
+            "quote": [
+                {
+                    "open": values,
+                    "high": values,
+                    "low": values,
+                    "close": values,
+                    "volume": [1000] * rows,
+                }
+            ],
+            "adjclose": [{"adjclose": values}],
+        },
+    }
+    return json.dumps({"chart": {"result": [chart], "error": None}}).encode()
+
+
+def serve(port: int) -> None:
+    from aiohttp import web
+
+    body = chart_body()
+
+    async def chart(request):
+        return web.Response(body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/v8/finance/chart/{symbol}", chart)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port: int, timeout: float = 10.0) -> None:
+    t0 = time.monotonic()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() - t0 > timeout:
+                raise
+            time.sleep(0.05)
+
+
+async def fetch_all(url: str, backend: str, requests: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+    breakers = BreakerRegistry()
+    async with create_session(backend, limit=concurrency) as session:
+        await asyncio.gather(
+            *(
+                bound_fetch(sem, f"{url}SYM{i}", {"interval": "1d"}, session, breakers)
+                for i in range(requests)
+            )
+        )
+
+
+def measure(url: str, loop: str, backend: str, requests: int, concurrency: int):
+    """
+    return: tuple
+        (seconds, requests per second, CPU milliseconds per request)
+    """
+    event_loop = new_event_loop(loop)
+    try:
+        # WARM UP CONNECTIONS AND CODE PATHS
+        event_loop.run_until_complete(fetch_all(url, backend, concurrency, concurrency))
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        event_loop.run_until_complete(fetch_all(url, backend, requests, concurrency))
+        dt, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    finally:
+        event_loop.close()
+    return dt, requests / dt, 1000 * cpu / requests
+
+
+def main(requests: int = 5000, concurrency: int = 100) -> None:
+    log.setup()
+    logging.disable(logging.INFO)
+
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    try:
+        wait_for(port)
+        url = f"http://127.0.0.1:{port}/v8/finance/chart/"
+        print(f"{requests} requests, concurrency {concurrency}")
+        print(
+            f"{'loop':10} {'backend':10} {'seconds':>10} {'req/s':>10} {'CPU ms/req':>12}"
+        )
+        for loop, loop_module in loops.items():
+            for backend, backend_module in backends.items():
+                missing = [
+                    m
+                    for m in (loop_module, backend_module)
+                    if m is not None and importlib.util.find_spec(m) is None
+                ]
+                if missing:
+                    print(
+                        f"{loop:10} {backend:10} {'not installed: ' + ', '.join(missing):>34}"
+                    )
+                    continue
+                dt, rate, cpu = measure(url, loop, backend, requests, concurrency)
+                print(f"{loop:10} {backend:10} {dt:10.2f} {rate:10.0f} {cpu:12.3f}")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,120 @@
+import copy
+import json
+import logging
+
+import pytest
+
+import YPipeline.log
+import YPipeline.Utils.AsynchTools as AsynchTools
+
+# VALID CHART RESULT OF THREE DAILY BARS WITH A DIVIDEND AND A SPLIT
+_chart_result = {
+    "meta": {
+        "symbol": "A",
+        "exchangeName": "NMS",
+        "currency": "USD",
+        "dataGranularity": "1d",
+        "priceHint": 2,
+        "exchangeTimezoneName": "America/New_York",
+    },
+    "timestamp": [1600090200, 1600176600, 1600263000],
+    "indicators": {
+        "quote": [
+            {
+                "open": [1.0, 2.0, 3.0],
+                "high": [1.5, 2.5, 3.5],
+                "low": [0.5, 1.5, 2.5],
+                "close": [1.2, 2.2, 3.2],
+                "volume": [10, 20, 30],
+            }
+        ],
+        "adjclose": [{"adjclose": [1.1, 2.1, 3.1]}],
+    },
+    "events": {
+        "dividends": {"1600090200": {"amount": 0.5, "date": 1600090200}},
+        "splits": {
+            "1600176600": {
+                "date": 1600176600,
+                "numerator": 2,
+                "denominator": 1,
+                "splitRatio": "2:1",
+            }
+        },
+    },
+}
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+    async def json(self, loads=json.loads):
+        return loads(json.dumps(self.payload))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """
+    Chart responses per symbol, listed symbols answer 404.
+    """
+
+    timeout = None
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        symbol = url.split("/")[-1]
+        self.requests.append((symbol, params))
+        if symbol in self.missing:
+            return FakeResponse(
+                404, {"chart": {"result": None, "error": {"code": "Not Found"}}}
+            )
+        data = copy.deepcopy(_chart_result)
+        data["meta"]["symbol"] = symbol
+        return FakeResponse(200, {"chart": {"result": [data], "error": None}})
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+@pytest.fixture
+def chart_result():
+    return copy.deepcopy(_chart_result)
+
+
+@pytest.fixture
+def fake_session():
+    """
+    Factory of stub sessions serving chart_result for
+    every symbol.
+    """
+    return FakeSession
+
+
+@pytest.fixture
+def quiet_log(monkeypatch):
+    # LOG WITHOUT THE FILE HANDLERS OF log.setup
+    for name in ("debug", "info", "warning", "error", "fatal", "exception"):
+        monkeypatch.setattr(YPipeline.log, name, getattr(logging, name))
+
+
+@pytest.fixture
+def fake_summary(monkeypatch):
+    async def aparse_summary(sem, symbol, session, breakers=None):
+        return {"symbol": symbol}
+
+    monkeypatch.setattr(AsynchTools, "aparse_summary", aparse_summary)
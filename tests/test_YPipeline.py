@@ -1,6 +1,55 @@
+import asyncio
+
+import pytest
+
 from YPipeline.Utils.DateTimeTools import validate_date
+from YPipeline.Utils.HealthTools import SymbolHealth
+from YPipeline.YPipeline import Symbols, YahooManual
+
+
+class DropScheduler:
+    def __init__(self, dropped):
+        self.dropped = dropped
+        self.fetched = []
+
+    def update_meta(self, url, meta):
+        pass
+
+    def mark_fetched(self, symbol, interval, now):
+        self.fetched.append(symbol)
+
+    def filter(self, combinations, now):
+        return [c for c in combinations if c[0].split("/")[-1] != self.dropped]
 
 
 def test___validate_date():
     validate_date("2020-01-01")
     assert True
+
+
+@pytest.mark.usefixtures("quiet_log", "fake_summary")
+def test___yahoo_manual___scheduler_drop(fake_session):
+    session = fake_session()
+    scheduler = DropScheduler("B")
+    manual = YahooManual(Symbols(["A", "B", "C"]), scheduler=scheduler, session=session)
+    cache = asyncio.run(manual.get(None, "5d", "1d"))
+
+    assert [symbol for symbol, _ in session.requests] == ["A", "C"]
+    assert scheduler.fetched == ["A", "C"]
+    # EACH PRICE SERIES KEEPS THE SUMMARY OF ITS OWN SYMBOL
+    assert [
+        (prices["symbol"].iat[0], summary["symbol"])
+        for (_, prices, _, _), summary in cache
+    ] == [("A", "A"), ("C", "C")]
+
+
+@pytest.mark.usefixtures("quiet_log", "fake_summary")
+def test___yahoo_manual___health_once_per_run(fake_session):
+    health = SymbolHealth()
+    session = fake_session(missing=["DEAD"])
+    manual = YahooManual(Symbols(["A", "DEAD"]), health=health, session=session)
+    asyncio.run(manual.get(None, "max", "all"))
+
+    assert sum(symbol == "DEAD" for symbol, _ in session.requests) > 1
+    assert health.report()["DEAD"]["failures"] == 1
+    assert "A" not in health
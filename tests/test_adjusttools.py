@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from YPipeline.Utils.AdjustTools import AdjustmentEngine, adjust_results
+from YPipeline.Utils.PanelTools import build_panel
+from YPipeline.Utils.ParseTools import parse_prices
+
+dates = ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-06"]
+
+
+def prices(symbol, close, volume):
+    df = pd.DataFrame(
+        {"open": close, "high": close, "low": close, "close": close, "volume": volume},
+        index=dates,
+    )
+    df["symbol"] = symbol
+    df.index.name = "date"
+    return df
+
+
+def actions(symbol, date, column, value):
+    df = pd.DataFrame({column: [value], "symbol": [symbol]}, index=[date])
+    df.index.name = "date"
+    return df
+
+
+def test___split():
+    panel = build_panel([prices("A", [10.0, 10.0, 5.0, 5.0], [100, 100, 200, 200])])
+    engine = AdjustmentEngine(panel)
+    split = actions("A", "2020-01-03", "splits", 2.0)
+    assert engine.add_splits([split]) == 1
+
+    adjusted = engine.adjusted()
+    np.testing.assert_allclose(adjusted.field("close")["A"], [5.0] * 4)
+    np.testing.assert_allclose(adjusted.field("volume")["A"], [200.0] * 4)
+
+    # ALREADY APPLIED SPLITS ARE IGNORED
+    assert engine.add_splits([split]) == 0
+    np.testing.assert_allclose(engine.adjusted().field("close")["A"], [5.0] * 4)
+
+
+def test___dividend___batch():
+    panel = build_panel(
+        [
+            prices("A", [10.0, 10.0, 10.0, 10.0], [1, 1, 1, 1]),
+            prices("B", [20.0, np.nan, 20.0, 20.0], [1, 1, 1, 1]),
+        ]
+    )
+    engine = AdjustmentEngine(panel)
+    engine.add_dividends(
+        [
+            actions("A", "2020-01-03", "dividends", 1.0),
+            actions("B", "2020-01-03", "dividends", 2.0),
+            actions("B", "2020-01-06", "dividends", 2.0),
+        ]
+    )
+    close = engine.adjusted().field("close")
+    np.testing.assert_allclose(close["A"], [9.0, 9.0, 10.0, 10.0])
+    np.testing.assert_allclose(close["B"], [20.0 * 0.9 * 0.9, np.nan, 20.0 * 0.9, 20.0])
+
+
+def test___update___incremental():
+    panel = build_panel([prices("A", [10.0, 10.0, 5.0, 5.0], [1, 1, 1, 1])])
+    engine = AdjustmentEngine(panel)
+    engine.add_splits([actions("A", "2020-01-03", "splits", 2.0)])
+
+    extended = prices("A", [10.0, 10.0, 5.0, 5.0], [1, 1, 1, 1])
+    extended.loc["2020-01-07"] = extended.iloc[-1]
+    engine.update(build_panel([extended]))
+    engine.add_splits([actions("A", "2020-01-07", "splits", 5.0)])
+
+    np.testing.assert_allclose(engine.price_factor[:, 0], [0.1, 0.1, 0.2, 0.2, 1.0])
+
+
+def test___adjust_results():
+    results = [
+        (
+            (
+                "1d",
+                prices("A", [10.0, 10.0, 5.0, 5.0], [1, 1, 1, 1]),
+                None,
+                actions("A", "2020-01-03", "splits", 2.0),
+            ),
+            {},
+        )
+    ]
+    panels = adjust_results(results, adjust_splits=True)
+    np.testing.assert_allclose(panels["1d"].field("close")["A"], [5.0] * 4)
+
+
+def test___adjust_results___chart_split():
+    # YAHOO CHART QUOTES ARE ALREADY SPLIT ADJUSTED, ONLY CLOSE
+    # MISSES THE DIVIDEND (2:1 SPLIT ON THE THIRD BAR)
+    stamps = [1577975400, 1578061800, 1578321000, 1578407400]
+    close = [50.0, 50.0, 50.0, 50.0]
+    chart = {
+        "meta": {
+            "symbol": "A",
+            "exchangeName": "NMS",
+            "currency": "USD",
+            "dataGranularity": "1d",
+            "priceHint": 2,
+            "exchangeTimezoneName": "America/New_York",
+        },
+        "timestamp": stamps,
+        "indicators": {
+            "quote": [
+                {
+                    "open": close,
+                    "high": close,
+                    "low": close,
+                    "close": close,
+                    "volume": [200, 200, 200, 200],
+                }
+            ],
+            "adjclose": [{"adjclose": [49.0, 49.0, 50.0, 50.0]}],
+        },
+        "events": {
+            "dividends": {str(stamps[2]): {"amount": 1.0, "date": stamps[2]}},
+            "splits": {
+                str(stamps[2]): {
+                    "date": stamps[2],
+                    "numerator": 2,
+                    "denominator": 1,
+                    "splitRatio": "2:1",
+                }
+            },
+        },
+    }
+    parsed = parse_prices(chart, validated=True)
+    assert parsed[3] is not None
+
+    panel = adjust_results([(parsed, {})])["1d"]
+    np.testing.assert_allclose(panel.field("close")["A"], [49.0, 49.0, 50.0, 50.0])
+    np.testing.assert_allclose(panel.field("close")["A"], panel.field("adjclose")["A"])
+    np.testing.assert_allclose(panel.field("volume")["A"], [200.0] * 4)
@@ -0,0 +1,59 @@
+import asyncio
+
+from YPipeline.Utils.AsynchTools import run_pool
+
+
+def test___run_pool___order_and_bounds():
+    state = {"running": 0, "max_running": 0, "produced": 0, "max_ahead": 0}
+    done = []
+
+    def items():
+        for i in range(50):
+            state["produced"] += 1
+            state["max_ahead"] = max(state["max_ahead"], state["produced"] - len(done))
+            yield i
+
+    async def func(x):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        await asyncio.sleep(0.001 * (x % 3))
+        state["running"] -= 1
+        done.append(x)
+        return x * x
+
+    results = asyncio.run(run_pool(func, items(), workers=4, queue_size=2))
+
+    assert results == [x * x for x in range(50)]
+    assert state["max_running"] <= 4
+    # AT MOST workers + queue_size + 1 ITEMS PULLED AHEAD OF COMPLETION
+    assert state["max_ahead"] <= 7
+
+
+def test___run_pool___empty():
+    async def func(x):
+        return x
+
+    assert asyncio.run(run_pool(func, [], workers=3)) == []
+
+
+def test___run_pool___failure_cancels_pool():
+    started = []
+
+    async def func(x):
+        started.append(x)
+        if x == 5:
+            raise ValueError(x)
+        await asyncio.sleep(0.01)
+        return x
+
+    async def run():
+        try:
+            await run_pool(func, range(1000), workers=3, queue_size=1)
+        except ValueError as e:
+            # NO WORKER OR PRODUCER LEFT RUNNING
+            return e, asyncio.all_tasks() - {asyncio.current_task()}
+
+    error, pending = asyncio.run(run())
+    assert error.args == (5,)
+    assert pending == set()
+    assert max(started) < 10
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientConnectionError, ClientTimeout, InvalidURL
+
+from YPipeline.Utils.AsynchTools import bound_fetch
+from YPipeline.Utils.BreakerTools import (
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    request_timeout,
+)
+from YPipeline.Utils.PriorityTools import DeadlineExceededError, request_priority
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test___circuit_breaker___states():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    # ONE PROBE AFTER THE RESET TIMEOUT
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    # FAILED PROBE DOUBLES THE WAIT
+    breaker.failure()
+    clock.now = 25
+    assert breaker.state == "open"
+    clock.now = 30
+    assert breaker.check() is True
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.check() is False
+
+
+def test___circuit_breaker___abort_probe():
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=1, reset_timeout=1, clock=clock)
+    breaker.failure()
+    clock.now = 1
+    assert breaker.check() is True
+    breaker.abort()
+    assert breaker.check() is True
+
+
+def test___breaker_registry___endpoint():
+    registry = BreakerRegistry(threshold=1)
+    a = registry.get("https://query2.finance.yahoo.com/v8/finance/chart/A")
+    b = registry.get("https://query2.finance.yahoo.com/v8/finance/chart/B")
+    c = registry.get("https://finance.yahoo.com/quote/A")
+    assert a is b
+    assert a is not c
+    assert a.threshold == 1
+
+
+class FailingSession:
+    def __init__(self, error=ClientConnectionError("down")):
+        self.error = error
+        self.calls = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+def test___bound_fetch___fails_fast():
+    registry = BreakerRegistry(threshold=3, reset_timeout=60)
+    session = FailingSession()
+    url = "http://localhost/v8/finance/chart/A"
+
+    async def run():
+        sem = asyncio.Semaphore(1)
+        for _ in range(3):
+            with pytest.raises(ClientConnectionError):
+                await bound_fetch(sem, url, {}, session, registry)
+        with pytest.raises(CircuitOpenError):
+            await bound_fetch(sem, url, {}, session, registry)
+
+    asyncio.run(run())
+    assert session.calls == 3
+
+
+def test___bound_fetch___client_error_probe():
+    registry = BreakerRegistry(threshold=1, reset_timeout=0)
+    url = "http://localhost/v8/finance/chart/A"
+
+    async def run():
+        sem = asyncio.Semaphore(1)
+        with pytest.raises(ClientConnectionError):
+            await bound_fetch(sem, url, {}, FailingSession(), registry)
+        # PROBES FAILING WITHOUT A CONNECTION ERROR DO NOT BLOCK THE BREAKER
+        session = FailingSession(InvalidURL(url))
+        for _ in range(2):
+            with pytest.raises(InvalidURL):
+                await bound_fetch(sem, url, {}, session, registry)
+        return session.calls
+
+    assert asyncio.run(run()) == 2
+    assert registry.get(url).check() is True
+
+
+def test___request_timeout___deadline():
+    async def run():
+        assert request_timeout(None) is None
+        timeout = ClientTimeout(total=300, sock_connect=30)
+        assert request_timeout(timeout) is timeout
+
+        with request_priority(deadline=5):
+            capped = request_timeout(timeout)
+            assert capped.total <= 5
+            assert capped.sock_connect == 30
+            assert request_timeout(None).total <= 5
+
+        with request_priority(deadline=-1):
+            with pytest.raises(DeadlineExceededError):
+                request_timeout(timeout)
+
+    asyncio.run(run())
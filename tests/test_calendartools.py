@@ -0,0 +1,98 @@
+from datetime import date, datetime
+
+import pytest
+
+from YPipeline.Utils.CalendarTools import (
+    ExchangeCalendar,
+    MarketScheduler,
+    TradingSession,
+    ZoneInfo,
+    easter_sunday,
+    us_holidays,
+)
+from YPipeline.Utils.UrlTools import base_url
+
+newyork = ZoneInfo("America/New_York")
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=newyork).timestamp()
+
+
+@pytest.mark.parametrize(
+    "year,expected",
+    [(2019, date(2019, 4, 21)), (2020, date(2020, 4, 12)), (2024, date(2024, 3, 31))],
+)
+def test___easter_sunday(year, expected):
+    assert easter_sunday(year) == expected
+
+
+@pytest.mark.parametrize(
+    "day",
+    [
+        date(2020, 4, 10),  # GOOD FRIDAY
+        date(2020, 7, 3),  # INDEPENDENCE DAY OBSERVED
+        date(2020, 11, 26),  # THANKSGIVING
+        date(2021, 12, 24),  # CHRISTMAS OBSERVED
+        date(2023, 6, 19),  # JUNETEENTH
+    ],
+)
+def test___us_holidays(day):
+    assert day in us_holidays(day.year)
+
+
+session = TradingSession(
+    "America/New_York", **ExchangeCalendar()._session_settings["America/New_York"]
+)
+
+test_windows = [
+    # FRIDAY EVENING TO SUNDAY EVENING
+    (ts(2020, 9, 11, 20, 30), ts(2020, 9, 13, 22, 0), False),
+    # OVERNIGHT
+    (ts(2020, 9, 14, 21, 0), ts(2020, 9, 15, 3, 0), False),
+    # INTO THE PRE-MARKET
+    (ts(2020, 9, 14, 21, 0), ts(2020, 9, 15, 4, 30), True),
+    # GOOD FRIDAY LONG WEEKEND
+    (ts(2020, 4, 9, 20, 0), ts(2020, 4, 12, 12, 0), False),
+    # EMPTY WINDOW
+    (ts(2020, 9, 14, 12, 0), ts(2020, 9, 14, 12, 0), False),
+]
+
+
+@pytest.mark.parametrize("start,end,expected", test_windows)
+def test___has_trading_between(start, end, expected):
+    assert session.has_trading_between(start, end) is expected
+
+
+def test___scheduler___filter():
+    scheduler = MarketScheduler(grace=0)
+    scheduler.update_meta(
+        f"{base_url}chart/AAPL", {"exchangeTimezoneName": "America/New_York"}
+    )
+    scheduler.mark_fetched("AAPL", "1d", ts(2020, 9, 11, 20, 30))
+    scheduler.mark_fetched("UNKNOWN", "1d", ts(2020, 9, 11, 20, 30))
+
+    combinations = [
+        (f"{base_url}chart/AAPL", {"interval": "1d"}),
+        (f"{base_url}chart/UNKNOWN", {"interval": "1d"}),
+        (f"{base_url}chart/NEW", {"interval": "1d"}),
+        (f"{base_url}chart/EURUSD=X", {"interval": "1d"}),
+    ]
+    sunday = ts(2020, 9, 13, 12, 0)
+    kept = [url.split("/")[-1] for url, _ in scheduler.filter(combinations, sunday)]
+    assert kept == ["UNKNOWN", "NEW", "EURUSD=X"]
+
+    monday = ts(2020, 9, 14, 10, 0)
+    assert len(scheduler.filter(combinations, monday)) == 4
+
+
+def test___scheduler___save_load(tmp_path):
+    scheduler = MarketScheduler()
+    scheduler.calendar.register("AAPL", "America/New_York")
+    scheduler.mark_fetched("AAPL", "1m", 10.0)
+    scheduler.save(str(tmp_path / "schedule.json"))
+
+    loaded = MarketScheduler()
+    loaded.load(str(tmp_path / "schedule.json"))
+    assert loaded.last_fetch("AAPL", "1m") == 10.0
+    assert loaded.calendar.symbol_session("AAPL").timezone == "America/New_York"
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from YPipeline.Utils.ChangeTools import ChangeFeed
+
+dates = list(pd.date_range("2020-01-01", periods=200).strftime("%Y-%m-%d"))
+
+
+def prices(dates, close, symbol="A"):
+    df = pd.DataFrame(
+        {"close": close, "volume": [10] * len(close)},
+        index=pd.Index(dates, name="date"),
+    )
+    df["symbol"] = symbol
+    return df
+
+
+def dividends(dates, amounts, symbol="A"):
+    df = pd.DataFrame({"dividends": amounts}, index=pd.Index(dates, name="date"))
+    df["symbol"] = symbol
+    return df
+
+
+def test___change_feed___prices():
+    feed = ChangeFeed(block=16, tail=4)
+    close = np.arange(200.0)
+
+    assert len(feed.diff_prices("1d", prices(dates[:198], close[:198]))) == 198
+    assert feed.diff_prices("1d", prices(dates[:198], close[:198])).empty
+
+    # REVISED LAST BAR PLUS TWO APPENDED BARS
+    revised = close.copy()
+    revised[197] = -1.0
+    delta = feed.diff_prices("1d", prices(dates, revised))
+    assert list(delta.index) == dates[197:]
+
+    # REVISION IN OLDER HISTORY EMITS ITS BLOCK
+    revised[20] = -1.0
+    delta = feed.diff_prices("1d", prices(dates, revised))
+    assert dates[20] in delta.index
+    assert len(delta) == 16
+
+    assert feed.rows_in == 198 * 2 + 200 * 2
+    assert feed.rows_out == 198 + 3 + 16
+
+
+def test___change_feed___sliding_window():
+    feed = ChangeFeed(block=16, tail=4)
+    close = np.arange(200.0)
+    feed.diff_prices("1d", prices(dates[:150], close[:150]))
+
+    # SHORTER WINDOW OF THE SAME HISTORY - NEW ROWS AND THE ROWS
+    # OF THE BLOCK STRADDLING THE WINDOW START
+    delta = feed.diff_prices("1d", prices(dates[140:], close[140:]))
+    assert list(delta.index) == dates[140:144] + dates[150:]
+
+    # THE STRADDLING BLOCK IS CUT AT THE WINDOW
+    assert feed.diff_prices("1d", prices(dates[140:], close[140:])).empty
+
+    # HISTORY BEFORE THE WINDOW IS STILL KNOWN
+    assert feed.diff_prices("1d", prices(dates, close)).empty
+
+
+def test___change_feed___straddling_block():
+    feed = ChangeFeed(block=8, tail=4)
+    close = np.arange(100.0)
+    feed.diff_prices("1d", prices(dates[:100], close))
+
+    # REVISION INSIDE THE BLOCK STRADDLING THE WINDOW START
+    revised = close.copy()
+    revised[5] = -1.0
+    delta = feed.diff_prices("1d", prices(dates[4:100], revised[4:]))
+    assert dates[5] in delta.index
+    assert list(delta.index) == dates[4:8]
+
+
+def test___change_feed___actions():
+    feed = ChangeFeed()
+    frame = dividends(["2020-01-01", "2020-02-01"], [0.5, 0.6])
+
+    assert len(feed.diff_actions("dividends", frame)) == 2
+    assert feed.diff_actions("dividends", frame) is None
+
+    frame = dividends(["2020-01-01", "2020-02-01", "2020-03-01"], [0.5, 0.7, 0.8])
+    delta = feed.diff_actions("dividends", frame)
+    assert list(delta.index) == ["2020-02-01", "2020-03-01"]
+
+
+def test___change_feed___changes_layout():
+    feed = ChangeFeed()
+    results = [
+        (("1d", prices(dates[:5], np.arange(5.0)), None, None), {"a": 1}),
+        ((None, None, None, None), {}),
+    ]
+    feed.changes(results)
+    (interval, delta, div, split), summary = feed.changes(results)[0]
+    assert interval == "1d"
+    assert delta.empty
+    assert div is None and split is None
+    assert summary == {"a": 1}
+
+
+def test___change_feed___save_load(tmp_path):
+    feed = ChangeFeed(block=16, tail=4)
+    close = np.arange(200.0)
+    feed.diff_prices("1d", prices(dates, close))
+    feed.diff_actions("dividends", dividends(["2020-01-01"], [0.5]))
+    feed.save(str(tmp_path / "feed.json"))
+
+    restored = ChangeFeed()
+    restored.load(str(tmp_path / "feed.json"))
+    assert restored.block == 16
+    assert restored.diff_prices("1d", prices(dates, close)).empty
+    assert restored.diff_actions("dividends", dividends(["2020-01-01"], [0.5])) is None
+
+
+def test___yahoomanual___changes_requires_feed():
+    import asyncio
+
+    from YPipeline.YPipeline import Symbols, YahooManual
+
+    with pytest.raises(ValueError):
+        asyncio.run(YahooManual(Symbols(["A"])).get(["A"], output="changes"))
@@ -0,0 +1,119 @@
+import asyncio
+import re
+import zipfile
+
+import pandas as pd
+import pytest
+
+import YPipeline.Utils.ExcelTools as ExcelTools
+import YPipeline.Utils.TransportTools as TransportTools
+from YPipeline.Utils.ExcelTools import ExcelExporter
+
+
+def prices(symbol, dates, close):
+    df = pd.DataFrame(
+        {"close": close, "volume": [10] * len(close), "currency": "USD"}, index=dates
+    )
+    df["symbol"] = symbol
+    df.index.name = "date"
+    return df
+
+
+def actions(symbol, date, column, value):
+    df = pd.DataFrame({column: [value], "symbol": [symbol]}, index=[date])
+    df.index.name = "date"
+    return df
+
+
+def sheet_names(path):
+    with zipfile.ZipFile(path) as z:
+        workbook = z.read("xl/workbook.xml").decode()
+    return re.findall(r'<sheet name="([^"]+)"', workbook)
+
+
+def sheet_xml(path, number):
+    with zipfile.ZipFile(path) as z:
+        return z.read(f"xl/worksheets/sheet{number}.xml").decode()
+
+
+def test___excel_exporter___write_results(tmp_path):
+    path = str(tmp_path / "out.xlsx")
+    results = [
+        (
+            (
+                "1d",
+                prices("A", ["2020-01-01", "2020-01-02"], [1.0, 2.0]),
+                actions("A", "2020-01-02", "dividends", 0.5),
+                None,
+            ),
+            {},
+        ),
+        (("1d", prices("B", ["2020-01-01"], [3.0]), None, None), {}),
+        ((None, None, None, None), {}),
+    ]
+
+    with ExcelExporter(path) as exporter:
+        names = exporter.write_results(results)
+
+    assert names == ["A 1d", "B 1d", None]
+    assert exporter.sheets == 2
+    assert exporter.rows == 3
+    assert sheet_names(path) == ["dividends", "splits", "A 1d", "B 1d"]
+
+    sheet = sheet_xml(path, 3)
+    # HEADER AND TWO ROWS, ONLY PRICE FIELDS
+    assert sheet.count("<row ") == 3
+    assert "<v>2</v>" in sheet
+    assert "<v>0.5</v>" in sheet_xml(path, 1)
+
+
+def test___excel_exporter___sheet_name(tmp_path):
+    with ExcelExporter(str(tmp_path / "out.xlsx"), actions=False) as exporter:
+        exporter._add_sheet(exporter.sheet_name("a", "1d"))
+        assert exporter.sheet_name("A", "1d") == "A~1 1d"
+        assert exporter.sheet_name("X" * 40, "1d") == "X" * 28 + " 1d"
+        assert exporter.sheet_name("A/B:C", "1m") == "A_B_C 1m"
+
+
+def test___excel_exporter___rollover(tmp_path):
+    path = str(tmp_path / "out.xlsx")
+    results = [
+        (("1d", prices(s, ["2020-01-01"], [1.0]), None, None), {}) for s in "ABCDE"
+    ]
+    with ExcelExporter(path, max_sheets=2) as exporter:
+        exporter.write_results(results)
+
+    assert exporter.paths == [path, path[:-5] + "-2.xlsx", path[:-5] + "-3.xlsx"]
+    assert exporter.sheets == 5
+    assert sheet_names(exporter.paths[1]) == ["dividends", "splits", "C 1d", "D 1d"]
+    assert sheet_names(exporter.paths[2]) == ["dividends", "splits", "E 1d"]
+
+
+def test___excel_exporter___open_file_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExcelTools, "open_file_limit", lambda: 1024)
+    with pytest.raises(ValueError, match="open file limit 1024"):
+        ExcelExporter(str(tmp_path / "out.xlsx"), max_sheets=1000)
+    ExcelExporter(str(tmp_path / "out.xlsx"), max_sheets=900).close()
+
+
+@pytest.mark.usefixtures("quiet_log", "fake_summary")
+def test___stream_excel___own_session(tmp_path, fake_session, monkeypatch):
+    created = []
+
+    def create_session(backend, timeout):
+        created.append((backend, timeout))
+        return fake_session()
+
+    monkeypatch.setattr(TransportTools, "create_session", create_session)
+    exporter = asyncio.run(
+        ExcelTools.stream_excel(
+            ["A", "B", "C"],
+            str(tmp_path / "out.xlsx"),
+            "5d",
+            batch_size=2,
+            timeout=5,
+            backend="httpx",
+        )
+    )
+    assert created == [("httpx", 5)]
+    assert exporter.sheets == 3
@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from YPipeline.Utils.FxTools import FxConverter, major_currency
+
+dates = ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-06"]
+
+
+def frame(symbol, currency, index, **columns):
+    df = pd.DataFrame(columns, index=pd.Index(index, name="date"))
+    df["symbol"] = symbol
+    df["currency"] = currency
+    return df
+
+
+def result(symbol, currency, dividends=None):
+    prices = frame(
+        symbol,
+        currency,
+        dates,
+        close=[10.0, 20.0, 30.0, 40.0],
+        adjclose=[10.0, 20.0, 30.0, 40.0],
+        volume=[1, 2, 3, 4],
+    )
+    return "1d", prices, dividends, None
+
+
+# FX BARS MISSING 2020-01-01 AND 2020-01-03 AND HOLDING A NAN CLOSE
+eurusd = frame("EURUSD=X", "USD", dates[1:], close=[1.1, np.nan, 1.3])
+gbpusd = frame("GBPUSD=X", "USD", dates, close=[1.5, 1.5, 1.5, 1.5])
+
+
+def test___major_currency():
+    assert major_currency("GBp") == ("GBP", 0.01)
+    assert major_currency("EUR") == ("EUR", 1.0)
+    with pytest.raises(ValueError):
+        FxConverter("GBp")
+
+
+def test___fx_converter___as_of_rates():
+    fx = FxConverter("USD")
+    fx.add("1d", eurusd)
+    dividends = frame("SAP.DE", "EUR", ["2020-01-03"], dividends=[2.0])
+    original = result("SAP.DE", "EUR", dividends)
+    _, prices, dividends, _ = fx.convert(original)
+
+    # FIRST RATE BACKFILLS, NAN CLOSE IS SKIPPED
+    assert np.allclose(prices["close"], [11.0, 22.0, 33.0, 52.0])
+    assert np.allclose(prices["adjclose"], prices["close"])
+    assert list(prices["volume"]) == [1, 2, 3, 4]
+    assert set(prices["currency"]) == {"USD"}
+    assert np.allclose(dividends["dividends"], [2.2])
+    # PARSED FRAME UNCHANGED
+    assert list(original[1]["close"]) == [10.0, 20.0, 30.0, 40.0]
+
+
+def test___fx_converter___pence():
+    fx = FxConverter("USD")
+    fx.add("1d", gbpusd)
+    _, prices, _, _ = fx.convert(result("VOD.L", "GBp"))
+    assert np.allclose(prices["close"], [0.15, 0.3, 0.45, 0.6])
+
+    # ONLY SCALED FOR A GBP BASE
+    _, prices, _, _ = FxConverter("GBP").convert(result("VOD.L", "GBp"))
+    assert np.allclose(prices["close"], [0.1, 0.2, 0.3, 0.4])
+    assert set(prices["currency"]) == {"GBP"}
+
+
+def test___fx_converter___unconverted():
+    fx = FxConverter("USD")
+    base = result("A", "USD")
+    assert fx.convert(base) is base
+    # NO FX SERIES - LEFT IN THE LISTING CURRENCY
+    missing = result("SAP.DE", "EUR")
+    assert fx.convert(missing) is missing
+    empty = (None, None, None, None)
+    assert fx.convert(empty) is empty
+
+
+def test___fx_converter___fetch_once():
+    fx = FxConverter("USD")
+    calls = []
+
+    async def fetch(pair, interval):
+        calls.append((pair, interval))
+        await asyncio.sleep(0)
+        return "1d", frame(pair, "USD", dates, close=[1.1] * 4), None, None
+
+    async def run():
+        pending = {}
+        results = await asyncio.gather(
+            *(
+                fx.aconvert(result(s, "EUR"), fetch, pending)
+                for s in ("SAP.DE", "BMW.DE")
+            )
+        )
+        # CACHED SERIES COVERS THE NEXT BATCH
+        results.append(await fx.aconvert(result("SAP.DE", "EUR"), fetch, {}))
+        return results
+
+    results = asyncio.run(run())
+    assert calls == [("EURUSD=X", "1d")]
+    assert all(set(r[1]["currency"]) == {"USD"} for r in results)
@@ -0,0 +1,78 @@
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from YPipeline.Utils.CalendarTools import TradingSession, ZoneInfo
+from YPipeline.Utils.GapTools import (
+    find_gaps,
+    gap_params,
+    merge_quotes,
+    to_epoch_seconds,
+)
+
+newyork = ZoneInfo("America/New_York")
+session = TradingSession("America/New_York", open=time(9, 30), close=time(16, 0))
+
+
+def ts(*args):
+    return int(datetime(*args, tzinfo=newyork).timestamp())
+
+
+def test___to_epoch_seconds():
+    index = ["2020-09-14T09:30:00-04:00", "2020-09-14T09:31:00-04:00"]
+    assert list(to_epoch_seconds(index)) == [
+        ts(2020, 9, 14, 9, 30),
+        ts(2020, 9, 14, 9, 31),
+    ]
+    assert list(to_epoch_seconds(["2020-09-14"], "America/New_York")) == [
+        ts(2020, 9, 14)
+    ]
+
+
+def test___find_gaps___intraday():
+    # 09:30 - 16:00 OVER TWO DAYS WITH A HOLE AND A MISSING CLOSE
+    day1 = np.arange(ts(2020, 9, 14, 9, 30), ts(2020, 9, 14, 16, 0), 300)
+    day2 = np.arange(ts(2020, 9, 15, 9, 30), ts(2020, 9, 15, 15, 0), 300)
+    observed = np.r_[day1[:10], day1[13:], day2]
+
+    gaps = find_gaps(observed, session, "5m", end=ts(2020, 9, 15, 16, 0))
+    assert gaps == [
+        (int(day1[10]), int(day1[13])),
+        (ts(2020, 9, 15, 15, 0), ts(2020, 9, 15, 16, 0)),
+    ]
+    assert find_gaps(
+        observed, session, "5m", end=ts(2020, 9, 15, 16, 0), min_bars=4
+    ) == [(ts(2020, 9, 15, 15, 0), ts(2020, 9, 15, 16, 0))]
+
+
+def test___find_gaps___daily_skips_weekend():
+    dates = ["2020-09-10", "2020-09-11", "2020-09-15"]
+    observed = to_epoch_seconds(dates, "America/New_York")
+    gaps = find_gaps(observed, session, "1d")
+    assert gaps == [(ts(2020, 9, 14), ts(2020, 9, 15))]
+
+
+def test___find_gaps___invalid_interval():
+    with pytest.raises(ValueError):
+        find_gaps(np.array([0, 1]), session, "1wk")
+
+
+def test___gap_params___split():
+    params = gap_params([(0, 10 * 86400)], "1m")
+    assert [(p["period1"], p["period2"]) for p in params] == [
+        (0, 7 * 86400),
+        (7 * 86400, 10 * 86400),
+    ]
+    assert all(p["interval"] == "1m" for p in params)
+
+
+def test___merge_quotes():
+    quotes = pd.DataFrame({"close": [1.0, 3.0]}, index=["a", "c"])
+    quotes.index.name = "datetime"
+    fill = pd.DataFrame({"close": [2.0, 3.5]}, index=["b", "c"])
+    merged = merge_quotes(quotes, [fill, None])
+    assert list(merged.index) == ["a", "b", "c"]
+    assert list(merged.close) == [1.0, 2.0, 3.5]
+    assert merged.index.name == "datetime"
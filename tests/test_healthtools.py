@@ -0,0 +1,83 @@
+import pytest
+
+from YPipeline.Utils.HealthTools import SymbolHealth
+
+url = "https://query2.finance.yahoo.com/v8/finance/chart/"
+
+
+def test___symbol_health___exponential_recheck():
+    health = SymbolHealth(base_interval=10, max_interval=25, expire=1000)
+
+    health.failure("DEAD", "error:Not Found", now=0)
+    assert health.is_blocked("DEAD", now=5)
+    assert not health.is_blocked("DEAD", now=10)
+
+    health.failure("DEAD", "error:Not Found", now=10)
+    assert health.is_blocked("DEAD", now=29)
+    assert not health.is_blocked("DEAD", now=30)
+
+    # CAPPED AT max_interval
+    health.failure("DEAD", "empty", now=30)
+    assert health.report()["DEAD"]["next_check"] == 55
+    assert health.report()["DEAD"]["failures"] == 3
+
+
+def test___symbol_health___expire():
+    health = SymbolHealth(base_interval=10, expire=100)
+    health.failure("DEAD", "empty", now=0)
+    assert not health.is_blocked("DEAD", now=101)
+    assert "DEAD" not in health
+
+
+@pytest.mark.parametrize(
+    "reason, blocked",
+    [
+        ("error:Not Found", True),
+        ("empty", True),
+        ("required:timestamp", False),
+        ("error:Unprocessable Entity", False),
+    ],
+)
+def test___symbol_health___update(reason, blocked):
+    health = SymbolHealth()
+    health.update(url + "X", reason)
+    assert health.filter(["X", "Y"]) == (["Y"] if blocked else ["X", "Y"])
+
+    # VALID RESPONSE CLEARS THE SYMBOL
+    health.update(url + "X", None)
+    assert "X" not in health
+
+
+def test___symbol_health___no_data():
+    health = SymbolHealth()
+    health.update(url + "X", "empty")
+    # A VALID RESPONSE WITHOUT BARS STILL PROVES THE SYMBOL EXISTS
+    health.update(url + "X", "no_data")
+    assert "X" not in health
+
+
+def test___symbol_health___save_load(tmp_path):
+    health = SymbolHealth()
+    health.failure("DEAD", "empty", now=0)
+    health.save(str(tmp_path / "health.json"))
+
+    restored = SymbolHealth()
+    restored.load(str(tmp_path / "health.json"))
+    assert restored.report() == health.report()
+
+
+def test___symbol_health___one_failure_per_run():
+    health = SymbolHealth(base_interval=10, max_interval=1000)
+    statuses = {}
+    hook = health.collect(statuses)
+    # TWELVE INTERVALS OF A DEAD SYMBOL, ONE OF A PARTLY VALID ONE
+    for _ in range(12):
+        hook(url + "DEAD", "error:Not Found")
+    hook(url + "A", "empty")
+    hook(url + "A", None)
+    assert health.filter(["DEAD"]) == ["DEAD"]
+
+    health.record(statuses, now=0)
+    assert health.report()["DEAD"]["failures"] == 1
+    assert health.report()["DEAD"]["next_check"] == 10
+    assert "A" not in health
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+heavy_modules = ["aiohttp", "pandas", "numpy", "termcolor"]
+
+light_statements = [
+    "import YPipeline",
+    "from YPipeline import generate_price_params, generate_price_urls",
+    "from YPipeline import Symbols, YahooManual",
+    "import YPipeline.Utils.UrlTools",
+]
+
+
+@pytest.mark.parametrize("statement", light_statements)
+def test___import___no_heavy_dependencies(statement):
+    code = f"import sys; {statement}; print(','.join(m for m in {heavy_modules!r} if m in sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stdout.strip()
+    assert out == ""
+
+
+def test___lazy_attribute___unknown():
+    import YPipeline
+
+    with pytest.raises(AttributeError):
+        YPipeline.does_not_exist
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from YPipeline.Utils.IndicatorTools import (
+    ATR,
+    EMA,
+    SMA,
+    VWAP,
+    Indicator,
+    IndicatorEngine,
+    Volatility,
+    default_indicators,
+)
+
+
+def intraday(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        "2020-03-09 09:30", periods=n, freq="30min", tz="America/New_York"
+    ).map(lambda t: t.isoformat())
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[n // 4] = np.nan
+    prices = pd.DataFrame(
+        {
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": rng.integers(1, 1000, n),
+        },
+        index=pd.Index(index, name="datetime"),
+    )
+    prices["symbol"] = "A"
+    return prices
+
+
+indicators = dict(default_indicators, vwap_10=lambda: VWAP(10))
+
+
+def test___indicator_engine___incremental_matches_bootstrap():
+    prices = intraday()
+    full = IndicatorEngine(indicators)
+    full.add("30m", prices)
+
+    engine = IndicatorEngine(indicators)
+    engine.add("30m", prices.iloc[:30])
+    # OVERLAPPING REFRESHES - ONLY NEW BARS ARE APPLIED
+    for i in range(30, len(prices), 7):
+        engine.add("30m", prices.iloc[i - 3 : i + 7])
+
+    expected, result = full.frame("A", "30m"), engine.frame("A", "30m")
+    assert list(result.index) == list(prices.index)
+    assert result.index.name == "datetime"
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+def test___indicator_engine___pandas_reference():
+    prices = intraday()
+    engine = IndicatorEngine(
+        {"sma": lambda: SMA(20), "ema": lambda: EMA(10), "vol": lambda: Volatility(20)}
+    )
+    engine.add("30m", prices)
+    result = engine.frame("A", "30m")
+
+    # THE NAN BAR IS SKIPPED
+    assert result.iloc[50].isna().all()
+    result, close = result.drop(index=prices.index[50]), prices["close"].dropna()
+    np.testing.assert_allclose(result["sma"], close.rolling(20).mean())
+    np.testing.assert_allclose(result["ema"], close.ewm(span=10, adjust=False).mean())
+    np.testing.assert_allclose(
+        result["vol"], np.log(close).diff().rolling(20).std(), atol=1e-12
+    )
+
+
+def test___atr___wilder():
+    high = np.array([10.0, 11.0, 12.0, 11.5, 13.0])
+    low = np.array([9.0, 10.0, 10.5, 10.0, 11.0])
+    close = np.array([9.5, 10.5, 11.5, 10.5, 12.5])
+    atr = ATR(3)
+    out = atr.bootstrap({"high": high, "low": low, "close": close})
+
+    tr = [1.0, 1.5, 1.5, 1.5, 2.5]
+    seed = np.mean(tr[:3])
+    assert np.isnan(out[:2]).all()
+    assert np.isclose(out[2], seed)
+    assert np.isclose(out[3], seed + (tr[3] - seed) / 3)
+    assert np.isclose(out[4], out[3] + (tr[4] - out[3]) / 3)
+
+
+def test___vwap___session_reset():
+    vwap = VWAP()
+    data = {
+        "high": np.array([3.0, 6.0, 9.0]),
+        "low": np.array([3.0, 6.0, 9.0]),
+        "close": np.array([3.0, 6.0, 9.0]),
+        "volume": np.array([1.0, 3.0, 2.0]),
+        "session": np.array(["2020-01-02", "2020-01-02", "2020-01-03"]),
+    }
+    assert list(vwap.bootstrap(data)) == [3.0, 5.25, 9.0]
+    bar = {"high": 3.0, "low": 3.0, "close": 3.0, "volume": 2.0}
+    assert vwap.update(dict(bar, session="2020-01-03")) == 6.0
+    assert vwap.update(dict(bar, session="2020-01-06")) == 3.0
+
+
+def test___indicator_engine___add_results():
+    prices = intraday(40)
+    engine = IndicatorEngine({"sma": lambda: SMA(5)})
+    keys = engine.add_results(
+        [(("30m", prices, None, None), {}), ((None, None, None, None), {})]
+    )
+    assert keys == [("A", "30m")]
+    assert ("A", "30m") in engine
+    assert np.isclose(
+        engine.latest("A", "30m")["sma"], prices["close"].iloc[-5:].mean()
+    )
+
+
+def test___indicator_engine___revised_last_bar():
+    prices = intraday(60)
+    engine = IndicatorEngine(indicators)
+    engine.add("30m", prices.iloc[:30])
+
+    # SAME BARS, THE LAST ONE STILL FORMING HAS MOVED
+    revised = prices.iloc[:30].copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] *= 1.05
+    revised.iloc[-1, revised.columns.get_loc("volume")] += 500
+    engine.add("30m", revised)
+
+    full = IndicatorEngine(indicators)
+    full.add("30m", revised)
+    assert engine.frame("A", "30m").shape == (30, len(indicators))
+    np.testing.assert_allclose(
+        list(engine.latest("A", "30m").values()),
+        list(full.latest("A", "30m").values()),
+        rtol=1e-9,
+    )
+
+    # REVISED AGAIN TOGETHER WITH NEW BARS
+    final = prices.iloc[29:].copy()
+    final.iloc[0, final.columns.get_loc("close")] *= 0.98
+    engine.add("30m", final)
+    expected = IndicatorEngine(indicators)
+    expected.add("30m", pd.concat([revised.iloc[:29], final]))
+    np.testing.assert_allclose(
+        engine.frame("A", "30m").to_numpy(),
+        expected.frame("A", "30m").to_numpy(),
+        rtol=1e-9,
+    )
+
+
+def test___indicator___abstract():
+    class Incomplete(Indicator):
+        def bootstrap(self, data):
+            return data["close"]
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from YPipeline.Utils.PanelTools import build_panel, build_panels
+
+
+def prices(symbol, dates, close):
+    df = pd.DataFrame({"close": close, "volume": [10] * len(close)}, index=dates)
+    df["symbol"] = symbol
+    df.index.name = "date"
+    return df
+
+
+results = [
+    (("1d", prices("A", ["2020-01-01", "2020-01-03"], [1.0, 3.0]), None, None), {}),
+    (("1d", prices("B", ["2020-01-02", "2020-01-03"], [20.0, 30.0]), None, None), {}),
+    ((None, None, None, None), {}),
+]
+
+
+def test___build_panels():
+    panels = build_panels(results)
+    assert list(panels) == ["1d"]
+
+    panel = panels["1d"]
+    assert panel.symbols == ["A", "B"]
+    assert panel.values.shape == (6, 3, 2)
+    assert list(panel.index.strftime("%Y-%m-%d")) == [
+        "2020-01-01",
+        "2020-01-02",
+        "2020-01-03",
+    ]
+
+    close = panel.field("close")
+    np.testing.assert_array_equal(close["A"].to_numpy(), [1.0, np.nan, 3.0])
+    np.testing.assert_array_equal(close["B"].to_numpy(), [np.nan, 20.0, 30.0])
+    assert np.isnan(panel.field("open").to_numpy()).all()
+
+
+def test___panel___to_frame():
+    frame = build_panel([r[0][1] for r in results[:2]], fields=["close"]).to_frame()
+    assert list(frame.columns) == [("close", "A"), ("close", "B")]
+    assert frame.loc["2020-01-03", ("close", "B")] == 30.0
+
+
+def test___build_panel___intraday_mixed_offsets():
+    a = prices(
+        "A", ["2020-03-06T09:30:00-05:00", "2020-03-09T09:30:00-04:00"], [1.0, 2.0]
+    )
+    b = prices("B", ["2020-03-09T13:30:00+00:00"], [5.0])
+    panel = build_panel([a, b], fields=["close"], intraday=True)
+    assert panel.values.shape == (1, 2, 2)
+    assert panel.values[0, 1, 1] == 5.0
+    assert str(panel.index.tz) == "UTC"
+
+
+def test___build_panel___many_symbols():
+    dates = pd.date_range("2020-01-01", periods=50).strftime("%Y-%m-%d")
+    frames = [
+        prices(f"S{i}", dates[i % 7 :: 3], [float(i)] * len(dates[i % 7 :: 3]))
+        for i in range(300)
+    ]
+    # REPEATED SYMBOLS ARE SKIPPED
+    panel = build_panel(frames + frames[:10], fields=["close"])
+    assert panel.values.shape == (1, 50, 300)
+    assert np.all(np.diff(panel.timestamps) > 0)
+    np.testing.assert_array_equal(panel.values[0, 5::3, 5][: len(dates[5::3])], 5.0)
+    assert np.isnan(panel.values[0, 0, 5])
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from YPipeline.Utils.ParseTools import merge_frames, stitch_prices
+
+
+def frame(index, values):
+    df = pd.DataFrame({"close": values}, index=index)
+    df.index.name = "date"
+    return df
+
+
+def test___merge_frames():
+    merged = merge_frames(
+        [frame(["b", "c"], [2.0, 3.0]), None, frame(["a", "c"], [1.0, 4.0])]
+    )
+    assert list(merged.index) == ["a", "b", "c"]
+    assert list(merged.close) == [1.0, 2.0, 4.0]
+    assert merged.index.name == "date"
+
+
+def test___merge_frames___empty():
+    assert merge_frames([None, None]) is None
+    empty = pd.DataFrame(columns=["close"])
+    assert merge_frames([None, empty]) is empty
+
+
+def test___stitch_prices():
+    results = [
+        ("1m", frame(["b"], [2.0]), None, None),
+        (None, None, None, None),
+        ("1m", frame(["a"], [1.0]), frame(["a"], [0.1]), None),
+    ]
+    interval, prices, div, split = stitch_prices(results)
+    assert interval == "1m"
+    assert list(prices.index) == ["a", "b"]
+    assert list(div.close) == [0.1]
+    assert split is None
+    assert stitch_prices([(None, None, None, None)]) == (None, None, None, None)
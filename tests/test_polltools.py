@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import YPipeline.Utils.PollTools as PollTools
+from YPipeline.Utils.PollTools import IntradayPoller, RingBuffer
+from YPipeline.Utils.UrlTools import InvalidIntervalError
+
+
+def test___ring_buffer___wrap_and_replace():
+    buffer = RingBuffer(4, ["close"])
+    assert buffer.last is None
+
+    assert buffer.append(np.array([1, 2, 3]), np.array([[1.0, 2.0, 3.0]])) == 3
+    # LAST BAR REVISED, THREE NEW BARS, BUFFER WRAPS
+    assert buffer.append(np.array([2, 3, 4, 5, 6]), np.array([[0, 30, 4, 5, 6.0]])) == 3
+
+    stamps, values = buffer.view()
+    assert list(stamps) == [3, 4, 5, 6]
+    assert list(values[0]) == [30.0, 4.0, 5.0, 6.0]
+    assert buffer.last == 6
+
+
+def test___ring_buffer___view_no_copy():
+    buffer = RingBuffer(3, ["close"])
+    buffer.append(np.arange(5), np.arange(5.0)[None, :])
+    stamps, values = buffer.view()
+
+    assert np.shares_memory(values, buffer._values)
+    assert not values.flags.writeable
+    with pytest.raises(ValueError):
+        values[0, 0] = 1.0
+
+
+def chart(stamps, close):
+    return {
+        "timestamp": stamps,
+        "indicators": {
+            "quote": [
+                {
+                    "open": close,
+                    "high": close,
+                    "low": close,
+                    "close": close,
+                    "volume": [1 if c is not None else None for c in close],
+                }
+            ]
+        },
+    }
+
+
+def test___intraday_poller___ingest():
+    poller = IntradayPoller(["A"], "1m", capacity=10)
+    assert poller.ingest("A", chart([60, 120, 180], [1.0, None, 3.0])) == 2
+    assert poller.ingest("A", chart([180, 240], [3.5, 4.0])) == 1
+
+    frame = poller.frame("A")
+    assert list(frame["close"]) == [1.0, 3.5, 4.0]
+    assert str(frame.index.tz) == "UTC"
+    assert np.shares_memory(frame["close"].to_numpy(), poller.series("A")[1])
+
+
+def test___intraday_poller___invalid_interval():
+    with pytest.raises(InvalidIntervalError):
+        IntradayPoller(["A"], "1d")
+
+
+@pytest.mark.usefixtures("quiet_log")
+def test___intraday_poller___own_session(fake_session, monkeypatch):
+    created = []
+
+    def create_session(backend, timeout):
+        created.append((backend, timeout))
+        return fake_session()
+
+    monkeypatch.setattr(PollTools, "create_session", create_session)
+    poller = IntradayPoller(["A"], "1m", timeout=5, backend="httpx")
+
+    async def run():
+        counts = await poller.poll()
+        await poller.poll()
+        await poller.close()
+        return counts
+
+    assert asyncio.run(run()) == {"A": 3}
+    # ONE SESSION FOR ALL CYCLES, CREATED WITH THE POLLER SETTINGS
+    assert created == [("httpx", 5)]
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from YPipeline.Utils.PriorityTools import (
+    DeadlineExceededError,
+    PrioritySemaphore,
+    request_priority,
+)
+
+
+async def job(sem, name, order, hold=0.01):
+    async with sem:
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+async def submit(sem, name, order, priority=None, deadline=None):
+    with request_priority(priority, deadline):
+        task = asyncio.ensure_future(job(sem, name, order))
+    return task
+
+
+def test___priority_order():
+    async def main():
+        sem = PrioritySemaphore(1)
+        order = []
+        tasks = [await submit(sem, "first", order)]
+        await asyncio.sleep(0)
+        tasks.append(await submit(sem, "batch", order, "batch"))
+        tasks.append(await submit(sem, "normal", order))
+        tasks.append(await submit(sem, "interactive", order, "interactive"))
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["first", "interactive", "normal", "batch"]
+
+
+def test___deadline___cancel():
+    async def main():
+        sem = PrioritySemaphore(1)
+        order = []
+        first = await submit(sem, "first", order)
+        await asyncio.sleep(0)
+        late = await submit(sem, "late", order, deadline=0.001)
+        await first
+        with pytest.raises(DeadlineExceededError):
+            await late
+        # THE SLOT IS NOT LOST
+        await asyncio.wait_for(job(sem, "after", order), 1)
+        return order
+
+    assert asyncio.run(main()) == ["first", "after"]
+
+
+def test___deadline___timer_cancelled():
+    async def main():
+        sem = PrioritySemaphore(1)
+        loop = asyncio.get_event_loop()
+        handles = []
+        call_at = loop.call_at
+
+        def record(when, callback, *args, **kwargs):
+            handle = call_at(when, callback, *args, **kwargs)
+            if callback == sem._expire:
+                handles.append(handle)
+            return handle
+
+        loop.call_at = record
+        order = []
+        first = await submit(sem, "first", order)
+        await asyncio.sleep(0)
+        queued = await submit(sem, "queued", order, deadline=60)
+        await asyncio.gather(first, queued)
+        return order, handles
+
+    order, handles = asyncio.run(main())
+    assert order == ["first", "queued"]
+    # THE DEADLINE TIMER OF THE GRANTED WAITER DOES NOT OUTLIVE IT
+    assert len(handles) == 1 and handles[0].cancelled()
+
+
+def test___deadline___demote():
+    async def main():
+        sem = PrioritySemaphore(1, expired="demote")
+        order = []
+        tasks = [await submit(sem, "first", order)]
+        await asyncio.sleep(0)
+        tasks.append(await submit(sem, "late", order, "interactive", deadline=0.001))
+        tasks.append(await submit(sem, "batch", order, "batch"))
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["first", "batch", "late"]
+
+
+def test___rate_limit():
+    async def main():
+        sem = PrioritySemaphore(10, rate=100)
+        order = []
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        await asyncio.gather(*[job(sem, i, order, 0) for i in range(6)])
+        return loop.time() - start
+
+    assert asyncio.run(main()) >= 0.045
+
+
+def test___invalid_policy():
+    with pytest.raises(ValueError):
+        PrioritySemaphore(expired="drop")
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+import tracemalloc
+
+from YPipeline.cli import build_parser
+from YPipeline.Utils.ParseTools import parse_prices
+from YPipeline.Utils.ProfileTools import Profiler, record_wait, stage, stage_names
+from YPipeline.Utils.SchemaTools import validate_chart
+
+
+def test___stage___inactive():
+    profiler = Profiler()
+    with stage("decode"):
+        pass
+    record_wait("fetch", 1.0)
+    assert all(entry[0] == 0 for entry in profiler.stages.values())
+
+
+def test___profiler___stages():
+    profiler = Profiler()
+    with profiler.activate():
+        with stage("decode"):
+            kept = [bytearray(1 << 20)]
+        with stage("assembly"):
+            bytearray(1 << 21)
+        record_wait("fetch", 0.5)
+        record_wait("fetch", 0.25)
+        time.sleep(0.01)
+
+    decode, assembly, fetch = (
+        profiler.stages[n] for n in ("decode", "assembly", "fetch")
+    )
+    assert decode[0] == 1 and decode[3] >= 1 << 20
+    # FREED INSIDE THE STAGE - NO NET ALLOCATION BUT A PEAK
+    assert assembly[3] < 1 << 20 <= assembly[4]
+    assert fetch[:2] == [2, 0.75]
+    assert profiler.peak >= 1 << 21
+    assert profiler.wall >= 0.01
+    del kept
+
+    report = profiler.report()
+    assert list(report["stages"]) == list(stage_names)
+    cpu = sum(s["cpu"] for s in report["stages"].values())
+    assert abs(cpu - report["cpu"]) < 1e-5
+    json.dumps(report)
+    assert "assembly" in profiler.format()
+
+
+def test___profiler___no_memory():
+    profiler = Profiler(memory=False)
+    with profiler.activate():
+        with stage("decode"):
+            bytearray(1 << 20)
+    assert profiler.stages["decode"][0] == 1
+    assert profiler.stages["decode"][3:] == [0, 0]
+    assert profiler.peak == 0
+
+
+def test___profiler___overlapping_activations():
+    first, second = Profiler(), Profiler()
+    tracing = []
+
+    async def short():
+        with first.activate():
+            await asyncio.sleep(0.01)
+
+    async def long():
+        with second.activate():
+            await asyncio.sleep(0.02)
+            # THE FIRST PROFILE ENDED WHILE THIS ONE IS RUNNING
+            tracing.append(tracemalloc.is_tracing())
+            with stage("decode"):
+                kept = bytearray(1 << 20)
+        return kept
+
+    async def run():
+        return await asyncio.gather(short(), long())
+
+    asyncio.run(run())
+    assert tracing == [True]
+    assert second.stages["decode"][3] >= 1 << 20
+    assert not tracemalloc.is_tracing()
+
+
+def test___profiler___parse_stages(chart_result):
+    profiler = Profiler()
+    with profiler.activate():
+        with stage("validate"):
+            payload = {"chart": {"result": [chart_result], "error": None}}
+            data, _ = validate_chart(payload)
+        parse_prices(data, validated=True)
+    for name in ("validate", "parse_quotes", "parse_actions"):
+        assert profiler.stages[name][0] == 1
+
+
+def test___profiler___write(tmp_path):
+    profiler = Profiler(memory=False)
+    with profiler.activate():
+        pass
+    path = profiler.write(str(tmp_path))
+    assert path.startswith(str(tmp_path))
+    with open(path) as f:
+        assert set(json.load(f)["stages"]) == set(stage_names)
+
+    path = profiler.write(str(tmp_path / "run.json"))
+    assert path == str(tmp_path / "run.json")
+
+
+def test___cli___profile_flag():
+    parser = build_parser()
+    assert parser.parse_args(["A"]).profile is None
+    assert parser.parse_args(["A", "--profile"]).profile == "."
+    args = parser.parse_args(["A", "B", "--profile", "out", "--interval", "1h"])
+    assert args.symbols == ["A", "B"]
+    assert (args.profile, args.interval) == ("out", "1h")
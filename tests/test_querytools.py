@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from YPipeline.Utils.QueryTools import PriceIndex
+
+
+def prices(symbol, dates, close):
+    df = pd.DataFrame({"close": close, "volume": [10] * len(close)}, index=dates)
+    df["symbol"] = symbol
+    df.index.name = "date"
+    return df
+
+
+dates = list(pd.date_range("2020-01-01", periods=10).strftime("%Y-%m-%d"))
+
+results = [
+    (("1d", prices("A", dates, np.arange(10.0)), None, None), {}),
+    (("1d", prices("B", dates[5:], np.arange(5.0)), None, None), {}),
+    ((None, None, None, None), {}),
+]
+
+
+def test___price_index___query_views():
+    index = PriceIndex()
+    assert index.add_results(results) == [("A", "1d"), ("B", "1d")]
+
+    frames = index.query(["A", "B", "C"], "1d", "2020-01-03", "2020-01-06")
+    assert list(frames) == ["A", "B"]
+    assert list(frames["A"]["close"]) == [2.0, 3.0, 4.0, 5.0]
+    assert list(frames["B"]["close"]) == [0.0]
+    assert np.isnan(frames["A"]["open"]).all()
+
+    # NO COPY OF THE STORED VALUES
+    stored = index.series("A", "1d").values
+    assert np.shares_memory(frames["A"]["close"].to_numpy(), stored)
+
+
+def test___price_index___unbounded_and_empty_range():
+    index = PriceIndex(fields=["close"])
+    index.add_results(results)
+    assert len(index.query(["A"], "1d")["A"]) == 10
+    assert index.query(["A"], "1d", "2021-01-01")["A"].empty
+
+
+def test___price_index___merge():
+    index = PriceIndex(fields=["close"])
+    index.add("1d", prices("A", dates[:6], np.zeros(6)))
+    # OVERLAPPING UPDATE WINS
+    index.add("1d", prices("A", dates[4:], np.ones(6)))
+    close = index.query(["A"], "1d")["A"]["close"]
+    assert list(close) == [0.0] * 4 + [1.0] * 6
+
+    # APPEND
+    index.add("1d", prices("A", ["2020-02-01"], [2.0]))
+    assert index.series("A", "1d").timestamps.size == 11
+
+
+def test___price_index___intraday():
+    index = PriceIndex(fields=["close"])
+    stamps = ["2020-03-09T09:30:00-04:00", "2020-03-09T09:31:00-04:00"]
+    index.add("1m", prices("A", stamps, [1.0, 2.0]))
+    frame = index.query(["A"], "1m", start=1583760660)["A"]
+    assert list(frame["close"]) == [2.0]
+    assert str(frame.index.tz) == "UTC"
+
+
+def test___price_index___catalog():
+    index = PriceIndex()
+    index.add_results(results)
+    catalog = index.catalog()
+    assert list(catalog["symbol"]) == ["A", "B"]
+    assert list(catalog["bars"]) == [10, 5]
+    assert index.covering("1d", "2020-01-02", "2020-01-08") == ["A"]
+    assert index.covering("1d", "2020-01-07") == ["A", "B"]
@@ -0,0 +1,110 @@
+import copy
+
+import pytest
+
+from YPipeline.Utils.ParseTools import parse_prices
+from YPipeline.Utils.SchemaTools import validate_chart, validate_chart_result
+
+result = {
+    "meta": {
+        "symbol": "A",
+        "exchangeName": "NMS",
+        "currency": "USD",
+        "dataGranularity": "1d",
+        "priceHint": 2,
+        "exchangeTimezoneName": "America/New_York",
+    },
+    "timestamp": [1600090200, 1600176600],
+    "indicators": {
+        "quote": [
+            {
+                "open": [1.0, 2.0],
+                "high": [1.5, 2.5],
+                "low": [0.5, None],
+                "close": [1.2, 2.2],
+                "volume": [10, 20],
+            }
+        ],
+        "adjclose": [{"adjclose": [1.1, 2.1]}],
+    },
+    "events": {
+        "dividends": {"1600090200": {"amount": 0.5, "date": 1600090200}},
+        "splits": {
+            "1600176600": {
+                "date": 1600176600,
+                "numerator": 2,
+                "denominator": 1,
+                "splitRatio": "2:1",
+            }
+        },
+    },
+}
+
+
+def modified(path, value):
+    data = copy.deepcopy(result)
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    if value is None:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+    return data
+
+
+test_invalid = [
+    (modified(["timestamp"], None), "no_data"),
+    (modified(["timestamp"], []), "no_data"),
+    ({"indicators": {"quote": [{}]}}, "required:meta"),
+    (
+        modified(["meta", "exchangeTimezoneName"], None),
+        "required:meta.exchangeTimezoneName",
+    ),
+    (
+        modified(["indicators", "quote"], [{"open": "a"}]),
+        "required:indicators.quote.0.high",
+    ),
+    (modified(["indicators", "quote", 0, "close"], [1.0]), "length:close"),
+    (modified(["indicators", "adjclose", 0, "adjclose"], [1.0]), "length:adjclose"),
+]
+
+
+@pytest.mark.parametrize("data,reason", test_invalid)
+def test___validate_chart_result___invalid(data, reason):
+    assert validate_chart_result(data) == reason
+
+
+test_envelopes = [
+    ({}, "required:chart"),
+    ({"chart": {"result": None, "error": {"code": "Not Found"}}}, "error:Not Found"),
+    ({"chart": {"result": [], "error": None}}, "empty"),
+]
+
+
+@pytest.mark.parametrize("payload,reason", test_envelopes)
+def test___validate_chart___envelope(payload, reason):
+    assert validate_chart(payload) == (None, reason)
+
+
+def test___validate_chart___fast_path():
+    data, reason = validate_chart({"chart": {"result": [result], "error": None}})
+    assert reason is None
+
+    fast = parse_prices(data, validated=True)
+    assert fast[0] == "1d"
+    assert list(fast[1].index) == ["2020-09-14"]
+    assert list(fast[2].dividends) == [0.5]
+    assert list(fast[3].splits) == [2.0]
+
+
+def test___validate_chart___no_data():
+    # NO BARS IN THE WINDOW - ONLY META AND AN EMPTY QUOTE
+    data = {"meta": result["meta"], "indicators": {"quote": [{}]}}
+    valid, reason = validate_chart({"chart": {"result": [data], "error": None}})
+    assert (valid, reason) == (data, "no_data")
+
+    interval, prices, dividends, splits = parse_prices(valid, validated=True)
+    assert interval == "1d"
+    assert prices.empty
+    assert (dividends, splits) == (None, None)
@@ -0,0 +1,101 @@
+import gc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from YPipeline.Utils import SharedTools
+from YPipeline.Utils.ParseTools import parse_prices
+from YPipeline.Utils.SharedTools import (
+    collect_blocks,
+    discard,
+    export_prices,
+    import_prices,
+    parse_prices_shared,
+)
+
+result = {
+    "meta": {
+        "symbol": "A",
+        "exchangeName": "NMS",
+        "currency": "USD",
+        "dataGranularity": "1d",
+        "priceHint": 2,
+        "exchangeTimezoneName": "America/New_York",
+    },
+    "timestamp": [1600090200, 1600176600, 1600263000],
+    "indicators": {
+        "quote": [
+            {
+                "open": [1.0, 2.0, 3.0],
+                "high": [1.5, 2.5, 3.5],
+                "low": [0.5, 1.5, 2.5],
+                "close": [1.2, 2.2, 3.2],
+                "volume": [10, 20, 30],
+            }
+        ],
+        "adjclose": [{"adjclose": [1.1, 2.1, 3.1]}],
+    },
+    "events": {
+        "dividends": {"1600090200": {"amount": 0.5, "date": 1600090200}},
+        "splits": {
+            "1600176600": {
+                "date": 1600176600,
+                "numerator": 2,
+                "denominator": 1,
+                "splitRatio": "2:1",
+            }
+        },
+    },
+}
+
+
+def test___export_import___roundtrip():
+    expected = parse_prices(result, validated=True)
+    interval, prices, dividends, splits = import_prices(export_prices(expected))
+
+    assert interval == "1d"
+    pd.testing.assert_frame_equal(prices, expected[1], check_index_type=False)
+    pd.testing.assert_frame_equal(dividends, expected[2], check_index_type=False)
+    pd.testing.assert_frame_equal(splits, expected[3], check_index_type=False)
+
+
+def test___import_prices___zero_copy():
+    descriptor = export_prices(parse_prices(result, validated=True))
+    _, prices, _, _ = import_prices(descriptor)
+
+    close = prices["close"].to_numpy()
+    volume = prices["volume"].to_numpy()
+    assert not close.flags.owndata
+    assert np.shares_memory(close.base, volume.base)
+
+
+def test___import_prices___block_released():
+    collect_blocks()
+    descriptor = export_prices(parse_prices(result, validated=True))
+    frames = import_prices(descriptor)
+    assert len(SharedTools._blocks) == 1
+
+    # NAME IS UNLINKED ON IMPORT
+    with pytest.raises(FileNotFoundError):
+        discard(descriptor)
+
+    del frames
+    gc.collect()
+    assert not SharedTools._blocks
+    assert collect_blocks() == 1
+
+
+def test___export_prices___empty():
+    descriptor = export_prices((None, None, None, None))
+    assert import_prices(descriptor) == (None, None, None, None)
+
+
+def test___parse_prices_shared___process_pool():
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        descriptor = pool.submit(parse_prices_shared, result, True).result()
+
+    _, prices, _, splits = import_prices(descriptor)
+    assert list(prices["close"]) == [1.2, 2.2, 3.2]
+    assert list(splits["splitRatio"]) == ["2:1"]
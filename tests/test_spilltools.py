@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from YPipeline.Utils.ParseTools import parse_prices
+from YPipeline.Utils.SpillTools import ResultStore, SpilledPrices, result_nbytes
+
+
+@pytest.fixture
+def parsed(chart_result):
+    return parse_prices(chart_result, validated=True)
+
+
+def test___result_store___budget(parsed):
+    size = result_nbytes(parsed)
+    with ResultStore(budget=size) as store:
+        # FIRST RESULT FITS, SECOND IS SPILLED, FAILED ONES ARE KEPT
+        first = store.put(parsed)
+        second = store.put(parsed)
+        failed = store.put((None, None, None, None))
+        assert first is parsed
+        assert isinstance(second, SpilledPrices)
+        assert second.interval == "1d"
+        assert failed == (None, None, None, None)
+
+        assert store.stats.resident_bytes == size
+        assert store.stats.spilled == 1
+        assert store.stats.spilled_bytes == size
+
+
+def test___result_store___roundtrip(parsed):
+    size = result_nbytes(parsed)
+    with ResultStore(budget=0) as store:
+        store.extend([(store.put(parsed), {"a": 1}), (store.put(parsed), {})])
+        assert len(store) == 2
+        assert store.stats.reloaded == 0
+
+        (interval, prices, dividends, splits), summary = store[0]
+        assert interval == "1d"
+        assert summary == {"a": 1}
+        pd.testing.assert_frame_equal(prices, parsed[1], check_index_type=False)
+        pd.testing.assert_frame_equal(dividends, parsed[2], check_index_type=False)
+        pd.testing.assert_frame_equal(splits, parsed[3], check_index_type=False)
+
+        # RELOADED FRAMES ARE WRITABLE COPY-ON-WRITE MAPPINGS
+        prices.loc[prices.index[0], "close"] = -1.0
+        assert list(store[0][0][1]["close"]) == [1.2, 2.2, 3.2]
+
+        assert len(list(store)) == 2
+        assert len(store[:1]) == 1
+        assert store.stats.reloaded == 5
+        assert store.stats.reloaded_bytes == 5 * size
+
+
+def test___result_store___discard_and_close(parsed):
+    store = ResultStore(budget=result_nbytes(parsed))
+    resident = store.put(parsed)
+    spilled = store.put(parsed)
+    store.discard(resident)
+    store.discard(spilled)
+    assert store.stats.resident_bytes == 0
+    assert not os.path.exists(spilled.path)
+
+    path = store.path
+    store.close()
+    assert not os.path.exists(path)
@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import YPipeline.Utils.TransportTools as TransportTools
+from YPipeline.YPipeline import YahooSyncClient
+
+
+async def double(x):
+    await asyncio.sleep(0.01)
+    return 2 * x
+
+
+def test___sync_client___submit_from_threads():
+    with YahooSyncClient(concurrency=4) as client:
+        future = client.submit(double(1))
+        assert isinstance(future, Future)
+        assert future.result(timeout=5) == 2
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(
+                pool.map(
+                    lambda x: client.submit(double(x)).result(timeout=5), range(20)
+                )
+            )
+        assert results == [2 * x for x in range(20)]
+
+
+def test___sync_client___close():
+    client = YahooSyncClient()
+    client.close()
+    client.close()
+    assert not client._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        client.submit(double(1))
+
+
+@pytest.fixture
+def pooled_session(monkeypatch, fake_session):
+    session = fake_session(missing=["DEAD"])
+
+    def create_session(backend, timeout, limit):
+        session.limit = limit
+        return session
+
+    monkeypatch.setattr(TransportTools, "create_session", create_session)
+    return session
+
+
+@pytest.mark.usefixtures("quiet_log", "fake_summary")
+def test___sync_client___get(pooled_session):
+    with YahooSyncClient(concurrency=2) as client:
+        assert pooled_session.limit == 2
+        results = client.get(["A", "DEAD", "B"], "5d", "1d", timeout=5)
+        panels = client.get(["A", "B"], "5d", "1d", output="panel", timeout=5)
+
+    assert [r[0][1]["symbol"].iat[0] for r in results if r[0][1] is not None] == [
+        "A",
+        "B",
+    ]
+    assert results[1] == ((None, None, None, None), {"symbol": "DEAD"})
+    assert panels["1d"].symbols == ["A", "B"]
+
+
+@pytest.mark.usefixtures("quiet_log", "fake_summary")
+def test___sync_client___get_async(pooled_session):
+    with YahooSyncClient(concurrency=2) as client:
+        futures = [client.get_async([s], "5d", "1d") for s in ("A", "B", "C")]
+        assert all(isinstance(f, Future) for f in futures)
+        results = [f.result(timeout=5) for f in futures]
+
+    assert [r[0][0][1]["symbol"].iat[0] for r in results] == ["A", "B", "C"]
+    assert len(pooled_session.requests) == 3
+
+
+def test___sync_client___close_while_submitting():
+    client = YahooSyncClient()
+
+    def submit():
+        try:
+            return client.submit(double(1)).result(timeout=5)
+        except RuntimeError:
+            return None
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(submit) for _ in range(200)]
+        client.close()
+        results = [f.result() for f in futures]
+    # EVERY SUBMISSION EITHER RAN OR WAS REJECTED
+    assert set(results) <= {2, None}
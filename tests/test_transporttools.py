@@ -0,0 +1,154 @@
+import asyncio
+import importlib.util
+
+import pytest
+from aiohttp import ClientConnectionError, web
+
+from YPipeline.Utils.TransportTools import create_session, new_event_loop, run
+
+
+def test___new_event_loop___policies():
+    loop = new_event_loop("asyncio")
+    assert isinstance(loop, asyncio.AbstractEventLoop)
+    loop.close()
+
+    # FALLS BACK TO ASYNCIO WITHOUT UVLOOP
+    new_event_loop("auto").close()
+
+    with pytest.raises(ValueError):
+        new_event_loop("trio")
+
+    if importlib.util.find_spec("uvloop") is None:
+        with pytest.raises(ImportError):
+            new_event_loop("uvloop")
+
+
+def test___run___result():
+    async def answer():
+        return 42
+
+    assert run(answer()) == 42
+
+
+def test___create_session___invalid_backend():
+    with pytest.raises(ValueError):
+        create_session("requests")
+
+
+async def serve():
+    async def chart(request):
+        return web.json_response({"symbol": request.match_info["symbol"]})
+
+    async def page(request):
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/chart/{symbol}", chart)
+    app.router.add_get("/page", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.parametrize("backend", ["aiohttp", "httpx"])
+def test___create_session___interface(backend):
+    if importlib.util.find_spec(backend) is None:
+        pytest.skip(f"{backend} not installed")
+
+    async def main():
+        runner, base = await serve()
+        try:
+            async with create_session(backend, timeout=5) as session:
+                assert session.timeout.total == 5
+
+                async with session.get(base + "/chart/A", params={"a": "1"}) as r:
+                    assert r.status == 200
+                    assert await r.json() == {"symbol": "A"}
+
+                # NON-JSON CONTENT RAISES LIKE AIOHTTP
+                async with session.get(base + "/page") as r:
+                    with pytest.raises(Exception) as e:
+                        await r.json()
+                    assert e.type.__name__ == "ContentTypeError"
+
+                with pytest.raises(ClientConnectionError):
+                    async with session.get("http://127.0.0.1:1/chart/A"):
+                        pass
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+
+
+class FakeAsyncClient:
+    """
+    httpx.AsyncClient answering from a list of responses
+    or exceptions.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = limits
+        self.answers = []
+        self.calls = []
+        self.is_closed = False
+
+    async def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params, timeout))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    async def aclose(self):
+        self.is_closed = True
+
+
+def test___httpx_session___adapter(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    from aiohttp import ClientError, ClientTimeout
+
+    monkeypatch.setattr(httpx, "AsyncClient", FakeAsyncClient)
+
+    async def main():
+        session = create_session("httpx", timeout=3, limit=7)
+        client = session.client
+        assert client.limits.max_connections == 7
+        client.answers = [
+            httpx.Response(200, json={"a": 1}),
+            httpx.Response(404, text="<html></html>"),
+            httpx.ReadTimeout("slow"),
+            httpx.ConnectError("refused"),
+            httpx.TooManyRedirects("loop"),
+        ]
+
+        async with session:
+            async with session.get("u", params={"p": "1"}) as r:
+                assert r.status == 200
+                assert await r.json(loads=lambda text: ("decoded", text)) == (
+                    "decoded",
+                    '{"a":1}',
+                )
+            async with session.get("u", timeout=ClientTimeout(total=1)) as r:
+                assert r.status == 404
+                assert await r.text() == "<html></html>"
+
+            with pytest.raises(asyncio.TimeoutError):
+                async with session.get("u"):
+                    pass
+            with pytest.raises(ClientConnectionError):
+                async with session.get("u"):
+                    pass
+            with pytest.raises(ClientError) as e:
+                async with session.get("u"):
+                    pass
+            assert not isinstance(e.value, ClientConnectionError)
+
+        # SESSION TIMEOUT UNLESS THE REQUEST CAPS IT
+        assert [call[2] for call in client.calls] == [3, 1, 3, 3, 3]
+        assert client.calls[0][1] == {"p": "1"}
+        assert session.closed
+
+    asyncio.run(main())
@@ -1,12 +1,15 @@
 import time
+from datetime import datetime
 
 import pytest
 from pytest import raises
 
 from YPipeline.Utils.UrlTools import (
     base_url,
+    generate_chunked_price_params,
     generate_price_params,
     generate_price_urls,
+    split_window,
 )
 
 
@@ -287,3 +290,44 @@ def test___generate_price_params___pass(
     patchtime, period, interval, start, end, expected
 ):
     assert expected == generate_price_params(period, interval, start, end)
+
+
+test_split_window = [
+    (0, 10, "1d", [(0, 10)]),
+    (10, 10, "1d", []),
+    (0, 10 * 86400, "1m", [(0, 7 * 86400), (7 * 86400, 10 * 86400)]),
+    (0, 60 * 86400, "5m", [(0, 60 * 86400)]),
+]
+
+
+@pytest.mark.parametrize("period1,period2,interval,expected", test_split_window)
+def test___split_window(period1, period2, interval, expected):
+    assert split_window(period1, period2, interval) == expected
+
+
+@pytest.fixture()
+def patchtime_late(monkeypatch):
+    def mytime():
+        return 100 * 86400
+
+    monkeypatch.setattr(time, "time", mytime)
+
+
+def test___generate_chunked_price_params(patchtime_late):
+    paramslist = generate_chunked_price_params(
+        "max", "1m", datetime.fromtimestamp(86400), datetime.fromtimestamp(100 * 86400)
+    )
+    assert [(p["period1"], p["period2"]) for p in paramslist] == [
+        (70 * 86400, 77 * 86400),
+        (77 * 86400, 84 * 86400),
+        (84 * 86400, 91 * 86400),
+        (91 * 86400, 98 * 86400),
+        (98 * 86400, 100 * 86400),
+    ]
+    assert all(p["interval"] == "1m" for p in paramslist)
+
+
+def test___generate_chunked_price_params___unchanged(patchtime):
+    assert generate_chunked_price_params("max", "1d", None, None) == (
+        generate_price_params("max", "1d", None, None)
+    )